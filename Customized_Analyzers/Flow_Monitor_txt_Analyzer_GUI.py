@@ -1,77 +1,40 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import ttk, filedialog
-from collections import defaultdict
-
-# Function to load and parse the log file
-def load_file(filename, progress_var):
-    progress_var.set(0)  # Reset progress bar
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-
-    progress_var.set(100)  # Update progress bar to indicate completion
-    return lines
-
-# Function to extract the details from the log data
-def extract_details(lines):
-    details = []
-    current_time = ""
-    current_flow = {}
-    end_to_end_throughput = ""
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith("Time:"):
-            if current_flow:
-                if end_to_end_throughput:
-                    current_flow["End-to-End Throughput"] = end_to_end_throughput
-                details.append(current_flow)
-            current_time = line.split(":")[1].strip()
-            current_flow = {"Time": current_time}
-        elif line.startswith("FlowID:"):
-            if "FlowID" in current_flow:
-                if end_to_end_throughput:
-                    current_flow["End-to-End Throughput"] = end_to_end_throughput
-                details.append(current_flow)
-            parts = line.split()
-            flow_id = parts[1]
-            protocol_info = " ".join(parts[2:])
-            protocol, src_dest = protocol_info.split(" ", 1)
-            src, dest = src_dest.split(" --> ")
-            current_flow = {
-                "Time": current_time,
-                "FlowID": flow_id,
-                "Protocol": protocol,
-                "Source IP/Src Port": src,
-                "Destination IP/Dst Port": dest
-            }
-        elif line.startswith("Tx Bytes:"):
-            current_flow["Tx Bytes"] = line.split(":")[1].strip()
-        elif line.startswith("Rx Bytes:"):
-            current_flow["Rx Bytes"] = line.split(":")[1].strip()
-        elif line.startswith("Tx Packets:"):
-            current_flow["Tx Packets"] = line.split(":")[1].strip()
-        elif line.startswith("Rx Packets:"):
-            current_flow["Rx Packets"] = line.split(":")[1].strip()
-        elif line.startswith("Lost Packets:"):
-            current_flow["Lost Packets"] = line.split(":")[1].strip()
-        elif line.startswith("Pkt Lost Ratio:"):
-            current_flow["Pkt Lost Ratio"] = line.split(":")[1].strip()
-        elif line.startswith("Mean{Delay}:"):
-            current_flow["Mean{Delay}"] = line.split(":")[1].strip()
-        elif line.startswith("Mean{Jitter}:"):
-            current_flow["Mean{Jitter}"] = line.split(":")[1].strip()
-        elif line.startswith("Throughput:"):
-            current_flow["Throughput"] = line.split(":")[1].strip()
-        elif line.startswith("End-to-End Throughput:"):
-            end_to_end_throughput = line.split(":")[1].strip()
-            current_flow["End-to-End Throughput"] = end_to_end_throughput
-
-    if current_flow:
-        if end_to_end_throughput:
-            current_flow["End-to-End Throughput"] = end_to_end_throughput
-        details.append(current_flow)
-
-    return details
+from tkinter import ttk, filedialog, messagebox
+
+# Shared instrumentation and the virtual table view live with the trace analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trace_Analyzer"))
+from instrumentation import Instrumentation
+from virtual_treeview import VirtualTreeview
+from flow_log_table import read_flow_log, FlowLogTable
+from flow_log_series import FlowSeries
+
+# The time-series view needs matplotlib
+try:
+    from flow_log_plot import TimeSeriesWindow
+except ImportError:
+    TimeSeriesWindow = None
+
+instrumentation = Instrumentation.from_environment("flow_log_analyzer")
+
+# Table column -> FlowLogTable field
+COLUMN_FIELDS = {
+    "Time": "time", "FlowID": "flow_id", "Protocol": "protocol",
+    "Source IP/Src Port": "source", "Destination IP/Dst Port": "destination",
+    "Tx Bytes": "tx_bytes", "Rx Bytes": "rx_bytes", "Tx Packets": "tx_packets",
+    "Rx Packets": "rx_packets", "Lost Packets": "lost_packets", "Pkt Lost Ratio": "loss_ratio",
+    "Mean{Delay}": "mean_delay", "Mean{Jitter}": "mean_jitter", "Throughput": "throughput",
+    "End-to-End Throughput": "end_to_end_throughput",
+}
+
+# Function to format a table value for display
+def format_value(value):
+    return "N/A" if value is None else str(value)
+
+# Function to get the displayed values of one row of the log table
+def row_values(table, row):
+    return [format_value(table.get_value(COLUMN_FIELDS[col], row)) for col in columns]
 
 # Function to handle file selection
 def browse_file():
@@ -79,31 +42,51 @@ def browse_file():
                                           filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
     if filename:
         progress_var.set(0)  # Reset progress bar
-        lines = load_file(filename, progress_var)
-        display_details(lines)
+        instrumentation.reset()
+        instrumentation.start_profile()
+        with instrumentation.stage("read+parse"):
+            table = read_flow_log(filename, progress_var.set)
+        with instrumentation.stage("index"):
+            for field in COLUMN_FIELDS.values():
+                table.index(field)
+        display_details(table)
+        instrumentation.stop_profile()
+        if instrumentation.enabled:
+            report_path = instrumentation.write_report()
+            profile_label.config(text=f"{instrumentation.summary()} (report: {report_path})")
+
+# Function to open the time-series view of the loaded log
+def show_time_series():
+    global flow_series
+    if TimeSeriesWindow is None:
+        messagebox.showwarning("Missing Dependency", "The time-series view needs matplotlib (pip install matplotlib).")
+        return
+    if not len(details):
+        messagebox.showinfo("No Data", "Load an Instantaneous_Flow_Log file first.")
+        return
+    if flow_series is None or flow_series.table is not details:
+        flow_series = FlowSeries(details)
+    TimeSeriesWindow(root, flow_series)
 
 # Function to display details in table format
-def display_details(lines):
+def display_details(table):
     global details
-    details = extract_details(lines)
+    details = table
+    instrumentation.count("records", len(details))
+    instrumentation.count("time blocks", len(details.block_time))
 
-    # Clear existing table
-    for row in details_tree.get_children():
-        details_tree.delete(row)
+    with instrumentation.stage("display"):
+        # Only the visible rows are formatted, as the view scrolls
+        details_tree.set_rows(range(len(details)), lambda row: row_values(details, row))
 
-    # Insert new data into table
-    for detail in details:
-        values = {}
-        for col in columns:
-            values[col] = detail.get(col, "N/A")
-        details_tree.insert("", tk.END, values=list(values.values()))
-
-    # Create filter options after loading details
-    create_filters()
+        # Create filter options after loading details
+        create_filters()
+        root.update_idletasks()
 
 # Function to create filter menus for each column
 def create_filters():
     global filter_menus
+    global filter_values
     global columns
 
     # Remove existing filters
@@ -111,17 +94,19 @@ def create_filters():
         widget.destroy()
 
     # Create filter menus dynamically based on column headers
+    filter_values = {}
     for col_index, col in enumerate(columns):
-        values = set()
-        for detail in details:
-            values.add(detail.get(col, "N/A"))
+        # Displayed choice -> column value, so filters go straight to the table's indexes
+        filter_values[col] = {format_value(value): value for value in details.distinct_values(COLUMN_FIELDS[col])}
+        filter_values[col]["N/A"] = None
+        values = list(filter_values[col])
 
         # Create label for the filter
         filter_label = ttk.Label(filter_frame, text=col, style='Arial.TLabel')
         filter_label.grid(row=0, column=col_index, padx=5, pady=5)
 
         # Create combobox for the filter
-        filter_menus[col] = ttk.Combobox(filter_frame, values=['All'] + list(values), width=11)  # Adjust width as needed
+        filter_menus[col] = ttk.Combobox(filter_frame, values=['All'] + values, width=11)  # Adjust width as needed
         filter_menus[col].bind("<<ComboboxSelected>>", apply_filters)
         filter_menus[col].current(0)  # Set default to 'All'
         filter_menus[col].grid(row=1, column=col_index, padx=5, pady=5)
@@ -132,82 +117,85 @@ def apply_filters(event=None):
     for col, combobox in filter_menus.items():
         value = combobox.get()
         if value and value != 'All':
-            filters[col] = value
-
-    # Clear existing table
-    for row in details_tree.get_children():
-        details_tree.delete(row)
-
-    # Filter and display data
-    for detail in details:
-        include = True
-        for col, value in filters.items():
-            if detail.get(col, "N/A") != value:
-                include = False
-                break
-        if include:
-            values = [detail.get(col, "N/A") for col in columns]
-            details_tree.insert("", tk.END, values=values)
-
-# GUI setup
-root = tk.Tk()
-root.title("Flow Monitor txt Analyzer by Amruth")
-
-# Set Arial font with font size 10 for all widgets
-style = ttk.Style()
-style.configure('Arial.TButton', font=('Arial', 10))
-style.configure('Arial.TLabel', font=('Arial', 10))
-style.configure('Arial.TEntry', font=('Arial', 10))
-style.configure('Arial.Treeview', font=('Arial', 10))
-
-# Progress bar to indicate file reading progress
-progress_var = tk.DoubleVar()
-progress_bar = ttk.Progressbar(root, mode="determinate", variable=progress_var)
-progress_bar.pack(fill="x", padx=10, pady=10)
-
-# Label to browse for log file
-browse_label = ttk.Label(root, text="Browse the Instantaneous_Flow_Log.txt file:", style='Arial.TLabel')
-browse_label.pack(pady=5)
-
-# Browse button to select log file
-browse_button = ttk.Button(root, text="Browse", command=browse_file, style='Arial.TButton')
-browse_button.pack(pady=5)
-
-# Frame to contain filter options
-filter_frame = ttk.Frame(root)
-filter_frame.pack(padx=10, pady=10, fill="x")
-
-# Frame to contain the Treeview and Scrollbars
-frame = ttk.Frame(root)
-frame.pack(padx=10, pady=10, fill="both", expand=True)
-
-# Define the columns for the Treeview
-columns = ("Time", "FlowID", "Protocol", "Source IP/Src Port", "Destination IP/Dst Port",
-           "Tx Bytes", "Rx Bytes", "Tx Packets", "Rx Packets", "Lost Packets",
-           "Pkt Lost Ratio", "Mean{Delay}", "Mean{Jitter}", "Throughput", "End-to-End Throughput")
-
-# Treeview (table) to display details
-details_tree = ttk.Treeview(frame, columns=columns, show="headings", style='Arial.Treeview')
-
-# Configure column headings
-for col in columns:
-    details_tree.heading(col, text=col, command=lambda c=col: sort_treeview(details_tree, c, False))
-    details_tree.column(col, anchor="center")
-
-# Vertical Scrollbar
-vsb = ttk.Scrollbar(frame, orient="vertical", command=details_tree.yview)
-details_tree.configure(yscrollcommand=vsb.set)
-vsb.pack(side='right', fill='y')
-
-# Horizontal Scrollbar
-hsb = ttk.Scrollbar(frame, orient="horizontal", command=details_tree.xview)
-details_tree.configure(xscrollcommand=hsb.set)
-hsb.pack(side='bottom', fill='x')
-
-# Pack the Treeview widget
-details_tree.pack(fill="both", expand=True)
-
-# Dictionary to hold filter comboboxes
-filter_menus = {}
-
-root.mainloop()
+            # Typed text that is not one of the choices matches nothing
+            filters[COLUMN_FIELDS[col]] = filter_values[col].get(value, value)
+
+    # Matching rows come from the column indexes; the view only redraws what is visible
+    details_tree.set_rows(details.select(filters), lambda row: row_values(details, row))
+
+if __name__ == "__main__":
+    # GUI setup
+    root = tk.Tk()
+    root.title("Flow Monitor txt Analyzer by Amruth")
+
+    # Set Arial font with font size 10 for all widgets
+    style = ttk.Style()
+    style.configure('Arial.TButton', font=('Arial', 10))
+    style.configure('Arial.TLabel', font=('Arial', 10))
+    style.configure('Arial.TEntry', font=('Arial', 10))
+    style.configure('Arial.Treeview', font=('Arial', 10))
+
+    # Progress bar to indicate file reading progress
+    progress_var = tk.DoubleVar()
+    progress_bar = ttk.Progressbar(root, mode="determinate", variable=progress_var)
+    progress_bar.pack(fill="x", padx=10, pady=10)
+
+    # Label to browse for log file
+    browse_label = ttk.Label(root, text="Browse the Instantaneous_Flow_Log.txt file:", style='Arial.TLabel')
+    browse_label.pack(pady=5)
+
+    # Browse button to select log file
+    browse_button = ttk.Button(root, text="Browse", command=browse_file, style='Arial.TButton')
+    browse_button.pack(pady=5)
+
+    # Button to plot the flows over time
+    series_button = ttk.Button(root, text="Time Series", command=show_time_series, style='Arial.TButton')
+    series_button.pack(pady=5)
+
+    # Label for the load profile when NS3_PROFILE is set
+    profile_label = ttk.Label(root, text="", style='Arial.TLabel')
+    profile_label.pack(pady=5)
+
+    # Frame to contain filter options
+    filter_frame = ttk.Frame(root)
+    filter_frame.pack(padx=10, pady=10, fill="x")
+
+    # Frame to contain the Treeview and Scrollbars
+    frame = ttk.Frame(root)
+    frame.pack(padx=10, pady=10, fill="both", expand=True)
+
+    # Define the columns for the Treeview
+    columns = ("Time", "FlowID", "Protocol", "Source IP/Src Port", "Destination IP/Dst Port",
+               "Tx Bytes", "Rx Bytes", "Tx Packets", "Rx Packets", "Lost Packets",
+               "Pkt Lost Ratio", "Mean{Delay}", "Mean{Jitter}", "Throughput", "End-to-End Throughput")
+
+    # Treeview (table) to display details
+    details_tree = VirtualTreeview(frame, columns=columns, show="headings", style='Arial.Treeview')
+
+    # Configure column headings
+    for col in columns:
+        details_tree.heading(col, text=col, command=lambda c=col: sort_treeview(details_tree, c, False))
+        details_tree.column(col, anchor="center")
+
+    # Vertical Scrollbar
+    vsb = ttk.Scrollbar(frame, orient="vertical", command=details_tree.yview)
+    details_tree.yscrollcommand = vsb.set
+    vsb.pack(side='right', fill='y')
+
+    # Horizontal Scrollbar
+    hsb = ttk.Scrollbar(frame, orient="horizontal", command=details_tree.xview)
+    details_tree.configure(xscrollcommand=hsb.set)
+    hsb.pack(side='bottom', fill='x')
+
+    # Pack the Treeview widget
+    details_tree.pack(fill="both", expand=True)
+
+    # Dictionary to hold filter comboboxes
+    filter_menus = {}
+    filter_values = {}
+
+    # Loaded log and its per-flow series, built when first plotted
+    details = FlowLogTable()
+    flow_series = None
+
+    root.mainloop()
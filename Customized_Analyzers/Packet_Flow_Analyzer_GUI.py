@@ -1,8 +1,17 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Menu
-import time
+import queue
 import threading
 
+# Shared instrumentation lives with the trace analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trace_Analyzer"))
+from instrumentation import Instrumentation
+from packet_flow_log import read_packet_flow_log
+
+instrumentation = Instrumentation.from_environment("packet_flow_analyzer")
+
 class FilterableTreeview(ttk.Treeview):
     def __init__(self, master=None, **kwargs):
         super().__init__(master, **kwargs)
@@ -59,72 +68,66 @@ class FilterableTreeview(ttk.Treeview):
             self.insert('', 'end', values=row)
 
 
-def parse_data_chunk(data_chunk):
-    parsed_chunk = []
-    try:
-        for line in data_chunk:
-            parts = line.strip().split(", ")
-            app = parts[0].split(": ")[1]
-            context = parts[1].split(": ")[1]
-            packet_id = int(parts[2].split(": ")[1])
-            src_ip = parts[3].split(": ")[1]
-            dst_ip = parts[4].split(": ")[1]
-            parsed_chunk.append((packet_id, app, context, src_ip, dst_ip))
-    except Exception as e:
-        print(f"Error parsing data: {e}")
-    return parsed_chunk
-
 def load_data_from_file():
+    if load_thread is not None:
+        return
     file_path = filedialog.askopenfilename(initialdir="/home/amruth/ns-allinone-3.41/ns-3.41/scratch", filetypes=[("Text files", "*.txt")])
     if file_path:
         read_file_with_progress(file_path)
 
 def read_file_with_progress(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            data = file.readlines()
-    except Exception as e:
-        messagebox.showerror("File Error", f"Error reading file: {e}")
-        return
-    
-    total_lines = len(data)
+    # Parsing runs on a worker thread that drives the process pool and only talks to Tk
+    # through load_messages; the main thread polls it
+    global load_thread
     progress_var.set(0)
     progress_label.config(text="Reading file...")
+    browse_button.config(state=tk.DISABLED)
+    load_thread = threading.Thread(target=run_load, args=(file_path,), daemon=True)
+    load_thread.start()
+    root.after(100, poll_load)
 
-    chunk_size = 1000
-    chunks = [data[i:i + chunk_size] for i in range(0, total_lines, chunk_size)]
-    parsed_data = []
-    threads = []
-    
-    start_time = time.time()
-
-    def update_progress():
-        while any(t.is_alive() for t in threads):
-            completed_chunks = total_chunks - len([t for t in threads if t.is_alive()])
-            progress = (completed_chunks / total_chunks) * 100
+def run_load(file_path):
+    # cProfile only sees the thread that enables it, so profiling starts here
+    try:
+        instrumentation.reset()
+        instrumentation.start_profile()
+        progress = lambda *values: load_messages.put(("progress", values))
+        parsed_data = read_packet_flow_log(file_path, progress, instrumentation=instrumentation)
+        load_messages.put(("done", parsed_data))
+    except Exception as e:
+        load_messages.put(("error", e))
+    finally:
+        instrumentation.stop_profile()
+
+def poll_load():
+    global load_thread
+    while True:
+        try:
+            kind, value = load_messages.get_nowait()
+        except queue.Empty:
+            root.after(100, poll_load)
+            return
+        if kind == "progress":
+            progress, elapsed_time, remaining_time = value
             progress_var.set(progress)
-            elapsed_time = time.time() - start_time
-            estimated_total_time = (elapsed_time / (completed_chunks + 1)) * total_chunks
-            remaining_time = estimated_total_time - elapsed_time
             time_info.set(f"Elapsed: {elapsed_time:.2f}s, Remaining: {remaining_time:.2f}s")
             progress_label.config(text=f"Progress: {progress:.2f}%")
-            time.sleep(0.1)
+        else:
+            break
 
-    total_chunks = len(chunks)
-    
-    for chunk in chunks:
-        thread = threading.Thread(target=lambda c=chunk: parsed_data.extend(parse_data_chunk(c)))
-        threads.append(thread)
-        thread.start()
-    
-    progress_thread = threading.Thread(target=update_progress)
-    progress_thread.start()
-    
-    for thread in threads:
-        thread.join()
-    
-    display_data(parsed_data)
+    load_thread = None
+    browse_button.config(state=tk.NORMAL)
+    if kind == "error":
+        progress_label.config(text="Reading file failed")
+        messagebox.showerror("File Error", f"Error reading file: {value}")
+        return
+    with instrumentation.stage("display"):
+        display_data(value)
+        root.update_idletasks()
     progress_label.config(text="File read successfully")
+    if instrumentation.enabled:
+        report_path = instrumentation.write_report()
+        time_info.set(f"{instrumentation.summary()} (report: {report_path})")
 
 def display_data(parsed_data):
     tree.set_data(parsed_data)
@@ -167,5 +170,9 @@ if __name__ == "__main__":
         tree.heading(col, text=col)
     
     tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+
+    # Messages from the loader thread, and the thread while a file is loading
+    load_messages = queue.Queue()
+    load_thread = None
     
     root.mainloop()
\ No newline at end of file
@@ -1,8 +1,14 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, filedialog
 import time
 import threading
 
+# Shared instrumentation lives with the trace analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trace_Analyzer"))
+from instrumentation import Instrumentation
+
 def parse_routing_data(data):
     nodes = {}
     lines = data.split('\n')
@@ -55,6 +61,7 @@ class RoutingTableAnalyzerApp(tk.Tk):
         self.geometry("800x600")
         
         self.nodes = nodes if nodes else {}
+        self.instrumentation = Instrumentation.from_environment("routing_table_analyzer")
         
         self.create_widgets()
 
@@ -85,22 +92,35 @@ class RoutingTableAnalyzerApp(tk.Tk):
 
     def load_file(self, file_path):
         def read_file():
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-
-            total_lines = len(lines)
-            chunk_size = max(1, total_lines // 100)
-
-            data = ""
-            start_time = time.time()
-            for i, line in enumerate(lines):
-                data += line
-                if i % chunk_size == 0:
-                    self.update_progress(i / total_lines, start_time, i, total_lines)
-
-            self.nodes = parse_routing_data(data)
-            self.create_tabs()
+            instrumentation = self.instrumentation
+            instrumentation.reset()
+            instrumentation.start_profile()
+            with instrumentation.stage("read"):
+                with open(file_path, 'r') as f:
+                    lines = f.readlines()
+
+                total_lines = len(lines)
+                chunk_size = max(1, total_lines // 100)
+
+                data = ""
+                start_time = time.time()
+                for i, line in enumerate(lines):
+                    data += line
+                    if i % chunk_size == 0:
+                        self.update_progress(i / total_lines, start_time, i, total_lines)
+
+            with instrumentation.stage("parse"):
+                self.nodes = parse_routing_data(data)
+            instrumentation.count("lines", total_lines)
+            instrumentation.count("nodes", len(self.nodes))
+            instrumentation.count("routes", sum(len(table['routes']) for node in self.nodes.values() for table in node['routing_tables']))
+            with instrumentation.stage("display"):
+                self.create_tabs()
+            instrumentation.stop_profile()
             self.update_progress(1, start_time, total_lines, total_lines)
+            if instrumentation.enabled:
+                report_path = instrumentation.write_report()
+                self.progress_label.config(text=f"{instrumentation.summary()} (report: {report_path})")
 
         threading.Thread(target=read_file).start()
 
@@ -151,5 +171,6 @@ class RoutingTableAnalyzerApp(tk.Tk):
 
 
 # Example usage:
-app = RoutingTableAnalyzerApp()
-app.mainloop()
+if __name__ == "__main__":
+    app = RoutingTableAnalyzerApp()
+    app.mainloop()
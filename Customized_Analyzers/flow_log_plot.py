@@ -0,0 +1,138 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
+from flow_log_series import SERIES_METRICS, lttb_indices, minmax_indices, rolling_extrema, rolling_mean, visible_range
+
+DOWNSAMPLING = ("Min/Max", "LTTB")
+ROLLING = ("Off", "Mean", "Min", "Max")
+
+# Lines drawn per pixel of axis width, and the most flows that get a legend
+POINTS_PER_PIXEL = 2
+MAX_LEGEND_LINES = 10
+
+class TimeSeriesWindow(tk.Toplevel):
+    # Plots selected flows of a FlowSeries over time. Only the samples in view are drawn,
+    # decimated to about POINTS_PER_PIXEL per pixel; zooming or panning recomputes that
+    # from the full-resolution arrays. Rolling aggregates are computed once per flow,
+    # metric and window and kept for later redraws.
+    def __init__(self, master, series):
+        super().__init__(master)
+        self.title("Flow Time Series")
+        self.geometry("1100x650")
+        self.series = series
+        self.lines = []
+        self.artists = []
+        self.rolling_cache = {}
+        self.redraw_pending = False
+
+        controls = ttk.Frame(self)
+        controls.pack(side=tk.LEFT, fill=tk.Y, padx=10, pady=10)
+
+        ttk.Label(controls, text="Flows", style='Arial.TLabel').pack(anchor="w")
+        list_frame = ttk.Frame(controls)
+        list_frame.pack(fill=tk.Y, expand=True)
+        self.flow_list = tk.Listbox(list_frame, selectmode=tk.EXTENDED, exportselection=False, font=("Arial", 10), width=12)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.flow_list.yview)
+        self.flow_list.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.flow_list.pack(side=tk.LEFT, fill=tk.Y, expand=True)
+        for flow_id in series.flow_ids.tolist():
+            self.flow_list.insert(tk.END, flow_id)
+        ttk.Button(controls, text="Select All", command=lambda: self.flow_list.select_set(0, tk.END), style='Arial.TButton').pack(fill=tk.X, pady=2)
+
+        self.metric = self.add_choice(controls, "Metric", list(SERIES_METRICS.values()))
+        self.downsampling = self.add_choice(controls, "Downsampling", DOWNSAMPLING)
+        self.rolling = self.add_choice(controls, "Rolling", ROLLING)
+        ttk.Label(controls, text="Rolling window (s)", style='Arial.TLabel').pack(anchor="w", pady=(5, 0))
+        self.window_entry = ttk.Entry(controls, width=12)
+        self.window_entry.insert(0, "10")
+        self.window_entry.pack(fill=tk.X)
+        ttk.Button(controls, text="Plot", command=self.plot, style='Arial.TButton').pack(fill=tk.X, pady=10)
+
+        self.figure = Figure(figsize=(8, 5))
+        self.axes = self.figure.add_subplot(111)
+        self.axes.set_xlabel("Time (s)")
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("resize_event", self.schedule_redraw)
+
+    def add_choice(self, parent, label, values):
+        ttk.Label(parent, text=label, style='Arial.TLabel').pack(anchor="w", pady=(5, 0))
+        combobox = ttk.Combobox(parent, values=list(values), state="readonly", width=18)
+        combobox.current(0)
+        combobox.pack(fill=tk.X)
+        return combobox
+
+    def metric_name(self):
+        return list(SERIES_METRICS)[self.metric.current()]
+
+    def rolling_values(self, flow_id, metric, times, values):
+        kind = self.rolling.get()
+        if kind == "Off":
+            return values
+        window = float(self.window_entry.get())
+        key = (flow_id, metric, window)
+        aggregates = self.rolling_cache.get(key)
+        if aggregates is None:
+            low, high = rolling_extrema(times, values, window)
+            aggregates = self.rolling_cache[key] = {"Mean": rolling_mean(times, values, window), "Min": low, "Max": high}
+        return aggregates[kind]
+
+    def plot(self):
+        flow_ids = [int(self.flow_list.get(index)) for index in self.flow_list.curselection()]
+        if not flow_ids:
+            messagebox.showinfo("No Flows", "Select one or more flows to plot.", parent=self)
+            return
+        metric = self.metric_name()
+        try:
+            self.lines = []
+            for flow_id in flow_ids:
+                times, values = self.series.series(flow_id, metric)
+                self.lines.append((times, self.rolling_values(flow_id, metric, times, values), flow_id))
+        except ValueError:
+            messagebox.showwarning("Invalid Window", "Enter the rolling window in seconds.", parent=self)
+            return
+
+        axes = self.axes
+        # Clearing the axes also drops their callbacks
+        axes.clear()
+        axes.callbacks.connect("xlim_changed", self.schedule_redraw)
+        axes.set_xlabel("Time (s)")
+        axes.set_ylabel(SERIES_METRICS[metric])
+        self.artists = [axes.plot([], [], linewidth=1, label=f"Flow {flow_id}")[0] for _, _, flow_id in self.lines]
+        starts = [times[0] for times, _, _ in self.lines if len(times)]
+        ends = [times[-1] for times, _, _ in self.lines if len(times)]
+        if starts:
+            axes.set_xlim(min(starts), max(ends) if max(ends) > min(starts) else min(starts) + 1)
+        if len(self.lines) <= MAX_LEGEND_LINES:
+            axes.legend(loc="upper right", fontsize=8)
+        self.redraw()
+        axes.relim()
+        axes.autoscale_view(scalex=False)
+        self.canvas.draw_idle()
+
+    def schedule_redraw(self, *args):
+        # Zooming fires several limit changes in a row; redraw once they have settled
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.after_idle(self.redraw)
+
+    def redraw(self):
+        self.redraw_pending = False
+        if not self.lines:
+            return
+        start_time, end_time = self.axes.get_xlim()
+        buckets = max(int(self.axes.bbox.width) * POINTS_PER_PIXEL // 2, 10)
+        use_lttb = self.downsampling.get() == "LTTB"
+        for artist, (times, values, _) in zip(self.artists, self.lines):
+            start, stop = visible_range(times, start_time, end_time)
+            times, values = times[start:stop], values[start:stop]
+            if use_lttb:
+                indices = lttb_indices(times, values, 2 * buckets)
+            else:
+                indices = minmax_indices(values, buckets)
+            artist.set_data(times[indices], values[indices])
+        self.canvas.draw_idle()
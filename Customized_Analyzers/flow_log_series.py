@@ -0,0 +1,132 @@
+import numpy as np
+
+# FlowLogTable columns that can be plotted over time, with their axis labels
+SERIES_METRICS = {
+    "throughput": "Throughput (Mbps)",
+    "mean_delay": "Mean Delay (s)",
+    "mean_jitter": "Mean Jitter (s)",
+    "loss_ratio": "Packet Loss Ratio",
+}
+
+def to_numpy(column, dtype):
+    return np.frombuffer(column, dtype=dtype) if len(column) else np.zeros(0, dtype=dtype)
+
+class FlowSeries:
+    # Per-flow time series of a FlowLogTable. Rows are sorted once by (flow, time), so
+    # each flow's samples are one contiguous slice of every metric; metric columns are
+    # gathered into that order on first use.
+    def __init__(self, table):
+        self.table = table
+        flow_id = to_numpy(table.flow_id, np.int64)
+        time = to_numpy(table.block_time, np.float64)[to_numpy(table.block, np.int32)]
+        self.order = np.lexsort((time, flow_id))
+        self.time = time[self.order]
+        self.flow_ids, starts = np.unique(flow_id[self.order], return_index=True)
+        self.offsets = np.append(starts, len(self.order))
+        self.columns = {}
+
+    def values(self, metric):
+        column = self.columns.get(metric)
+        if column is None:
+            column = self.columns[metric] = to_numpy(getattr(self.table, metric), np.float64)[self.order]
+        return column
+
+    def series(self, flow_id, metric):
+        # (times, values) of one flow, in time order
+        position = np.searchsorted(self.flow_ids, flow_id)
+        if position == len(self.flow_ids) or self.flow_ids[position] != flow_id:
+            return np.zeros(0), np.zeros(0)
+        start, stop = self.offsets[position], self.offsets[position + 1]
+        return self.time[start:stop], self.values(metric)[start:stop]
+
+    def __len__(self):
+        return len(self.flow_ids)
+
+def visible_range(times, start_time, end_time):
+    # (start, stop) of the samples inside [start_time, end_time], widened by one sample on
+    # each side so lines still reach the edges of the view
+    start = max(int(np.searchsorted(times, start_time, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(times, end_time, side='right')) + 1, len(times))
+    return start, stop
+
+def minmax_indices(values, buckets):
+    # Indices of the smallest and largest value in each of buckets equal slices, in
+    # order, so peaks survive decimation. NaN samples are never picked over real ones.
+    count = len(values)
+    if count <= 2 * buckets:
+        return np.arange(count)
+    size = -(-count // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:count] = values
+    padded = padded.reshape(buckets, size)
+    missing = np.isnan(padded)
+    base = np.arange(buckets) * size
+    lows = base + np.argmin(np.where(missing, np.inf, padded), axis=1)
+    highs = base + np.argmax(np.where(missing, -np.inf, padded), axis=1)
+    indices = np.sort(np.stack((lows, highs), axis=1), axis=1).reshape(-1)
+    indices = indices[indices < count]
+    return np.unique(np.concatenate(([0], indices, [count - 1])))
+
+def lttb_indices(times, values, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last sample and, from each
+    # bucket in between, the one forming the largest triangle with the point kept before
+    # it and the mean of the next bucket. NaN samples are left out.
+    kept = np.flatnonzero(~np.isnan(values))
+    if len(kept) <= threshold or threshold < 3:
+        return kept
+    x, y = times[kept], values[kept]
+    edges = np.linspace(1, len(kept) - 1, threshold - 1).astype(np.int64)
+    # The last bucket ends before the final sample, which is kept on its own
+    sums_x = np.add.reduceat(x[:-1], edges[:-1])
+    sums_y = np.add.reduceat(y[:-1], edges[:-1])
+    lengths = np.diff(edges)
+    mean_x = np.append(sums_x / lengths, x[-1])
+    mean_y = np.append(sums_y / lengths, y[-1])
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, len(kept) - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        areas = np.abs((x[previous] - mean_x[bucket + 1]) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (mean_y[bucket + 1] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return kept[selected]
+
+def rolling_mean(times, values, window):
+    # Mean of the non-NaN samples in (t - window, t] for every sample t, from running sums
+    # so each window costs O(1); NaN where a window holds no samples
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    starts = np.searchsorted(times, times - window, side='right')
+    ends = np.arange(1, len(times) + 1)
+    window_counts = counts[ends] - counts[starts]
+    result = np.full(len(times), np.nan)
+    np.divide(sums[ends] - sums[starts], window_counts, out=result, where=window_counts > 0)
+    return result
+
+def rolling_extrema(times, values, window):
+    # (min, max) of the non-NaN samples in (t - window, t] for every sample t. A sparse
+    # table of power-of-two ranges answers each window with two lookups.
+    count = len(times)
+    if not count:
+        return np.zeros(0), np.zeros(0)
+    starts = np.searchsorted(times, times - window, side='right')
+    ends = np.arange(count)
+    lengths = ends - starts + 1
+    levels = np.floor(np.log2(lengths)).astype(np.int64)
+    missing = np.isnan(values)
+    results = []
+    for reduce, fill in ((np.minimum, np.inf), (np.maximum, -np.inf)):
+        table = [np.where(missing, fill, values)]
+        while (1 << len(table)) <= lengths.max():
+            half = 1 << (len(table) - 1)
+            previous = table[-1]
+            table.append(np.concatenate((reduce(previous[:-half], previous[half:]), previous[-half:])))
+        result = np.empty(count)
+        for level in np.unique(levels):
+            rows = levels == level
+            result[rows] = reduce(table[level][starts[rows]], table[level][ends[rows] - (1 << level) + 1])
+        results.append(np.where(np.isinf(result), np.nan, result))
+    return results[0], results[1]
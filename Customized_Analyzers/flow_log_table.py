@@ -0,0 +1,228 @@
+import math
+import os
+import re
+import sys
+from array import array
+import numpy as np
+
+# Dictionary columns are shared with the trace analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trace_Analyzer"))
+from trace_table import DictionaryColumn
+
+NUMBER_PATTERN = re.compile(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([A-Za-z/%]*)")
+RATE_UNITS = {"": 1.0, "bps": 1e-6, "Kbps": 1e-3, "kbps": 1e-3, "Mbps": 1.0, "Gbps": 1e3}
+TIME_UNITS = {"": 1.0, "s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+
+# Lines between progress updates while streaming
+PROGRESS_INTERVAL = 100000
+
+def parse_count(text):
+    return int(text)
+
+def parse_scaled(units):
+    # Converter for "<number> <unit>" values into the unit with scale 1 in units
+    def parse(text):
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        match = NUMBER_PATTERN.match(text)
+        if match is None or match.group(2) not in units:
+            return math.nan
+        return float(match.group(1)) * units[match.group(2)]
+    return parse
+
+parse_ratio = parse_scaled({"": 1.0, "%": 0.01})
+parse_seconds = parse_scaled(TIME_UNITS)
+parse_mbps = parse_scaled(RATE_UNITS)
+
+# Line prefix (text before the first colon) -> (column, converter) for the per-flow
+# value lines of a block; count columns use -1 and the others NaN when a line is missing
+VALUE_LINES = {
+    "Tx Bytes": ("tx_bytes", parse_count),
+    "Rx Bytes": ("rx_bytes", parse_count),
+    "Tx Packets": ("tx_packets", parse_count),
+    "Rx Packets": ("rx_packets", parse_count),
+    "Lost Packets": ("lost_packets", parse_count),
+    "Pkt Lost Ratio": ("loss_ratio", parse_ratio),
+    "Mean{Delay}": ("mean_delay", parse_seconds),
+    "Mean{Jitter}": ("mean_jitter", parse_seconds),
+    "Throughput": ("throughput", parse_mbps),
+}
+DICTIONARY_COLUMNS = ("protocol", "source", "destination")
+COUNT_COLUMNS = ("tx_bytes", "rx_bytes", "tx_packets", "rx_packets", "lost_packets")
+FLOAT_COLUMNS = ("loss_ratio", "mean_delay", "mean_jitter", "throughput")
+
+def to_numpy(column, dtype):
+    return np.frombuffer(column, dtype=dtype) if len(column) else np.zeros(0, dtype=dtype)
+
+class ColumnIndex:
+    # Value index of one column built with a single sort. codes[row] is the position of
+    # the row's value in values (distinct keys ascending, None for missing last), and
+    # row_ids[offsets[code]:offsets[code + 1]] are the rows holding values[code], ascending.
+    def __init__(self, keys, missing, to_value):
+        distinct, codes = np.unique(keys[~missing], return_inverse=True)
+        self.codes = np.full(len(keys), len(distinct), dtype=np.int64)
+        self.codes[~missing] = codes.reshape(-1)
+        self.values = [to_value(key) for key in distinct.tolist()] + [None]
+        counts = np.bincount(self.codes, minlength=len(self.values))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.row_ids = np.argsort(self.codes, kind="stable")
+        self.lookup = {value: code for code, value in enumerate(self.values) if counts[code]}
+
+    def rows(self, code):
+        return self.row_ids[self.offsets[code]:self.offsets[code + 1]]
+
+class FlowLogTable:
+    # Columnar Instantaneous_Flow_Log: one row per (time, FlowID) block with the counters
+    # as int64 (-1 when missing), ratio, delay and jitter in seconds and throughput in
+    # Mbps as doubles (NaN when missing), and the flow's protocol and endpoints as
+    # DictionaryColumns. Each "Time:" section is a block of rows; its time and
+    # End-to-End Throughput are stored once per block and rows refer to it by index.
+    def __init__(self):
+        self.block_time = array('d')
+        self.end_to_end_throughput = array('d')
+        self.block = array('i')
+        self.flow_id = array('q')
+        self.protocol = DictionaryColumn('H')
+        self.source = DictionaryColumn()
+        self.destination = DictionaryColumn()
+        for name in COUNT_COLUMNS:
+            setattr(self, name, array('q'))
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, array('d'))
+        self.indexes = {}
+
+    def start_block(self, time):
+        self.block_time.append(time)
+        self.end_to_end_throughput.append(math.nan)
+
+    def start_flow(self, flow_id, protocol, source, destination):
+        if not self.block_time:
+            self.start_block(math.nan)
+        self.block.append(len(self.block_time) - 1)
+        self.flow_id.append(flow_id)
+        self.protocol.append(protocol)
+        self.source.append(source)
+        self.destination.append(destination)
+        for name in COUNT_COLUMNS:
+            getattr(self, name).append(-1)
+        for name in FLOAT_COLUMNS:
+            getattr(self, name).append(math.nan)
+
+    def time(self, row):
+        return self.block_time[self.block[row]]
+
+    def get_value(self, field, row):
+        # Python value of a column at row, None where the log had no value
+        if field == "time":
+            value = self.time(row)
+        elif field == "end_to_end_throughput":
+            value = self.end_to_end_throughput[self.block[row]]
+        else:
+            value = getattr(self, field)[row]
+        if field in COUNT_COLUMNS:
+            return None if value < 0 else value
+        if isinstance(value, float) and value != value:
+            return None
+        return value
+
+    def index(self, field):
+        # ColumnIndex of a field, built on first use; rows must not be added afterwards
+        index = self.indexes.get(field)
+        if index is None:
+            index = self.indexes[field] = self.build_index(field)
+        return index
+
+    def build_index(self, field):
+        if field in DICTIONARY_COLUMNS:
+            column = getattr(self, field)
+            keys = to_numpy(column.codes, column.codes.typecode)
+            return ColumnIndex(keys, keys == 0, column.values.__getitem__)
+        block = to_numpy(self.block, np.int32)
+        if field == "time":
+            keys = to_numpy(self.block_time, np.float64)[block]
+        elif field == "end_to_end_throughput":
+            keys = to_numpy(self.end_to_end_throughput, np.float64)[block]
+        else:
+            keys = to_numpy(getattr(self, field), np.float64 if field in FLOAT_COLUMNS else np.int64)
+        if field == "flow_id":
+            missing = np.zeros(len(keys), dtype=bool)
+        else:
+            missing = keys < 0 if field in COUNT_COLUMNS else np.isnan(keys)
+        return ColumnIndex(keys, missing, lambda key: key)
+
+    def distinct_values(self, field):
+        # Sorted distinct values of a column, leaving out missing ones
+        index = self.index(field)
+        return sorted(value for value in index.values[:-1] if value in index.lookup)
+
+    def select(self, filters):
+        # Rows matching every field == value pair in filters, as ascending row ids. The
+        # rows of the rarest value come straight from its index and are then checked
+        # against each other filter's per-row codes, so the cost follows the smallest
+        # match instead of the table size.
+        if not filters:
+            return range(len(self))
+        matches = []
+        for field, value in filters.items():
+            index = self.index(field)
+            code = index.lookup.get(value)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            matches.append((index.offsets[code + 1] - index.offsets[code], index, code))
+        matches.sort(key=lambda match: match[0])
+        _, index, code = matches[0]
+        rows = index.rows(code)
+        for _, index, code in matches[1:]:
+            rows = rows[index.codes[rows] == code]
+        return rows
+
+    def __len__(self):
+        return len(self.flow_id)
+
+    def __repr__(self):
+        return f"FlowLogTable(rows={len(self)}, blocks={len(self.block_time)})"
+
+def parse_flow_line(table, value):
+    # "<id> <protocol> <source> --> <destination>"
+    flow_id, protocol, endpoints = value.split(None, 2)
+    source, destination = endpoints.split(" --> ")
+    table.start_flow(int(flow_id), protocol, source.strip(), destination.strip())
+
+def read_flow_log(filename, progress_callback=None):
+    # Streams an Instantaneous_Flow_Log into a FlowLogTable, one line at a time, so memory
+    # is the numeric columns only. Each line is dispatched on the text before its first
+    # colon through a table bound to the columns; unrecognised lines are skipped and
+    # malformed ones reported.
+    table = FlowLogTable()
+    value_lines = {key: (getattr(table, column), converter) for key, (column, converter) in VALUE_LINES.items()}
+    total_bytes = os.path.getsize(filename) or 1
+    with open(filename, 'r', errors="replace") as file:
+        for line_number, line in enumerate(file, 1):
+            key, separator, value = line.partition(":")
+            key = key.strip()
+            try:
+                target = value_lines.get(key)
+                if target is not None:
+                    column, converter = target
+                    if len(column):
+                        column[-1] = converter(value)
+                    else:
+                        print(f"Ignoring line {line_number} outside a flow block: {line.strip()}")
+                elif not separator:
+                    pass
+                elif key == "FlowID":
+                    parse_flow_line(table, value)
+                elif key == "Time":
+                    table.start_block(parse_seconds(value))
+                elif key == "End-to-End Throughput":
+                    if table.block_time:
+                        table.end_to_end_throughput[-1] = parse_mbps(value)
+            except ValueError as e:
+                print(f"Error parsing line {line_number}: {e}")
+            if progress_callback and line_number % PROGRESS_INTERVAL == 0:
+                progress_callback(file.buffer.tell() / total_bytes * 100)
+    if progress_callback:
+        progress_callback(100)
+    return table
@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import time
+
+# Byte-range splitting and the worker pool are shared with the trace analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trace_Analyzer"))
+from trace_parser import map_byte_ranges, read_byte_range
+from instrumentation import DISABLED
+
+def parse_packet_flow_line(line):
+    # "App: <app>, Context: <context>, PacketID: <id>, SrcIP: <ip>, DstIP: <ip>"
+    parts = line.strip().split(", ")
+    app = parts[0].split(": ")[1]
+    context = parts[1].split(": ")[1]
+    packet_id = int(parts[2].split(": ")[1])
+    src_ip = parts[3].split(": ")[1]
+    dst_ip = parts[4].split(": ")[1]
+    return (packet_id, app, context, src_ip, dst_ip)
+
+def parse_byte_range_packets(source, start, end):
+    # Runs in a worker process; returns (lines, rows). Equal strings are shared so that
+    # pickle writes each application, context and address once per range, and the merged
+    # rows keep sharing them. Malformed lines are reported and skipped.
+    shared = {}
+    share = shared.setdefault
+    lines = io.StringIO(read_byte_range(source, start, end).decode(errors="replace"), newline=None).readlines()
+    rows = []
+    for i, line in enumerate(lines):
+        try:
+            packet_id, app, context, src_ip, dst_ip = parse_packet_flow_line(line)
+        except Exception as e:
+            print(f"Error parsing line {i} of byte range {start}-{end}: {e}")
+            continue
+        rows.append((packet_id, share(app, app), share(context, context), share(src_ip, src_ip), share(dst_ip, dst_ip)))
+    return len(lines), rows
+
+def read_packet_flow_log(file_path, progress_callback=None, max_workers=None, instrumentation=DISABLED):
+    # Rows of a packet_flow_log in file order. Byte ranges of the mapped file are parsed
+    # by a bounded process pool and merged in the order they were submitted, so the
+    # result is the same as parsing line by line. progress_callback gets (percent,
+    # elapsed, remaining) after each range, from the calling thread.
+    total_bytes = os.path.getsize(file_path) or 1
+    parsed_data = []
+    total_lines = 0
+    start_time = time.time()
+    for bytes_done, part in instrumentation.timed("read+parse", map_byte_ranges(file_path, parse_byte_range_packets, max_workers)):
+        if part is not None:
+            lines, rows = part
+            total_lines += lines
+            with instrumentation.stage("merge"):
+                parsed_data.extend(rows)
+        if progress_callback:
+            progress_percent = bytes_done / total_bytes * 100
+            elapsed_time = time.time() - start_time
+            estimated_total_time = elapsed_time / (bytes_done / total_bytes)
+            progress_callback(progress_percent, elapsed_time, estimated_total_time - elapsed_time)
+    instrumentation.count("lines", total_lines)
+    instrumentation.count("records", len(parsed_data))
+    instrumentation.count("lines failed", total_lines - len(parsed_data))
+    return parsed_data
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from flow_log_series import lttb_indices, minmax_indices, rolling_extrema, rolling_mean
+
+def reference_lttb(x, y, threshold):
+    # Textbook LTTB over the same bucket edges, one point at a time
+    edges = np.linspace(1, len(x) - 1, threshold - 1).astype(np.int64)
+    selected = [0]
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = np.mean(x[edges[bucket + 1]:edges[bucket + 2]])
+            next_y = np.mean(y[edges[bucket + 1]:edges[bucket + 2]])
+        else:
+            next_x, next_y = x[-1], y[-1]
+        previous = selected[-1]
+        areas = [abs((x[previous] - next_x) * (y[i] - y[previous]) - (x[previous] - x[i]) * (next_y - y[previous])) for i in range(start, stop)]
+        selected.append(start + int(np.argmax(areas)))
+    return np.array(selected + [len(x) - 1])
+
+def reference_window(times, values, window, reduce):
+    result = []
+    for t in times:
+        inside = values[(times > t - window) & (times <= t) & ~np.isnan(values)]
+        result.append(reduce(inside) if len(inside) else np.nan)
+    return np.array(result)
+
+class LttbIndicesTest(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = np.random.default_rng(1)
+        for count, threshold in ((10, 5), (100, 7), (1000, 50), (1001, 3)):
+            x = np.cumsum(rng.random(count))
+            y = rng.normal(size=count)
+            np.testing.assert_array_equal(lttb_indices(x, y, threshold), reference_lttb(x, y, threshold))
+
+    def test_last_bucket_mean_leaves_out_final_sample(self):
+        # With edges [1, 3, 6, 9] the last bucket is samples 6-8; a spike on the final
+        # sample must not pull the second bucket's choice towards it
+        x = np.arange(10, dtype=np.float64)
+        y = np.array([0, 0, 0, 0, 5, 0, 0, 0, 0, 100], dtype=np.float64)
+        np.testing.assert_array_equal(lttb_indices(x, y, 5), reference_lttb(x, y, 5))
+
+    def test_keeps_everything_below_threshold_and_drops_nan(self):
+        x = np.arange(6, dtype=np.float64)
+        y = np.array([1, np.nan, 3, 4, np.nan, 6])
+        np.testing.assert_array_equal(lttb_indices(x, y, 10), [0, 2, 3, 5])
+        y = np.where(np.arange(100) % 7 == 3, np.nan, np.sin(np.arange(100.0)))
+        indices = lttb_indices(np.arange(100.0), y, 20)
+        self.assertEqual(len(indices), 20)
+        self.assertFalse(np.isnan(y[indices]).any())
+        self.assertEqual((indices[0], indices[-1]), (0, 99))
+
+class MinmaxIndicesTest(unittest.TestCase):
+    def test_keeps_each_bucket_extremes(self):
+        rng = np.random.default_rng(2)
+        values = rng.normal(size=1003)
+        values[rng.integers(0, 1003, 50)] = np.nan
+        buckets = 40
+        indices = minmax_indices(values, buckets)
+        self.assertTrue((np.diff(indices) > 0).all())
+        self.assertEqual((indices[0], indices[-1]), (0, 1002))
+        size = -(-len(values) // buckets)
+        for start in range(0, len(values), size):
+            chunk = values[start:start + size]
+            self.assertIn(start + np.nanargmin(chunk), indices)
+            self.assertIn(start + np.nanargmax(chunk), indices)
+
+    def test_short_series_is_kept_whole(self):
+        np.testing.assert_array_equal(minmax_indices(np.arange(8.0), 4), np.arange(8))
+
+class RollingWindowTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.times = np.sort(rng.random(300) * 30)
+        self.values = rng.normal(size=300)
+        self.values[rng.integers(0, 300, 40)] = np.nan
+
+    def test_rolling_mean(self):
+        for window in (0.01, 1.0, 7.5, 100.0):
+            np.testing.assert_allclose(rolling_mean(self.times, self.values, window), reference_window(self.times, self.values, window, np.mean))
+
+    def test_rolling_extrema(self):
+        for window in (0.01, 1.0, 7.5, 100.0):
+            low, high = rolling_extrema(self.times, self.values, window)
+            np.testing.assert_array_equal(low, reference_window(self.times, self.values, window, np.min))
+            np.testing.assert_array_equal(high, reference_window(self.times, self.values, window, np.max))
+
+    def test_empty(self):
+        self.assertEqual(len(rolling_mean(np.zeros(0), np.zeros(0), 1.0)), 0)
+        low, high = rolling_extrema(np.zeros(0), np.zeros(0), 1.0)
+        self.assertEqual((len(low), len(high)), (0, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import math
+import os
+import sys
+import tempfile
+import unittest
+from flow_log_table import parse_mbps, parse_ratio, parse_seconds, read_flow_log
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import FLOWS, write_flow_log
+
+FLOW_LOG = """Time: 1
+FlowID: 1 UDP 10.1.1.1/49154 --> 10.1.1.2/9
+Tx Bytes: 2104
+Rx Bytes: 1052
+Tx Packets: 2
+Rx Packets: 1
+Lost Packets: 1
+Pkt Lost Ratio: 0.5
+Mean{Delay}: 12 ms
+Mean{Jitter}: 0.001
+Throughput: 8.416 Kbps
+FlowID: 2 TCP 10.1.1.3/49155 --> 10.1.1.2/80
+Tx Bytes: 100
+Throughput: garbage
+End-to-End Throughput: 1.5 Mbps
+Time: 2.5s
+FlowID: 1 UDP 10.1.1.1/49154 --> 10.1.1.2/9
+Rx Packets: 3
+FlowID: not a number
+"""
+
+class ReadFlowLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "flow_log.txt")
+        with open(self.path, 'w') as file:
+            file.write(FLOW_LOG)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_converters(self):
+        self.assertEqual(parse_ratio("25%"), 0.25)
+        self.assertAlmostEqual(parse_seconds(" 12 ms"), 0.012)
+        self.assertAlmostEqual(parse_mbps(" 500 Kbps"), 0.5)
+        self.assertTrue(math.isnan(parse_mbps("fast")))
+
+    def test_blocks_and_values(self):
+        table = read_flow_log(self.path)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.block_time.tolist(), [1.0, 2.5])
+        self.assertEqual(table.get_value("end_to_end_throughput", 0), 1.5)
+        self.assertIsNone(table.get_value("end_to_end_throughput", 2))
+        self.assertEqual([table.time(row) for row in range(3)], [1.0, 1.0, 2.5])
+        self.assertEqual(table.flow_id.tolist(), [1, 2, 1])
+        self.assertEqual([table.protocol[row] for row in range(3)], ["UDP", "TCP", "UDP"])
+        self.assertEqual(table.source[1], "10.1.1.3/49155")
+        self.assertEqual(table.destination[1], "10.1.1.2/80")
+        self.assertEqual([table.get_value("tx_bytes", row) for row in range(3)], [2104, 100, None])
+        self.assertEqual([table.get_value("rx_packets", row) for row in range(3)], [1, None, 3])
+        self.assertEqual(table.get_value("loss_ratio", 0), 0.5)
+        self.assertAlmostEqual(table.get_value("mean_delay", 0), 0.012)
+        self.assertAlmostEqual(table.get_value("throughput", 0), 0.008416)
+        self.assertIsNone(table.get_value("throughput", 1))
+
+    def test_select(self):
+        table = read_flow_log(self.path)
+        self.assertEqual(list(table.select({})), [0, 1, 2])
+        self.assertEqual(list(table.select({"flow_id": 1})), [0, 2])
+        self.assertEqual(list(table.select({"flow_id": 1, "time": 2.5})), [2])
+        self.assertEqual(list(table.select({"protocol": "TCP", "destination": "10.1.1.2/80"})), [1])
+        self.assertEqual(list(table.select({"flow_id": 1, "protocol": "TCP"})), [])
+        self.assertEqual(list(table.select({"flow_id": 7})), [])
+        # Missing values are indexed under None, but aren't distinct values
+        self.assertEqual(list(table.select({"rx_packets": None})), [1])
+        self.assertEqual(table.distinct_values("rx_packets"), [1, 3])
+        self.assertEqual(table.distinct_values("source"), ["10.1.1.1/49154", "10.1.1.3/49155"])
+
+    def test_generated_log(self):
+        path = os.path.join(self.directory.name, "generated.txt")
+        write_flow_log(path, 5 * FLOWS, seed=3)
+        table = read_flow_log(path)
+        self.assertEqual(len(table), 5 * FLOWS)
+        self.assertEqual(table.block_time.tolist(), [1.0, 2.0, 3.0, 4.0, 5.0])
+        for flow_id in (1, FLOWS):
+            rows = table.select({"flow_id": flow_id})
+            self.assertEqual([table.time(row) for row in rows], [1.0, 2.0, 3.0, 4.0, 5.0])
+            tx_packets = [table.tx_packets[row] for row in rows]
+            self.assertEqual(tx_packets, sorted(tx_packets))
+            self.assertTrue(all(table.tx_packets[row] - table.rx_packets[row] == table.lost_packets[row] for row in rows))
+        for time in (1.0, 3.0):
+            rows = table.select({"time": time})
+            self.assertEqual([table.flow_id[row] for row in rows], list(range(1, FLOWS + 1)))
+
+if __name__ == "__main__":
+    unittest.main()
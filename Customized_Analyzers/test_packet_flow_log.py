@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from packet_flow_log import parse_packet_flow_line, read_packet_flow_log
+import trace_parser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_packet_flow_log
+
+split_byte_ranges = trace_parser.split_byte_ranges
+
+def split_small_ranges(mapped):
+    # Many byte ranges out of a small file, so the worker pool's merge order is exercised
+    return split_byte_ranges(mapped, 4096)
+
+class ReadPacketFlowLogTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "packet_flow_log.txt")
+        write_packet_flow_log(cls.path, 3000, seed=4)
+        with open(cls.path) as file:
+            cls.expected = [parse_packet_flow_line(line) for line in file]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_parse_line(self):
+        line = "App: PacketSink, Context: /NodeList/3/ApplicationList/0/$ns3::PacketSink/Rx, PacketID: 42, SrcIP: 10.1.1.1, DstIP: 10.1.1.4\n"
+        self.assertEqual(parse_packet_flow_line(line), (42, "PacketSink", "/NodeList/3/ApplicationList/0/$ns3::PacketSink/Rx", "10.1.1.1", "10.1.1.4"))
+
+    def test_file_order(self):
+        self.assertEqual(read_packet_flow_log(self.path, max_workers=1), self.expected)
+        with mock.patch.object(trace_parser, "split_byte_ranges", split_small_ranges):
+            self.assertEqual(read_packet_flow_log(self.path, max_workers=1), self.expected)
+            self.assertEqual(read_packet_flow_log(self.path, max_workers=2), self.expected)
+
+    def test_progress(self):
+        progress = []
+        with mock.patch.object(trace_parser, "split_byte_ranges", split_small_ranges):
+            read_packet_flow_log(self.path, lambda *values: progress.append(values[0]), max_workers=2)
+        self.assertGreater(len(progress), 1)
+        self.assertEqual(progress, sorted(progress))
+        self.assertAlmostEqual(progress[-1], 100.0)
+
+    def test_malformed_lines_skipped(self):
+        path = os.path.join(self.directory.name, "malformed.txt")
+        with open(self.path) as source, open(path, 'w') as target:
+            lines = source.readlines()
+            target.writelines(lines[:10] + ["App: truncated\n", "\n"] + lines[10:20])
+        self.assertEqual(read_packet_flow_log(path, max_workers=1), self.expected[:20])
+
+if __name__ == "__main__":
+    unittest.main()
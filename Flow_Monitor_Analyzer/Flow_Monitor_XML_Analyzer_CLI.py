@@ -0,0 +1,89 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from flow_monitor_runs import DEFAULT_PERCENTILES, DEFAULT_RUN_CACHE_DIR, FLOW_KEY, METRICS, compare_flows, compare_scenario, expand_inputs, load_runs
+
+def scenario_path(pattern):
+    # "runs/scenA", "runs/scenA/*.xml" -> "runs/scenA"; "runs/a.xml" -> "runs/a"
+    path = os.path.normpath(pattern)
+    if os.path.isfile(path):
+        return os.path.splitext(path)[0]
+    while glob.has_magic(path):
+        path = os.path.dirname(path)
+    return path
+
+def scenario_names(patterns):
+    # Output names, the last path component of each scenario ("scenA", "a"). Names that
+    # collide, e.g. for a/flowmon.xml and b/flowmon.xml, are prefixed with their parent
+    # directory ("a_flowmon", "b_flowmon"), and any still equal get an index suffix.
+    paths = [scenario_path(pattern) for pattern in patterns]
+    names = [os.path.basename(path) or "scenario" for path in paths]
+    for name in set(names):
+        if names.count(name) > 1:
+            for i, path in enumerate(paths):
+                if names[i] == name:
+                    parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+                    names[i] = f"{parent}_{name}" if parent else name
+    for name in set(names):
+        if names.count(name) > 1:
+            matches = [i for i, other in enumerate(names) if other == name]
+            for number, i in enumerate(matches, 1):
+                names[i] = f"{name}_{number}"
+    return names
+
+def write_flows_csv(file_path, keys, runs, statistics):
+    names = [name for name in statistics[METRICS[0]] if name != "runs"]
+    with open(file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(list(FLOW_KEY) + ["runs"] + [f"{metric}_{name}" for metric in METRICS for name in names])
+        for row, key in enumerate(keys.tolist()):
+            values = [statistics[metric][name][row] for metric in METRICS for name in names]
+            writer.writerow(list(key) + [int(runs[row])] + ["" if value != value else value for value in values])
+
+def analyze_scenario(name, pattern, results, output_dir, percentiles):
+    summaries = [summary for _, summary in results if not isinstance(summary, Exception)]
+    report = {"scenario": name, "input": pattern, "runs": len(summaries),
+              "failed": [file_path for file_path, summary in results if isinstance(summary, Exception)]}
+    if summaries:
+        keys, runs, statistics = compare_flows(summaries, percentiles)
+        flows_path = os.path.join(output_dir, name + ".flows.csv")
+        write_flows_csv(flows_path, keys, runs, statistics)
+        report.update(flows=len(keys), flows_csv=flows_path, metrics=compare_scenario(summaries, percentiles))
+    with open(os.path.join(output_dir, name + ".json"), 'w') as file:
+        json.dump(report, file, indent=2)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare FlowMonitor XML results over many runs of one or more scenarios without the GUI.")
+    parser.add_argument("scenarios", nargs="+", help="one directory, glob or file of FlowMonitor XML runs per scenario")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--percentiles", nargs="+", type=float, default=DEFAULT_PERCENTILES, help="percentiles to report besides mean, std and 95%% confidence interval")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory for <scenario>.flows.csv and <scenario>.json")
+    parser.add_argument("--cache-dir", nargs="?", const=DEFAULT_RUN_CACHE_DIR, default=None, help="reuse parsed runs from this cache directory (default location if given without a value)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    inputs = [(pattern, expand_inputs(pattern)) for pattern in args.scenarios]
+    for pattern, file_paths in inputs:
+        if not file_paths:
+            print(f"No FlowMonitor XML files match {pattern}", file=sys.stderr)
+
+    # Every run of every scenario goes through one pool, then results are split back per scenario
+    results = iter(load_runs([file_path for _, file_paths in inputs for file_path in file_paths], args.workers, args.cache_dir))
+    succeeded = True
+    for name, (pattern, file_paths) in zip(scenario_names(args.scenarios), inputs):
+        scenario_results = [next(results) for _ in file_paths]
+        for file_path, summary in scenario_results:
+            if isinstance(summary, Exception):
+                print(f"Error analyzing {file_path}: {summary}", file=sys.stderr)
+        report = analyze_scenario(name, pattern, scenario_results, args.output_dir, args.percentiles)
+        print(json.dumps(report))
+        succeeded = succeeded and bool(file_paths) and not report["failed"]
+
+    return 0 if succeeded else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from array import array
+import numpy as np
+
+# ns-3 Time attributes are written as "+1.23e+09ns"; the unit suffix is optional
+TIME_PATTERN = re.compile(r"\s*([-+]?[0-9.]+(?:[eE][-+]?\d+)?)\s*(fs|ps|ns|us|ms|s|min|h|d)?\s*$")
+TIME_UNITS = {"fs": 1e-15, "ps": 1e-12, "ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1.0, "min": 60.0, "h": 3600.0, "d": 86400.0, None: 1e-9}
+
+HISTOGRAMS = ("delayHistogram", "jitterHistogram", "packetSizeHistogram", "flowInterruptionsHistogram")
+CLASSIFIERS = ("Ipv4FlowClassifier", "Ipv6FlowClassifier")
+
+# FlowStats/Flow attributes stored as seconds and as integers, with their column names
+TIME_ATTRIBUTES = (("timeFirstTxPacket", "time_first_tx"), ("timeFirstRxPacket", "time_first_rx"),
+                   ("timeLastTxPacket", "time_last_tx"), ("timeLastRxPacket", "time_last_rx"),
+                   ("delaySum", "delay_sum"), ("jitterSum", "jitter_sum"), ("lastDelay", "last_delay"))
+COUNT_ATTRIBUTES = (("txBytes", "tx_bytes"), ("rxBytes", "rx_bytes"), ("txPackets", "tx_packets"),
+                    ("rxPackets", "rx_packets"), ("lostPackets", "lost_packets"), ("timesForwarded", "times_forwarded"))
+
+# Flows between progress updates while streaming
+PROGRESS_INTERVAL = 1000
+
+def parse_ns3_time(text):
+    # Seconds, NaN when missing or unreadable; a bare number is taken as nanoseconds
+    match = TIME_PATTERN.match(text) if text else None
+    if match is None:
+        return np.nan
+    return float(match.group(1)) * TIME_UNITS[match.group(2)]
+
+def to_numpy(column):
+    return np.frombuffer(column, dtype=column.typecode) if len(column) else np.zeros(0, dtype=column.typecode)
+
+def divide(numerator, denominator):
+    # Element-wise numerator / denominator, NaN where denominator is not positive
+    result = np.full(len(numerator), np.nan)
+    valid = denominator > 0
+    np.divide(numerator, denominator, out=result, where=valid)
+    return result
+
+class RaggedColumns:
+    # A variable-length list of records per flow, stored as one set of flat arrays and
+    # offsets (CSR): flow row i owns entries offsets[i]:offsets[i + 1]. Used for histogram
+    # bins, where start, width and count are the fields.
+    def __init__(self, fields):
+        self.offsets = array('q', [0])
+        self.columns = {name: array(typecode) for name, typecode in fields}
+
+    def add_row(self, *values):
+        # One sequence of values per field, in field order
+        for column, field_values in zip(self.columns.values(), values):
+            column.extend(field_values)
+        self.offsets.append(len(column))
+
+    def finish(self):
+        self.offsets = to_numpy(self.offsets)
+        self.columns = {name: to_numpy(column) for name, column in self.columns.items()}
+
+    def __getitem__(self, row):
+        # {field: array} of one row's entries
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+class FlowMonitorModel:
+    # Every flow of a FlowMonitor XML file as NumPy columns, one row per FlowStats/Flow in
+    # file order: flow_id, times and delay sums in seconds, byte and packet counts, the
+    # classifier 5-tuple joined on flowId, and each histogram as RaggedColumns of bins.
+    # probes holds the FlowProbes statistics as columns of one row per (probe, flow).
+    # Built by read_flow_monitor; derived metrics are vectorized over all flows.
+    def __init__(self):
+        self.flow_id = array('q')
+        for _, name in TIME_ATTRIBUTES:
+            setattr(self, name, array('d'))
+        for _, name in COUNT_ATTRIBUTES:
+            setattr(self, name, array('q'))
+        self.packets_dropped = array('q')
+        self.bytes_dropped = array('q')
+        self.histograms = {name: RaggedColumns((("start", 'd'), ("width", 'd'), ("count", 'q'))) for name in HISTOGRAMS}
+        self.classifier = {"flow_id": array('q'), "source_address": [], "destination_address": [],
+                           "protocol": array('q'), "source_port": array('q'), "destination_port": array('q')}
+        self.probes = {"probe": array('q'), "flow_id": array('q'), "packets": array('q'), "bytes": array('q'),
+                       "delay_from_first_probe_sum": array('d'), "packets_dropped": array('q'), "bytes_dropped": array('q')}
+
+    def add_flow(self, flow_elem):
+        attributes = flow_elem.attrib
+        self.flow_id.append(int(attributes.get("flowId", -1)))
+        for attribute, name in TIME_ATTRIBUTES:
+            getattr(self, name).append(parse_ns3_time(attributes.get(attribute)))
+        for attribute, name in COUNT_ATTRIBUTES:
+            getattr(self, name).append(int(attributes.get(attribute, 0)))
+        self.packets_dropped.append(sum(int(child.get("number", 0)) for child in flow_elem.iter("packetsDropped")))
+        self.bytes_dropped.append(sum(int(child.get("bytes", child.get("number", 0))) for child in flow_elem.iter("bytesDropped")))
+        for name, histogram in self.histograms.items():
+            histogram_elem = flow_elem.find(name)
+            bins = [] if histogram_elem is None else histogram_elem.findall("bin")
+            histogram.add_row([float(bin_elem.get("start", 0)) for bin_elem in bins],
+                              [float(bin_elem.get("width", 0)) for bin_elem in bins],
+                              [int(bin_elem.get("count", 0)) for bin_elem in bins])
+
+    def add_classifier_flow(self, flow_elem):
+        attributes = flow_elem.attrib
+        classifier = self.classifier
+        classifier["flow_id"].append(int(attributes.get("flowId", -1)))
+        classifier["source_address"].append(attributes.get("sourceAddress"))
+        classifier["destination_address"].append(attributes.get("destinationAddress"))
+        classifier["protocol"].append(int(attributes.get("protocol", -1)))
+        classifier["source_port"].append(int(attributes.get("sourcePort", -1)))
+        classifier["destination_port"].append(int(attributes.get("destinationPort", -1)))
+
+    def add_probe_flow(self, probe, stats_elem):
+        attributes = stats_elem.attrib
+        probes = self.probes
+        probes["probe"].append(probe)
+        probes["flow_id"].append(int(attributes.get("flowId", -1)))
+        probes["packets"].append(int(attributes.get("packets", 0)))
+        probes["bytes"].append(int(attributes.get("bytes", 0)))
+        probes["delay_from_first_probe_sum"].append(parse_ns3_time(attributes.get("delayFromFirstProbeSum")))
+        probes["packets_dropped"].append(sum(int(child.get("number", 0)) for child in stats_elem.iter("packetsDropped")))
+        probes["bytes_dropped"].append(sum(int(child.get("bytes", child.get("number", 0))) for child in stats_elem.iter("bytesDropped")))
+
+    def finish(self):
+        # Converts the columns to NumPy and joins the classifier tuples onto the flows;
+        # flows the classifier doesn't know get None addresses and -1 protocol and ports
+        self.flow_id = to_numpy(self.flow_id)
+        for _, name in TIME_ATTRIBUTES + COUNT_ATTRIBUTES:
+            setattr(self, name, to_numpy(getattr(self, name)))
+        self.packets_dropped = to_numpy(self.packets_dropped)
+        self.bytes_dropped = to_numpy(self.bytes_dropped)
+        for histogram in self.histograms.values():
+            histogram.finish()
+        self.probes = {name: to_numpy(column) for name, column in self.probes.items()}
+
+        classifier = self.classifier
+        classifier_ids = to_numpy(classifier["flow_id"])
+        order = np.argsort(classifier_ids, kind="stable")
+        position = np.minimum(np.searchsorted(classifier_ids[order], self.flow_id), max(len(order) - 1, 0))
+        matched = classifier_ids[order][position] == self.flow_id if len(order) else np.zeros(len(self.flow_id), dtype=bool)
+        rows = order[position] if len(order) else position
+        for name in ("source_address", "destination_address"):
+            values = np.array(classifier[name] + [None], dtype=object)
+            setattr(self, name, values[np.where(matched, rows, len(values) - 1)])
+        for name in ("protocol", "source_port", "destination_port"):
+            values = np.append(to_numpy(classifier[name]), -1)
+            setattr(self, name, values[np.where(matched, rows, len(values) - 1)])
+        self.classifier = None
+
+    def duration(self):
+        # Active interval of each flow, first transmit to last receive, in seconds; NaN
+        # for flows that received nothing
+        return np.where(self.rx_packets > 0, self.time_last_rx - self.time_first_tx, np.nan)
+
+    def throughput_bps(self):
+        return divide(self.rx_bytes * 8.0, self.duration())
+
+    def mean_delay(self):
+        return divide(self.delay_sum, self.rx_packets)
+
+    def mean_jitter(self):
+        # jitterSum accumulates over consecutive received packets, one fewer than rxPackets
+        return divide(self.jitter_sum, self.rx_packets - 1)
+
+    def loss_ratio(self):
+        return divide(self.lost_packets.astype(np.float64), self.tx_packets)
+
+    def mean_hop_count(self):
+        return 1.0 + divide(self.times_forwarded.astype(np.float64), self.rx_packets)
+
+    def metrics(self):
+        # {metric name: array indexed by flow row}
+        return {
+            "duration_s": self.duration(),
+            "throughput_bps": self.throughput_bps(),
+            "mean_delay_s": self.mean_delay(),
+            "mean_jitter_s": self.mean_jitter(),
+            "loss_ratio": self.loss_ratio(),
+            "mean_hop_count": self.mean_hop_count(),
+        }
+
+    def run_metrics(self):
+        # Whole-run figures with the same names: total received bits over the run's first
+        # transmit to last receive, and delay, jitter and loss weighted by packets
+        received = self.rx_packets > 0
+        duration = np.nanmax(self.time_last_rx[received]) - np.nanmin(self.time_first_tx) if received.any() else np.nan
+        rx_packets = self.rx_packets.sum()
+        jitter_intervals = (self.rx_packets[received] - 1).sum()
+        tx_packets = self.tx_packets.sum()
+        return {
+            "throughput_bps": self.rx_bytes.sum() * 8.0 / duration if duration > 0 else np.nan,
+            "mean_delay_s": self.delay_sum[received].sum() / rx_packets if rx_packets > 0 else np.nan,
+            "mean_jitter_s": self.jitter_sum[received].sum() / jitter_intervals if jitter_intervals > 0 else np.nan,
+            "loss_ratio": self.lost_packets.sum() / tx_packets if tx_packets > 0 else np.nan,
+        }
+
+    def __len__(self):
+        return len(self.flow_id)
+
+    def __repr__(self):
+        return f"FlowMonitorModel(flows={len(self)}, probe_records={len(self.probes['probe'])})"
+
+def read_flow_monitor(filename, progress_callback=None):
+    # Streams a FlowMonitor XML file into a FlowMonitorModel. Each child of FlowStats, the
+    # classifier and FlowProbes is read when it ends and then freed with everything inside
+    # it, so memory is about one flow's histograms plus the columns. progress_callback
+    # receives the percentage of the file read.
+    model = FlowMonitorModel()
+    total_bytes = os.path.getsize(filename) or 1
+    flows = 0
+    with open(filename, 'rb') as file:
+        path = []
+        for event, elem in ET.iterparse(file, events=("start", "end")):
+            if event == "start":
+                path.append(elem)
+                continue
+            path.pop()
+            if len(path) == 2:
+                section = path[1].tag
+                if section == "FlowStats" and elem.tag == "Flow":
+                    model.add_flow(elem)
+                    flows += 1
+                    if progress_callback and flows % PROGRESS_INTERVAL == 0:
+                        progress_callback(file.tell() / total_bytes * 100)
+                elif section in CLASSIFIERS and elem.tag == "Flow":
+                    model.add_classifier_flow(elem)
+                elif section == "FlowProbes" and elem.tag == "FlowProbe":
+                    probe = int(elem.get("index", -1))
+                    for stats_elem in elem.iter("FlowStats"):
+                        model.add_probe_flow(probe, stats_elem)
+                path[1].clear()
+    model.finish()
+    if progress_callback:
+        progress_callback(100)
+    return model
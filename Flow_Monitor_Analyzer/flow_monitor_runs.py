@@ -0,0 +1,171 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from flow_monitor_model import divide, read_flow_monitor
+
+# Shared file identity checks live with the trace analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Trace_Analyzer"))
+from trace_cache import file_identity
+
+RUN_CACHE_VERSION = 1
+RUN_CACHE_SUFFIX = ".flowmon.npz"
+DEFAULT_RUN_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "ns3-utilities", "flowmon")
+
+# Classifier 5-tuple that identifies the same flow across runs of a scenario
+FLOW_KEY = ("source_address", "destination_address", "protocol", "source_port", "destination_port")
+METRICS = ("throughput_bps", "mean_delay_s", "mean_jitter_s", "loss_ratio")
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Two-sided 95% Student t critical values for 1..30 degrees of freedom
+T_CRITICAL_95 = np.array([12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                          2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                          2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042])
+
+def expand_inputs(pattern):
+    # FlowMonitor XML files of one scenario: a directory's *.xml, a glob, or a single file
+    if os.path.isdir(pattern):
+        return sorted(glob.glob(os.path.join(pattern, "*.xml")))
+    return sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else [])
+
+def t_critical(degrees):
+    # Vectorized t quantile for a 95% interval; beyond the table a Cornish-Fisher
+    # expansion around the normal quantile is accurate to three decimals
+    degrees = np.asarray(degrees, dtype=np.float64)
+    z = 1.959964
+    large = np.maximum(degrees, 1)
+    expansion = z + (z ** 3 + z) / (4 * large) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * large ** 2)
+    table = T_CRITICAL_95[np.clip(degrees, 1, len(T_CRITICAL_95)).astype(np.int64) - 1]
+    return np.where(degrees < 1, np.nan, np.where(degrees <= len(T_CRITICAL_95), table, expansion))
+
+def grouped_statistics(groups, values, group_count, percentiles=DEFAULT_PERCENTILES):
+    # {statistic: array indexed by group} over values, leaving out NaN: runs, mean, std,
+    # ci95 (half-width of the 95% confidence interval of the mean) and p<N> percentiles
+    # with linear interpolation. One sort and a few bincounts for all groups.
+    valid = ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    count = np.bincount(groups, minlength=group_count)[:group_count]
+    mean = divide(np.bincount(groups, weights=values, minlength=group_count)[:group_count], count)
+    squares = np.bincount(groups, weights=(values - mean[groups]) ** 2, minlength=group_count)[:group_count]
+    std = np.sqrt(divide(squares, count - 1))
+    with np.errstate(invalid="ignore"):
+        statistics = {"runs": count, "mean": mean, "std": std, "ci95": t_critical(count - 1) * std / np.sqrt(count)}
+    starts = np.cumsum(count) - count
+    present = count > 0
+    for percentile in percentiles:
+        position = np.where(present, starts + (count - 1) * percentile / 100.0, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        if len(values):
+            value = values[low] + (values[high] - values[low]) * (position - low)
+        else:
+            value = np.zeros(group_count)
+        statistics[f"p{percentile:g}"] = np.where(present, value, np.nan)
+    return statistics
+
+def run_summary(model):
+    # What a run contributes to the comparison: the flow keys, per-flow metrics and
+    # whole-run metrics, as plain arrays that pickle and cache compactly
+    flow_metrics = model.metrics()
+    run_metrics = model.run_metrics()
+    summary = {"flow_id": model.flow_id}
+    summary["source_address"] = np.array([address or "" for address in model.source_address], dtype=str)
+    summary["destination_address"] = np.array([address or "" for address in model.destination_address], dtype=str)
+    for name in FLOW_KEY[2:]:
+        summary[name] = getattr(model, name)
+    for name in METRICS:
+        summary[name] = flow_metrics[name]
+        summary[f"run_{name}"] = np.array(run_metrics[name])
+    return summary
+
+class RunCache:
+    # Per-file run summaries as compressed .npz files, named after the XML path and only
+    # reused while its size, mtime and content hash are unchanged
+    def __init__(self, cache_dir=DEFAULT_RUN_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def cache_path(self, file_path):
+        name = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, name + RUN_CACHE_SUFFIX)
+
+    def load(self, file_path, identity):
+        cache_path = self.cache_path(file_path)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as data:
+                header = json.loads(str(data["header"]))
+                if header != dict(identity, version=RUN_CACHE_VERSION):
+                    return None
+                return {name: data[name] for name in data.files if name != "header"}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable cache entry {cache_path}: {e}", file=sys.stderr)
+            return None
+
+    def store(self, file_path, summary, identity):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = self.cache_path(file_path)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(temp_path, header=np.array(json.dumps(dict(identity, version=RUN_CACHE_VERSION))), **summary)
+        os.replace(temp_path, cache_path)
+
+def load_run(file_path, cache_dir=None):
+    # Runs in a worker process: the cached summary if still valid, else parse and store it
+    if not cache_dir:
+        return run_summary(read_flow_monitor(file_path))
+    cache = RunCache(cache_dir)
+    identity = file_identity(file_path)
+    summary = cache.load(file_path, identity)
+    if summary is None:
+        summary = run_summary(read_flow_monitor(file_path))
+        try:
+            cache.store(file_path, summary, identity)
+        except OSError as e:
+            print(f"Could not write run cache: {e}", file=sys.stderr)
+    return summary
+
+def load_runs(file_paths, max_workers=None, cache_dir=None):
+    # (file path, summary or the exception it raised) in file order, parsed in parallel
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(file_path, executor.submit(load_run, file_path, cache_dir)) for file_path in file_paths]
+        results = []
+        for file_path, future in futures:
+            try:
+                results.append((file_path, future.result()))
+            except Exception as e:
+                results.append((file_path, e))
+        return results
+
+def compare_flows(summaries, percentiles=DEFAULT_PERCENTILES):
+    # Flows of several runs of one scenario aligned on their 5-tuple. Returns
+    # (keys, runs, {metric: statistics}) where keys is a structured array of the distinct
+    # 5-tuples, runs the number of runs each flow appears in, and each statistic is an
+    # array in the same order.
+    if not summaries:
+        return np.zeros(0), np.zeros(0, dtype=np.int64), {}
+    keys = np.concatenate([np.rec.fromarrays([summary[name] for name in FLOW_KEY], names=FLOW_KEY) for summary in summaries])
+    distinct, groups = np.unique(keys, return_inverse=True)
+    groups = groups.reshape(-1)
+    run_index = np.repeat(np.arange(len(summaries)), [len(summary["flow_id"]) for summary in summaries])
+    present = np.unique(groups * len(summaries) + run_index) // len(summaries)
+    runs = np.bincount(present, minlength=len(distinct))
+    statistics = {}
+    for name in METRICS:
+        values = np.concatenate([summary[name] for summary in summaries]).astype(np.float64)
+        statistics[name] = grouped_statistics(groups, values, len(distinct), percentiles)
+    return distinct, runs, statistics
+
+def compare_scenario(summaries, percentiles=DEFAULT_PERCENTILES):
+    # {metric: {statistic: value}} of the whole-run metrics across runs
+    groups = np.zeros(len(summaries), dtype=np.int64)
+    comparison = {}
+    for name in METRICS:
+        values = np.array([float(summary[f"run_{name}"]) for summary in summaries], dtype=np.float64)
+        statistics = grouped_statistics(groups, values, 1, percentiles)
+        comparison[name] = {statistic: value[0].item() if value[0] == value[0] else None for statistic, value in statistics.items()}
+    return comparison
@@ -0,0 +1,210 @@
+import math
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from flow_monitor_model import parse_ns3_time, read_flow_monitor
+from flow_monitor_runs import FLOW_KEY, METRICS, T_CRITICAL_95, RunCache, compare_flows, compare_scenario, grouped_statistics, load_runs, run_summary
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_flow_monitor_xml
+
+# Two flows, the second unknown to the classifier and without receives
+FLOW_MONITOR_XML = """<?xml version="1.0" ?>
+<FlowMonitor>
+  <FlowStats>
+    <Flow flowId="1" timeFirstTxPacket="+1e+09ns" timeFirstRxPacket="+1.01e+09ns" timeLastTxPacket="+3e+09ns" timeLastRxPacket="+3.01e+09ns"
+          delaySum="+1e+08ns" jitterSum="+9e+06ns" lastDelay="+1e+07ns" txBytes="12000" rxBytes="10000" txPackets="12" rxPackets="10" lostPackets="2" timesForwarded="5">
+      <delayHistogram nBins="2" >
+        <bin index="0" start="0" width="0.001" count="4" />
+        <bin index="1" start="0.001" width="0.001" count="6" />
+      </delayHistogram>
+      <packetsDropped reasonCode="3" number="1" />
+      <packetsDropped reasonCode="4" number="1" />
+      <bytesDropped reasonCode="3" bytes="1000" />
+    </Flow>
+    <Flow flowId="2" timeFirstTxPacket="+2s" timeLastTxPacket="+4s" delaySum="+0ns" jitterSum="+0ns" lastDelay="+0ns"
+          txBytes="500" rxBytes="0" txPackets="5" rxPackets="0" lostPackets="5" timesForwarded="0">
+    </Flow>
+  </FlowStats>
+  <Ipv4FlowClassifier>
+    <Flow flowId="1" sourceAddress="10.1.1.1" destinationAddress="10.1.1.2" protocol="17" sourcePort="49153" destinationPort="9" />
+  </Ipv4FlowClassifier>
+  <FlowProbes>
+    <FlowProbe index="0">
+      <FlowStats  flowId="1" packets="12" bytes="12000" delayFromFirstProbeSum="+0ns" >
+        <packetsDropped reasonCode="3" number="2" />
+      </FlowStats>
+    </FlowProbe>
+  </FlowProbes>
+</FlowMonitor>
+"""
+
+class ReadFlowMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "flowmon.xml")
+        with open(self.path, 'w') as file:
+            file.write(FLOW_MONITOR_XML)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parse_ns3_time(self):
+        self.assertAlmostEqual(parse_ns3_time("+1.5e+09ns"), 1.5)
+        self.assertAlmostEqual(parse_ns3_time("+2s"), 2.0)
+        self.assertAlmostEqual(parse_ns3_time("250ms"), 0.25)
+        self.assertAlmostEqual(parse_ns3_time("1000"), 1e-6)
+        self.assertTrue(math.isnan(parse_ns3_time(None)))
+        self.assertTrue(math.isnan(parse_ns3_time("soon")))
+
+    def test_columns(self):
+        model = read_flow_monitor(self.path)
+        self.assertEqual(len(model), 2)
+        self.assertEqual(model.flow_id.tolist(), [1, 2])
+        np.testing.assert_allclose(model.time_first_tx, [1.0, 2.0])
+        self.assertTrue(math.isnan(model.time_first_rx[1]))
+        self.assertEqual(model.rx_bytes.tolist(), [10000, 0])
+        self.assertEqual(model.packets_dropped.tolist(), [2, 0])
+        self.assertEqual(model.bytes_dropped.tolist(), [1000, 0])
+
+    def test_classifier_join(self):
+        model = read_flow_monitor(self.path)
+        self.assertEqual(model.source_address.tolist(), ["10.1.1.1", None])
+        self.assertEqual(model.destination_address.tolist(), ["10.1.1.2", None])
+        self.assertEqual(model.protocol.tolist(), [17, -1])
+        self.assertEqual(model.source_port.tolist(), [49153, -1])
+        self.assertEqual(model.destination_port.tolist(), [9, -1])
+
+    def test_histograms_and_probes(self):
+        model = read_flow_monitor(self.path)
+        delays = model.histograms["delayHistogram"]
+        self.assertEqual(delays[0]["count"].tolist(), [4, 6])
+        np.testing.assert_allclose(delays[0]["start"], [0.0, 0.001])
+        self.assertEqual(len(delays[1]["count"]), 0)
+        self.assertEqual(len(model.histograms["jitterHistogram"][0]["count"]), 0)
+        self.assertEqual(model.probes["flow_id"].tolist(), [1])
+        self.assertEqual(model.probes["packets_dropped"].tolist(), [2])
+
+    def test_metrics(self):
+        metrics = read_flow_monitor(self.path).metrics()
+        self.assertAlmostEqual(metrics["duration_s"][0], 2.01)
+        self.assertAlmostEqual(metrics["throughput_bps"][0], 80000 / 2.01)
+        self.assertAlmostEqual(metrics["mean_delay_s"][0], 0.01)
+        self.assertAlmostEqual(metrics["mean_jitter_s"][0], 0.001)
+        self.assertAlmostEqual(metrics["loss_ratio"][0], 2 / 12)
+        self.assertAlmostEqual(metrics["mean_hop_count"][0], 1.5)
+        self.assertAlmostEqual(metrics["loss_ratio"][1], 1.0)
+        for name in ("duration_s", "throughput_bps", "mean_delay_s", "mean_jitter_s", "mean_hop_count"):
+            self.assertTrue(math.isnan(metrics[name][1]), name)
+
+    def test_run_metrics(self):
+        metrics = read_flow_monitor(self.path).run_metrics()
+        self.assertAlmostEqual(metrics["throughput_bps"], 80000 / 2.01)
+        self.assertAlmostEqual(metrics["mean_delay_s"], 0.01)
+        self.assertAlmostEqual(metrics["loss_ratio"], 7 / 17)
+
+    def test_generated_file(self):
+        path = os.path.join(self.directory.name, "generated.xml")
+        write_flow_monitor_xml(path, 300, seed=1)
+        model = read_flow_monitor(path)
+        self.assertEqual(model.flow_id.tolist(), list(range(1, 301)))
+        self.assertTrue(all(address is not None for address in model.source_address))
+        self.assertEqual((model.tx_packets - model.rx_packets).tolist(), model.lost_packets.tolist())
+        self.assertEqual(sorted(model.probes["flow_id"].tolist()), list(range(1, 301)))
+
+class GroupedStatisticsTest(unittest.TestCase):
+    def test_matches_numpy(self):
+        rng = np.random.default_rng(2)
+        groups = rng.integers(0, 6, 200)
+        values = rng.normal(10.0, 3.0, 200)
+        values[rng.random(200) < 0.1] = np.nan
+        # Group 5 has a single value and group 6 none
+        groups[groups == 5] = 4
+        groups[0], values[0] = 5, 1.0
+        statistics = grouped_statistics(groups, values, 7, (5, 50, 95))
+        for group in range(7):
+            selected = values[(groups == group) & ~np.isnan(values)]
+            self.assertEqual(statistics["runs"][group], len(selected))
+            if len(selected) == 0:
+                for name in ("mean", "std", "ci95", "p50"):
+                    self.assertTrue(math.isnan(statistics[name][group]), (group, name))
+                continue
+            self.assertAlmostEqual(statistics["mean"][group], selected.mean())
+            for percentile in (5, 50, 95):
+                self.assertAlmostEqual(statistics[f"p{percentile}"][group], np.percentile(selected, percentile))
+            if len(selected) == 1:
+                self.assertTrue(math.isnan(statistics["std"][group]))
+                continue
+            std = selected.std(ddof=1)
+            self.assertAlmostEqual(statistics["std"][group], std)
+            degrees = len(selected) - 1
+            if degrees <= len(T_CRITICAL_95):
+                self.assertAlmostEqual(statistics["ci95"][group], T_CRITICAL_95[degrees - 1] * std / math.sqrt(len(selected)))
+
+class CompareFlowsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.paths = []
+        for seed, records in ((1, 40), (1, 40), (2, 40), (1, 20)):
+            cls.paths.append(os.path.join(cls.directory.name, f"run{len(cls.paths)}.xml"))
+            write_flow_monitor_xml(cls.paths[-1], records, seed)
+        cls.summaries = [run_summary(read_flow_monitor(path)) for path in cls.paths]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def reference(self, summaries):
+        # {5-tuple: {metric: [value per run it appears in]}}
+        flows = {}
+        for summary in summaries:
+            for row in range(len(summary["flow_id"])):
+                key = tuple(summary[name][row].item() for name in FLOW_KEY)
+                values = flows.setdefault(key, {name: [] for name in METRICS})
+                for name in METRICS:
+                    values[name].append(summary[name][row])
+        return flows
+
+    def test_aligned_on_five_tuple(self):
+        keys, runs, statistics = compare_flows(self.summaries)
+        flows = self.reference(self.summaries)
+        self.assertEqual(len(keys), len(flows))
+        for row, key in enumerate(keys.tolist()):
+            values = flows[tuple(key)]
+            self.assertEqual(runs[row], len(values["throughput_bps"]))
+            for name in METRICS:
+                present = [value for value in values[name] if not math.isnan(value)]
+                self.assertEqual(statistics[name]["runs"][row], len(present))
+                if present:
+                    self.assertAlmostEqual(statistics[name]["mean"][row], np.mean(present), msg=(key, name))
+        # Identical runs agree exactly
+        keys, runs, statistics = compare_flows(self.summaries[:2])
+        self.assertTrue((runs == 2).all())
+        np.testing.assert_array_equal(np.nan_to_num(statistics["throughput_bps"]["std"]), 0.0)
+
+    def test_no_runs(self):
+        keys, runs, statistics = compare_flows([])
+        self.assertEqual((len(keys), len(runs), statistics), (0, 0, {}))
+
+    def test_compare_scenario(self):
+        comparison = compare_scenario(self.summaries)
+        values = [float(summary["run_throughput_bps"]) for summary in self.summaries]
+        self.assertEqual(comparison["throughput_bps"]["runs"], 4)
+        self.assertAlmostEqual(comparison["throughput_bps"]["mean"], np.mean(values))
+        self.assertAlmostEqual(comparison["throughput_bps"]["p50"], np.median(values))
+
+    def test_load_runs_cache(self):
+        cache_dir = os.path.join(self.directory.name, "cache")
+        results = load_runs(self.paths[:2] + [os.path.join(self.directory.name, "missing.xml")], max_workers=1, cache_dir=cache_dir)
+        self.assertIsInstance(results[2][1], Exception)
+        cache = RunCache(cache_dir)
+        self.assertTrue(all(os.path.exists(cache.cache_path(path)) for path in self.paths[:2]))
+        cached = load_runs(self.paths[:1], max_workers=1, cache_dir=cache_dir)[0][1]
+        for name, values in self.summaries[0].items():
+            np.testing.assert_array_equal(cached[name], values, err_msg=name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from trace_parser import TRACE_FIELDS, display_node, strip_trace_suffix
+from trace_table import read_trace_table
+from trace_cache import DEFAULT_CACHE_DIR, TraceCache, read_trace_table_cached
+from trace_metrics import TraceMetrics
+from trace_correlation import DEFAULT_MAX_IN_FLIGHT, table_delays
+from trace_export import COLUMNAR_SUFFIX, export_columnar, export_csv
+from instrumentation import Instrumentation
+
+OUTPUT_FORMATS = ("csv", "columnar", "summary", "metrics", "delays")
+DELAY_HEADERS = ["Time", "Node", "Source IP", "Destination IP", "Hop Delay", "End-to-End Delay"]
+
+def parse_filter(text):
+    # "field=value"; node also accepts the N<number> form shown in the GUI
+    field, separator, value = text.partition("=")
+    if not separator or field not in TRACE_FIELDS:
+        raise argparse.ArgumentTypeError(f"expected field=value with field one of {', '.join(TRACE_FIELDS)}")
+    try:
+        if field == "node" and value.startswith("N"):
+            return field, int(value[1:]) - 1
+        if field in ("node", "device"):
+            return field, int(value)
+        if field == "time":
+            return field, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid {field} value: {value}")
+    return field, value
+
+def parse_node_address(text):
+    # "address=node", with node as in a node filter
+    address, separator, node = text.partition("=")
+    if not separator or not address:
+        raise argparse.ArgumentTypeError("expected address=node, e.g. 10.1.1.3=N3")
+    return address, parse_filter("node=" + node)[1]
+
+def output_names(file_paths):
+    # Output file names, each trace's name without its suffixes ("trace" for
+    # runs/a/trace.tr.gz). Names that collide, e.g. for runs/a/trace.tr and
+    # runs/b/trace.tr, are prefixed with their parent directory ("a_trace", "b_trace"),
+    # and any still equal get an index suffix.
+    names = [strip_trace_suffix(os.path.basename(file_path)) for file_path in file_paths]
+    for name in set(names):
+        if names.count(name) > 1:
+            for i, file_path in enumerate(file_paths):
+                if names[i] == name:
+                    parent = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+                    names[i] = f"{parent}_{name}" if parent else name
+    for name in set(names):
+        if names.count(name) > 1:
+            matches = [i for i, other in enumerate(names) if other == name]
+            for number, i in enumerate(matches, 1):
+                names[i] = f"{name}_{number}"
+    return names
+
+def summarize(table, rows):
+    return {
+        "rows": len(rows),
+        "first_time": table.get_value("time", rows[0]) if len(rows) else None,
+        "last_time": table.get_value("time", rows[-1]) if len(rows) else None,
+        "events": dict(Counter(table.event_type[row] for row in rows)),
+        "nodes": len({table.node[row] for row in rows} - {-1}),
+    }
+
+def write_delays_csv(table, rows, file_path, max_in_flight=DEFAULT_MAX_IN_FLIGHT, node_addresses=None):
+    # Matched receive events among the selected rows; the end-to-end delay is only set on
+    # arrivals at the destination, whose node is learned when it sends or given in
+    # node_addresses. Delays are correlated over the whole trace so that filtering on the
+    # receiving node still finds the transmits elsewhere.
+    hop_delay, end_to_end_delay = table_delays(table, max_in_flight, node_addresses=node_addresses)
+    delays = {"hop_delay_s": [], "end_to_end_delay_s": []}
+    with open(file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(DELAY_HEADERS)
+        for row in rows:
+            hop = hop_delay[row] if hop_delay[row] == hop_delay[row] else None
+            end_to_end = end_to_end_delay[row] if end_to_end_delay[row] == end_to_end_delay[row] else None
+            if hop is None and end_to_end is None:
+                continue
+            writer.writerow([table.get_value("time", row), display_node(table.get_value("node", row)), table.src_ip[row], table.dst_ip[row], hop, end_to_end])
+            if hop is not None:
+                delays["hop_delay_s"].append(hop)
+            if end_to_end is not None:
+                delays["end_to_end_delay_s"].append(end_to_end)
+    return {name: {"matched": len(values), "mean": sum(values) / len(values) if values else None, "max": max(values, default=None)} for name, values in delays.items()}
+
+def analyze_trace(file_path, filters, output_format, base, max_workers=None, cache_dir=None, bin_width=1.0, max_in_flight=DEFAULT_MAX_IN_FLIGHT, time_range=None, profile=False, cprofile=False, lazy_headers=False, node_addresses=None):
+    # Output files are written as base + a format suffix
+    instrumentation = Instrumentation(os.path.basename(base), enabled=profile or cprofile, cprofile=cprofile)
+    instrumentation.start_profile()
+    if cache_dir:
+        table = read_trace_table_cached(file_path, max_workers=max_workers, cache=TraceCache(cache_dir), instrumentation=instrumentation, lazy_headers=lazy_headers)
+    else:
+        table = read_trace_table(file_path, max_workers=max_workers, instrumentation=instrumentation, lazy_headers=lazy_headers)
+    try:
+        with instrumentation.stage("filter"):
+            rows = table.select(filters, time_range)
+            summary = dict(trace=file_path, **summarize(table, rows))
+
+        with instrumentation.stage("output"):
+            write_output(table, rows, summary, output_format, base, bin_width, max_in_flight, time_range, node_addresses)
+    finally:
+        table.close()
+    instrumentation.stop_profile()
+    if instrumentation.enabled:
+        summary["profile"] = instrumentation.write_report(base + ".profile.json")
+    return summary
+
+def write_output(table, rows, summary, output_format, base, bin_width, max_in_flight, time_range, node_addresses=None):
+    if output_format == "csv":
+        export_csv(table, rows, base + ".csv")
+    elif output_format == "columnar":
+        export_columnar(table, rows, base + COLUMNAR_SUFFIX)
+    elif output_format == "metrics":
+        metrics = dict(summary, **TraceMetrics(table, rows, time_range[0] if time_range else 0.0).summary(bin_width))
+        with open(base + ".metrics.json", 'w') as file:
+            json.dump(metrics, file, indent=2)
+    elif output_format == "delays":
+        summary.update(write_delays_csv(table, rows, base + ".delays.csv", max_in_flight, node_addresses))
+    else:
+        with open(base + ".json", 'w') as file:
+            json.dump(summary, file, indent=2)
+
+def report(file_path, get_summary):
+    try:
+        print(json.dumps(get_summary()))
+        return True
+    except Exception as e:
+        print(f"Error analyzing {file_path}: {e}", file=sys.stderr)
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze NS3 ASCII trace files (*.tr, optionally gzip, xz, bz2 or zstd compressed) without the GUI.")
+    parser.add_argument("traces", nargs="+", help="trace files to analyze")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("-f", "--filter", dest="filters", action="append", type=parse_filter, default=[], metavar="FIELD=VALUE", help="keep only rows where FIELD equals VALUE; repeat to combine filters")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="write filtered rows as CSV or compressed columnar tables, a JSON summary, JSON metrics (event counts, per-node and per-flow throughput, airtime), or per-packet hop and end-to-end delays as CSV per trace")
+    parser.add_argument("--window", nargs=2, type=float, metavar=("START", "END"), default=None, help="keep only rows with START <= time < END seconds")
+    parser.add_argument("--bin-width", type=float, default=1.0, help="throughput time bin in seconds for --format metrics")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT, help="packets awaiting a receive kept by --format delays")
+    parser.add_argument("--node-address", dest="node_addresses", action="append", type=parse_node_address, default=[], metavar="ADDRESS=NODE", help="node owning ADDRESS, e.g. 10.1.1.3=N3, for --format delays; repeat per address. Without it a destination's node is only known once it has sent a packet, so receive-only nodes such as a UDP PacketSink get no end-to-end delay")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory for the output files")
+    parser.add_argument("--lazy-headers", action="store_true", help="keep header positions instead of header text until a filter or output needs them; lowers memory for summary output and filters on other fields")
+    parser.add_argument("--profile", action="store_true", help="write per-stage times and parse counters to <trace>.profile.json")
+    parser.add_argument("--cprofile", action="store_true", help="like --profile, and also dump cProfile stats to <trace>.profile.prof (worker processes are not profiled)")
+    parser.add_argument("--cache-dir", nargs="?", const=DEFAULT_CACHE_DIR, default=None, help="reuse parsed traces from this cache directory (default location if given without a value)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    options = (dict(args.filters), args.format)
+    bases = [os.path.join(args.output_dir, name) for name in output_names(args.traces)]
+
+    if len(args.traces) == 1:
+        # A single trace is split into byte ranges across the workers
+        file_path = args.traces[0]
+        succeeded = [report(file_path, lambda: analyze_trace(file_path, *options, bases[0], args.workers, args.cache_dir, args.bin_width, args.max_in_flight, args.window, args.profile, args.cprofile, args.lazy_headers, dict(args.node_addresses)))]
+    else:
+        # Several traces are analyzed one per worker process and reported in argument order
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [(file_path, executor.submit(analyze_trace, file_path, *options, base, 1, args.cache_dir, args.bin_width, args.max_in_flight, args.window, args.profile, args.cprofile, args.lazy_headers, dict(args.node_addresses))) for file_path, base in zip(args.traces, bases)]
+            succeeded = [report(file_path, future.result) for file_path, future in futures]
+
+    return 0 if all(succeeded) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
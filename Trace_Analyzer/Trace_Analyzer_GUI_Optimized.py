@@ -1,161 +1,47 @@
-import re
+import queue
+import threading
 import time
-import csv
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-class TraceEntry:
-    def __init__(self, time, event_type, rate, node, device, mac_header, llc_header, ipv4_header, udp_header, olsr_packet_header, olsr_message_header, src_ip, dst_ip):
-        self.time = time
-        self.event_type = event_type
-        self.rate = rate
-        self.node = node
-        self.device = device
-        self.mac_header = mac_header
-        self.llc_header = llc_header
-        self.ipv4_header = ipv4_header
-        self.udp_header = udp_header
-        self.olsr_packet_header = olsr_packet_header
-        self.olsr_message_header = olsr_message_header
-        self.src_ip = src_ip
-        self.dst_ip = dst_ip
-
-    def __repr__(self):
-        return f"TraceEntry(time={self.time}, event_type={self.event_type}, rate={self.rate}, node={self.node}, device={self.device})"
-
-def parse_time_event_rate(line):
-    time_pattern = r"t\s([\d.]+)"
-    event_pattern = r"(\w)\s([\d.]+)"
-    rate_pattern = r"(\w+Rate[\d\w]+)"
-    
-    time_match = re.search(time_pattern, line)
-    event_match = re.search(event_pattern, line)
-    rate_match = re.search(rate_pattern, line)
-    
-    time = float(time_match.group(1)) if time_match else None
-    event_type = event_match.group(1) if event_match else None
-    event_time = float(event_match.group(2)) if event_match else None
-    rate = rate_match.group(1) if rate_match else None
-    
-    return time, event_type, event_time, rate
-
-def parse_node_device(line):
-    node_device_pattern = r"/NodeList/(\d+)/DeviceList/(\d+)"
-    node_device_match = re.search(node_device_pattern, line)
-    
-    node = int(node_device_match.group(1)) if node_device_match else None
-    device = int(node_device_match.group(2)) if node_device_match else None
-    
-    return node, device
-
-def parse_mac_header(line):
-    mac_header_pattern = re.compile(r"ns3::WifiMacHeader \([^\)]*\)")
-    mac_header_match = mac_header_pattern.search(line)
-    return mac_header_match.group(0) if mac_header_match else None
-
-def parse_llc_header(line):
-    llc_header_pattern = re.compile(r"ns3::LlcSnapHeader \([^\)]*\)")
-    llc_header_match = llc_header_pattern.search(line)
-    return llc_header_match.group(0) if llc_header_match else None
-
-def parse_ipv4_header(line):
-    ipv4_header_pattern = re.compile(r"ns3::Ipv4Header \((.*)\)")
-    ipv4_header_match = ipv4_header_pattern.search(line)
-    if ipv4_header_match:
-        nested_level = 1
-        start_pos = ipv4_header_match.start(1)
-        for i in range(start_pos + 1, len(line)):
-            if line[i] == '(':
-                nested_level += 1
-            elif line[i] == ')':
-                nested_level -= 1
-                if nested_level == 0:
-                    return line[ipv4_header_match.start():i + 1]
-    return None
-
-def extract_ips_from_ipv4_header(ipv4_header):
-    if ipv4_header:
-        ip_pattern = re.compile(r"(\d+\.\d+\.\d+\.\d+)")
-        ips = ip_pattern.findall(ipv4_header)
-        if len(ips) == 2:
-            return ips[0], ips[1]
-    return None, None
-
-def parse_udp_header(line):
-    udp_header_pattern = re.compile(r"ns3::UdpHeader \([^\)]*\)")
-    udp_header_match = udp_header_pattern.search(line)
-    return udp_header_match.group(0) if udp_header_match else None
-
-def parse_olsr_packet_header(line):
-    olsr_packet_header_pattern = re.compile(r"ns3::olsr::PacketHeader \([^\)]*\)")
-    olsr_packet_header_match = olsr_packet_header_pattern.search(line)
-    return olsr_packet_header_match.group(0) if olsr_packet_header_match else None
-
-def parse_olsr_message_header(line):
-    olsr_message_header_pattern = re.compile(r"ns3::olsr::MessageHeader \([^\)]*\)")
-    olsr_message_header_match = olsr_message_header_pattern.search(line)
-    return olsr_message_header_match.group(0) if olsr_message_header_match else None
-
-def parse_trace_line(line):
-    time, event_type, event_time, rate = parse_time_event_rate(line)
-    node, device = parse_node_device(line)
-    mac_header = parse_mac_header(line)
-    llc_header = parse_llc_header(line)
-    ipv4_header = parse_ipv4_header(line)
-    udp_header = parse_udp_header(line)
-    olsr_packet_header = parse_olsr_packet_header(line)
-    olsr_message_header = parse_olsr_message_header(line)
-    
-    src_ip, dst_ip = extract_ips_from_ipv4_header(ipv4_header)
-    
-    return TraceEntry(event_time, event_type, rate, node, device, mac_header, llc_header, ipv4_header, udp_header, olsr_packet_header, olsr_message_header, src_ip, dst_ip)
-
-def process_chunk(chunk, start_line):
-    entries = []
-    for i, line in enumerate(chunk):
-        try:
-            trace_entry = parse_trace_line(line)
-            entries.append(trace_entry)
-        except Exception as e:
-            print(f"Error parsing line {start_line + i}: {e}")
-    return entries
-
-def read_trace_file(file_path, progress_callback=None):
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-    
-    total_lines = len(lines)
-    chunk_size = 10000
-    chunks = [lines[i:i + chunk_size] for i in range(0, total_lines, chunk_size)]
-
-    trace_entries = []
-    start_time = time.time()
-    
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {executor.submit(process_chunk, chunk, i * chunk_size): i for i, chunk in enumerate(chunks)}
-        for future in as_completed(futures):
-            chunk_index = futures[future]
-            try:
-                result = future.result()
-                trace_entries.extend(result)
-                if progress_callback:
-                    progress_percent = (chunk_index * chunk_size + len(result)) / total_lines * 100
-                    elapsed_time = time.time() - start_time
-                    estimated_total_time = elapsed_time / ((chunk_index * chunk_size + len(result)) / total_lines)
-                    time_remaining = estimated_total_time - elapsed_time
-                    progress_callback(progress_percent, elapsed_time, time_remaining)
-            except Exception as e:
-                print(f"Error processing chunk {chunk_index}: {e}")
-    
-    return trace_entries
+from trace_parser import TRACE_SUFFIXES, format_trace_entry, is_trace_file, trace_compression
+from trace_export import COLUMNAR_SUFFIX, export_trace
+from trace_table import TraceTable
+from trace_cache import TraceCache, read_trace_table_cached
+from trace_follow import TraceFollower
+from trace_metrics import RunningMetrics
+from virtual_treeview import VirtualTreeview
+from instrumentation import Instrumentation
+
+FOLLOW_INTERVAL_MS = 1000
+
+# Parsed parts of a followed trace waiting to be merged on the Tk thread
+FOLLOW_QUEUED_PARTS = 4
+
+# Rows shown from the byte ranges parsed so far while the rest of a trace is still loading
+PREVIEW_ROWS = 100000
 
 class TraceAnalyzerApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("NS3 Trace Analyzer by Amruth")
         self.geometry("1200x600")
-        self.trace_entries = []
+        self.trace_entries = TraceTable()
+        self.trace_cache = TraceCache()
+        self.instrumentation = Instrumentation.from_environment("trace_analyzer")
+        self.active_filters = {}
+        self.time_range = None
+        self.export_thread = None
+        self.export_table = None
+        self.export_cancel = threading.Event()
+        self.export_messages = queue.Queue()
+        self.load_thread = None
+        self.load_cancel = threading.Event()
+        self.load_messages = queue.Queue()
+        self.load_preview = None
+        self.follower = None
+        self.follow_job = None
+        self.follow_stop = None
+        self.follow_messages = None
 
         self.create_widgets()
 
@@ -165,6 +51,13 @@ class TraceAnalyzerApp(tk.Tk):
         
         self.file_button = tk.Button(self, text="Browse File", command=self.browse_file, font=("Arial", 10))
         self.file_button.pack(pady=10)
+
+        self.follow_button = tk.Button(self, text="Follow Live Trace", command=self.toggle_follow, font=("Arial", 10))
+        self.follow_button.pack(pady=10)
+
+        # Lazy headers keep only each header's position in the file and read it when shown
+        self.lazy_headers = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="Lazy headers (less memory, header filters are slower)", variable=self.lazy_headers, font=("Arial", 10)).pack()
         
         self.progress_label = tk.Label(self, text="", font=("Arial", 10))
         self.progress_label.pack(pady=10)
@@ -179,7 +72,7 @@ class TraceAnalyzerApp(tk.Tk):
         style.configure("Treeview", font=("Arial", 10), rowheight=25)
         style.configure("Treeview.Heading", font=("Arial", 10, "bold"))
 
-        self.tree = ttk.Treeview(frame, columns=("Time", "Event Type", "Rate", "Node", "Source IP", "Destination IP", "Device", "Mac Header", "LLC Header", "IPv4 Header", "UDP Header", "OLSR Packet Header", "OLSR Message Header"), show="headings")
+        self.tree = VirtualTreeview(frame, columns=("Time", "Event Type", "Rate", "Node", "Source IP", "Destination IP", "Device", "Mac Header", "LLC Header", "IPv4 Header", "UDP Header", "OLSR Packet Header", "OLSR Message Header"), show="headings")
         for col in self.tree["columns"]:
             self.tree.heading(col, text=col, command=lambda c=col: self.filter_column(c))
             self.tree.column(col, width=200)
@@ -188,44 +81,205 @@ class TraceAnalyzerApp(tk.Tk):
 
         scrollbar_y = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
         scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscroll=scrollbar_y.set)
+        self.tree.yscrollcommand = scrollbar_y.set
 
         scrollbar_x = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
         scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
         self.tree.configure(xscroll=scrollbar_x.set)
 
+        self.window_button = tk.Button(self, text="Time Window", command=self.choose_time_window, font=("Arial", 10))
+        self.window_button.pack(pady=10)
+
         self.export_button = tk.Button(self, text="Export to CSV", command=self.export_to_csv, font=("Arial", 10))
         self.export_button.pack(pady=10)
 
     def browse_file(self):
+        if self.load_thread is not None:
+            # A second click while loading cancels the running load
+            self.load_cancel.set()
+            return
+        file_path = filedialog.askopenfilename(initialdir="/home/amruth/ns-allinone-3.41/ns-3.41/scratch", filetypes=[("NS3 Trace Files", " ".join("*" + suffix for suffix in TRACE_SUFFIXES))])
+        if file_path:
+            if not is_trace_file(file_path):
+                messagebox.showwarning("Invalid File", "Please select a valid NS3 trace file in *.tr format, optionally compressed (*.tr.gz, *.tr.xz, *.tr.bz2, *.tr.zst).")
+                return
+            self.stop_following()
+            # The load runs on a worker thread that only talks to Tk through load_messages;
+            # parsed byte ranges are shown as a preview until the whole table is ready
+            lazy_headers = self.lazy_headers.get() and trace_compression(file_path) is None
+            self.load_preview = TraceTable.lazy(file_path) if lazy_headers else TraceTable()
+            self.set_trace_entries(self.load_preview)
+            self.active_filters = {}
+            self.time_range = None
+            self.display_trace_entries()
+            self.load_cancel.clear()
+            self.load_thread = threading.Thread(target=self.run_load, args=(file_path, lazy_headers), daemon=True)
+            self.load_thread.start()
+            self.file_button.config(text="Cancel Loading")
+            self.after(100, self.poll_load)
+
+    def run_load(self, file_path, lazy_headers=False):
+        # cProfile only sees the thread that enables it, so profiling starts here
+        instrumentation = self.instrumentation
+        try:
+            instrumentation.reset()
+            instrumentation.start_profile()
+            progress = lambda *values: self.load_messages.put(("progress", values))
+            preview_rows = [0]
+
+            def preview(part):
+                # Only the parts that fill the preview are posted; after that the Tk
+                # thread just gets progress and the final table
+                if preview_rows[0] < PREVIEW_ROWS:
+                    preview_rows[0] += len(part)
+                    self.load_messages.put(("part", part))
+
+            table = read_trace_table_cached(file_path, progress, cache=self.trace_cache, instrumentation=instrumentation, cancel_event=self.load_cancel, part_callback=preview, lazy_headers=lazy_headers)
+            self.load_messages.put(("done", table))
+        except Exception as e:
+            self.load_messages.put(("error", e))
+        finally:
+            instrumentation.stop_profile()
+
+    def poll_load(self):
+        while True:
+            try:
+                kind, value = self.load_messages.get_nowait()
+            except queue.Empty:
+                self.after(100, self.poll_load)
+                return
+            if kind == "progress":
+                self.update_progress(*value)
+            elif kind == "part":
+                preview = self.load_preview
+                if self.trace_entries is preview and len(preview) < PREVIEW_ROWS:
+                    preview.extend_table(value)
+                    self.tree.update_rows(preview.select(self.active_filters, self.time_range))
+            else:
+                break
+
+        self.load_thread = None
+        self.load_preview = None
+        self.file_button.config(text="Browse File")
+        self.progressbar.stop()
+        if kind == "error":
+            messagebox.showerror("Error", str(value))
+        elif value is None:
+            self.progress_label.config(text="Loading cancelled.")
+        elif self.follower is None:
+            instrumentation = self.instrumentation
+            self.set_trace_entries(value)
+            with instrumentation.stage("display"):
+                self.display_trace_entries(self.trace_entries.select(self.active_filters, self.time_range))
+                self.update_idletasks()
+            self.progress_label.config(text="Reading file complete.")
+            if instrumentation.enabled:
+                report_path = instrumentation.write_report()
+                self.progress_label.config(text=f"Reading file complete. {instrumentation.summary()} (report: {report_path})")
+
+    def set_trace_entries(self, table):
+        # The table being replaced lets go of the trace file its lazy columns keep mapped
+        # unless a running export still reads it; poll_export closes that one afterwards
+        if table is not self.trace_entries and self.trace_entries is not self.export_table:
+            self.trace_entries.close()
+        self.trace_entries = table
+
+    def display_trace_entries(self, row_ids=None):
+        # row_ids selects rows of self.trace_entries to show; None shows them all
+        if row_ids is None:
+            row_ids = range(len(self.trace_entries))
+        self.tree.set_rows(row_ids, lambda row: format_trace_entry(self.trace_entries[row]))
+
+    def toggle_follow(self):
+        if self.follower is not None:
+            self.stop_following()
+            return
         file_path = filedialog.askopenfilename(initialdir="/home/amruth/ns-allinone-3.41/ns-3.41/scratch", filetypes=[("NS3 Trace Files", "*.tr")])
         if file_path:
+            # Following replaces whatever is still loading
+            self.load_cancel.set()
             try:
-                if file_path.endswith(".tr"):
-                    self.trace_entries = read_trace_file(file_path, self.update_progress)
-                    self.display_trace_entries(self.trace_entries)
-                    self.progress_label.config(text="Reading file complete.")
-                    self.progressbar.stop()
-                else:
-                    messagebox.showwarning("Invalid File", "Please select a valid NS3 trace file in *.tr format.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-
-    def display_trace_entries(self, trace_entries):
-        for entry in self.tree.get_children():
-            self.tree.delete(entry)
-        
-        for entry in trace_entries:
-            display_event_type = "Transmit" if entry.event_type == 't' else "Receive" if entry.event_type == 'r' else entry.event_type
-            display_node = f"N{entry.node + 1}" if entry.node is not None else ""
-            self.tree.insert("", "end", values=(entry.time, display_event_type, entry.rate, display_node, entry.src_ip, entry.dst_ip, entry.device, entry.mac_header, entry.llc_header, entry.ipv4_header, entry.udp_header, entry.olsr_packet_header, entry.olsr_message_header))
+                self.follower = TraceFollower(file_path, RunningMetrics())
+            except ValueError as e:
+                messagebox.showwarning("Invalid File", str(e))
+                return
+            self.set_trace_entries(self.follower.table)
+            self.active_filters = {}
+            self.time_range = None
+            self.display_trace_entries()
+            # Reading and parsing run on a worker thread that hands parsed parts to Tk
+            # through follow_messages; each session gets its own queue and stop event
+            self.follow_stop = threading.Event()
+            self.follow_messages = queue.Queue(maxsize=FOLLOW_QUEUED_PARTS)
+            threading.Thread(target=self.run_follow, args=(self.follower, self.follow_messages, self.follow_stop), daemon=True).start()
+            self.follow_button.config(text="Stop Following")
+            self.follow_job = self.after(100, self.poll_follow)
+
+    def stop_following(self):
+        if self.follow_job is not None:
+            self.after_cancel(self.follow_job)
+        if self.follow_stop is not None:
+            self.follow_stop.set()
+        self.follower = None
+        self.follow_job = None
+        self.follow_stop = None
+        self.follow_messages = None
+        self.follow_button.config(text="Follow Live Trace")
+
+    def run_follow(self, follower, messages, stop):
+        # Reads what the simulation appended; reads again right away while catching up on
+        # a backlog, otherwise after FOLLOW_INTERVAL_MS. The bounded queue keeps it from
+        # running ahead of the Tk thread.
+        while not stop.is_set():
+            try:
+                part = follower.read_part()
+                message, pending = ("part", part), follower.pending_bytes()
+            except OSError as e:
+                message, pending = ("error", e), 0
+            if message[0] == "error" or part is None or len(part):
+                while not stop.is_set():
+                    try:
+                        messages.put(message, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+            if message[0] == "error":
+                return
+            if not pending:
+                stop.wait(FOLLOW_INTERVAL_MS / 1000)
+
+    def poll_follow(self):
+        # Merges one parsed part per tick so the window stays responsive while a backlog
+        # is caught up on; checks again right away while more parts are waiting
+        follower = self.follower
+        try:
+            kind, value = self.follow_messages.get_nowait()
+        except queue.Empty:
+            self.follow_job = self.after(100, self.poll_follow)
+            return
+        if kind == "error":
+            self.stop_following()
+            messagebox.showerror("Error", str(value))
+            return
+        added = follower.add_part(value)
+        if added is None:
+            self.trace_entries = follower.table
+            self.display_trace_entries(self.trace_entries.select(self.active_filters, self.time_range))
+        elif added:
+            self.tree.update_rows(self.trace_entries.select(self.active_filters, self.time_range))
+
+        drops = sum(follower.metrics.event_counts().get('d', ()))
+        bin_starts, node_rates = follower.metrics.node_throughput()
+        # The last bin is still filling up, so the one before it is reported
+        throughput = node_rates[:, -2].sum() if len(bin_starts) > 1 else 0.0
+        self.progress_label.config(text=f"Following: {len(follower.table)} rows | Drops: {drops} | Received throughput: {throughput / 1e6:.3f} Mbit/s")
+        self.follow_job = self.after(0 if self.follow_messages.qsize() else 100, self.poll_follow)
 
     def update_progress(self, percent, elapsed_time, time_remaining):
         elapsed_time_str = time.strftime("%H:%M:%S", time.gmtime(elapsed_time))
         time_remaining_str = time.strftime("%H:%M:%S", time.gmtime(time_remaining))
         self.progress_label.config(text=f"Progress: {int(percent)}% | Elapsed Time: {elapsed_time_str} | Time Remaining: {time_remaining_str}")
         self.progressbar["value"] = percent
-        self.update_idletasks()
 
     def filter_column(self, column):
         column_map = {
@@ -245,11 +299,12 @@ class TraceAnalyzerApp(tk.Tk):
         }
         
         attr = column_map[column]
-        
+
+        # Display string -> stored value, from the column's index rather than a scan of every row
         if attr == "node":
-            unique_values = sorted(set(f"N{entry.node + 1}" for entry in self.trace_entries if entry.node is not None))
+            choices = {f"N{node + 1}": node for node in self.trace_entries.distinct_values(attr)}
         else:
-            unique_values = sorted(set(getattr(entry, attr) for entry in self.trace_entries if getattr(entry, attr) is not None))
+            choices = {str(value): value for value in self.trace_entries.distinct_values(attr)}
         
         filter_window = tk.Toplevel(self)
         filter_window.title(f"Filter by {column}")
@@ -261,37 +316,109 @@ class TraceAnalyzerApp(tk.Tk):
 
         filter_var = tk.StringVar(value="Select a value")
 
-        filter_menu = ttk.Combobox(filter_window, textvariable=filter_var, values=unique_values, font=("Arial", 10))
+        filter_menu = ttk.Combobox(filter_window, textvariable=filter_var, values=["All"] + list(choices), font=("Arial", 10))
         filter_menu.pack(pady=10)
 
         def apply_filter():
+            # Filters on different columns are combined; "All" removes this column's filter
             selected_value = filter_var.get()
-            if attr == "node":
-                selected_value = selected_value[1:]  # Remove the "N" prefix to get the original node number
-                filtered_entries = [entry for entry in self.trace_entries if entry.node is not None and f"N{entry.node + 1}" == selected_value]
+            if selected_value == "All":
+                self.active_filters.pop(attr, None)
+            elif selected_value in choices:
+                self.active_filters[attr] = choices[selected_value]
             else:
-                filtered_entries = [entry for entry in self.trace_entries if getattr(entry, attr) == selected_value]
-            self.display_trace_entries(filtered_entries)
+                messagebox.showwarning("Invalid Value", f"{selected_value} is not a value of {column}.", parent=filter_window)
+                return
+            self.display_trace_entries(self.trace_entries.select(self.active_filters, self.time_range))
             filter_window.destroy()
 
         apply_button = tk.Button(filter_window, text="Apply Filter", command=apply_filter, font=("Arial", 10))
         apply_button.pack(pady=10)
 
+    def choose_time_window(self):
+        window = tk.Toplevel(self)
+        window.title("Time Window")
+        window.geometry("300x200")
+        window.transient(self)
+
+        tk.Label(window, text="From (s), empty for the start", font=("Arial", 10)).pack(pady=5)
+        start_entry = tk.Entry(window, font=("Arial", 10))
+        start_entry.pack()
+        tk.Label(window, text="To (s), empty for the end", font=("Arial", 10)).pack(pady=5)
+        end_entry = tk.Entry(window, font=("Arial", 10))
+        end_entry.pack()
+        if self.time_range:
+            start_entry.insert(0, str(self.time_range[0]))
+            end_entry.insert(0, str(self.time_range[1]))
+
+        def apply_window():
+            # Combined with the column filters; both fields empty shows the whole trace
+            start_text, end_text = start_entry.get().strip(), end_entry.get().strip()
+            try:
+                start = float(start_text) if start_text else float("-inf")
+                end = float(end_text) if end_text else float("inf")
+            except ValueError:
+                messagebox.showwarning("Invalid Value", "Times must be numbers of seconds.", parent=window)
+                return
+            self.time_range = (start, end) if start_text or end_text else None
+            self.display_trace_entries(self.trace_entries.select(self.active_filters, self.time_range))
+            window.destroy()
+
+        tk.Button(window, text="Apply", command=apply_window, font=("Arial", 10)).pack(pady=10)
+
     def export_to_csv(self):
-        file_path = filedialog.asksaveasfilename(initialdir="/home/amruth/SERVER", defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if self.export_thread is not None:
+            # A second click while exporting cancels the running export
+            self.export_cancel.set()
+            return
+        file_path = filedialog.asksaveasfilename(initialdir="/home/amruth/SERVER", defaultextension=".csv", filetypes=[("CSV files", "*.csv"), ("Compressed columnar trace", f"*{COLUMNAR_SUFFIX}")])
         if file_path:
+            # The export runs on a worker thread that only talks to Tk through export_messages
+            # poll_load and poll_follow keep extending the shown table, so a table that is
+            # still growing is exported from a snapshot of the rows it has now
+            self.export_cancel.clear()
+            table = self.trace_entries
+            if self.load_thread is not None or self.follower is not None:
+                table = table.take(range(len(table)))
+            self.export_table = table
+            self.export_thread = threading.Thread(target=self.run_export, args=(table, file_path), daemon=True)
+            self.export_thread.start()
+            self.export_button.config(text="Cancel Export")
+            self.after(100, self.poll_export)
+
+    def run_export(self, table, file_path):
+        try:
+            progress = lambda *values: self.export_messages.put(("progress", values))
+            completed = export_trace(table, range(len(table)), file_path, progress, self.export_cancel)
+            self.export_messages.put(("done", completed))
+        except Exception as e:
+            self.export_messages.put(("error", e))
+
+    def poll_export(self):
+        while True:
             try:
-                with open(file_path, mode='w', newline='') as file:
-                    writer = csv.writer(file)
-                    headers = ["Time", "Event Type", "Rate", "Node", "Source IP", "Destination IP", "Device", "Mac Header", "LLC Header", "IPv4 Header", "UDP Header", "OLSR Packet Header", "OLSR Message Header"]
-                    writer.writerow(headers)
-                    for entry in self.trace_entries:
-                        display_event_type = "Transmit" if entry.event_type == 't' else "Receive" if entry.event_type == 'r' else entry.event_type
-                        display_node = f"N{entry.node + 1}" if entry.node is not None else ""
-                        writer.writerow([entry.time, display_event_type, entry.rate, display_node, entry.src_ip, entry.dst_ip, entry.device, entry.mac_header, entry.llc_header, entry.ipv4_header, entry.udp_header, entry.olsr_packet_header, entry.olsr_message_header])
-                messagebox.showinfo("Export Successful", "Data exported to CSV file successfully.")
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+                kind, value = self.export_messages.get_nowait()
+            except queue.Empty:
+                self.after(100, self.poll_export)
+                return
+            if kind == "progress":
+                self.update_progress(*value)
+                continue
+            break
+
+        # The snapshot, or a table replaced during the export, lets go of its trace file
+        if self.export_table is not self.trace_entries:
+            self.export_table.close()
+        self.export_thread = None
+        self.export_table = None
+        self.export_button.config(text="Export to CSV")
+        if kind == "error":
+            messagebox.showerror("Error", str(value))
+        elif value:
+            self.progress_label.config(text="Export complete.")
+            messagebox.showinfo("Export Successful", "Data exported to file successfully.")
+        else:
+            self.progress_label.config(text="Export cancelled.")
 
 if __name__ == "__main__":
     app = TraceAnalyzerApp()
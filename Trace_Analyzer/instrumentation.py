@@ -0,0 +1,95 @@
+import cProfile
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Setting NS3_PROFILE turns instrumentation on for the GUIs; its value is the directory
+# the JSON reports go to (the current directory if it isn't one). NS3_PROFILE_CPROFILE
+# additionally runs cProfile and dumps its stats next to the report.
+PROFILE_ENV = "NS3_PROFILE"
+CPROFILE_ENV = "NS3_PROFILE_CPROFILE"
+
+class Instrumentation:
+    # Opt-in wall-clock timers per stage (read, parse, merge, display, ...) and named
+    # counters for one load. A disabled instance does nothing, so call sites don't need
+    # to check; anything costly to count should still be guarded by enabled.
+    def __init__(self, name, enabled=True, cprofile=False, report_dir="."):
+        self.name = name
+        self.enabled = enabled
+        self.cprofile = enabled and cprofile
+        self.report_dir = report_dir
+        self.reset()
+
+    @classmethod
+    def from_environment(cls, name):
+        value = os.environ.get(PROFILE_ENV)
+        report_dir = value if value and os.path.isdir(value) else "."
+        return cls(name, enabled=bool(value), cprofile=bool(os.environ.get(CPROFILE_ENV)), report_dir=report_dir)
+
+    def reset(self):
+        self.stages = {}
+        self.counters = Counter()
+        self.profiler = cProfile.Profile() if self.cprofile else None
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def timed(self, name, iterable):
+        # Yields from iterable, adding the time spent producing each item to stage name
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def start_profile(self):
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop_profile(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def report(self):
+        return {
+            "name": self.name,
+            "total_s": sum(self.stages.values()),
+            "stages_s": dict(self.stages),
+            "counters": dict(self.counters),
+        }
+
+    def summary(self):
+        # One line for a status label
+        stages = " | ".join(f"{name} {seconds:.2f}s" for name, seconds in self.stages.items())
+        counters = " | ".join(f"{name}: {count:,}" for name, count in self.counters.items())
+        return " | ".join(part for part in (stages, counters) if part)
+
+    def write_report(self, path=None):
+        # Writes the JSON report, and the cProfile stats beside it as .prof; returns the report path
+        path = path or os.path.join(self.report_dir, f"{self.name}-profile.json")
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+        if self.profiler is not None:
+            self.profiler.dump_stats(os.path.splitext(path)[0] + ".prof")
+        return path
+
+DISABLED = Instrumentation("disabled", enabled=False)
@@ -0,0 +1,119 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from Trace_Analyzer_CLI import main, output_names, parse_filter, parse_node_address
+from trace_table import read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+def run_main(*argv):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        status = main(list(argv))
+    return status, [json.loads(line) for line in output.getvalue().splitlines()]
+
+class ParseArgumentsTest(unittest.TestCase):
+    def test_parse_filter(self):
+        self.assertEqual(parse_filter("node=N3"), ("node", 2))
+        self.assertEqual(parse_filter("node=2"), ("node", 2))
+        self.assertEqual(parse_filter("device=0"), ("device", 0))
+        self.assertEqual(parse_filter("time=1.5"), ("time", 1.5))
+        self.assertEqual(parse_filter("dst_ip=10.1.1.255"), ("dst_ip", "10.1.1.255"))
+        for text in ("node", "colour=red", "node=Nx", "time=soon"):
+            with self.assertRaises(argparse.ArgumentTypeError, msg=text):
+                parse_filter(text)
+
+    def test_parse_node_address(self):
+        self.assertEqual(parse_node_address("10.1.1.3=N3"), ("10.1.1.3", 2))
+        self.assertEqual(parse_node_address("10.1.1.3=2"), ("10.1.1.3", 2))
+        for text in ("10.1.1.3", "=N3", "10.1.1.3=three"):
+            with self.assertRaises(argparse.ArgumentTypeError, msg=text):
+                parse_node_address(text)
+
+class OutputNamesTest(unittest.TestCase):
+    def test_suffixes_stripped(self):
+        self.assertEqual(output_names(["runs/a/trace.tr.gz", "runs/b/other.tr"]), ["trace", "other"])
+
+    def test_collisions_prefixed_with_parent(self):
+        self.assertEqual(output_names(["runs/a/trace.tr", "runs/b/trace.tr.xz", "runs/b/other.tr"]), ["a_trace", "b_trace", "other"])
+
+    def test_remaining_collisions_numbered(self):
+        names = output_names(["runs/a/trace.tr", "runs/a/trace.tr.gz", "runs/b/trace.tr"])
+        self.assertEqual(names, ["a_trace_1", "a_trace_2", "b_trace"])
+        self.assertEqual(len(set(output_names(["a/x_trace.tr", "x/trace.tr", "a/x_trace.tr.gz"]))), 3)
+
+class AnalyzeTraceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "trace.tr")
+        write_trace(cls.path, 2000, seed=11)
+        cls.table = read_trace_table(cls.path, max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp(dir=self.directory.name)
+
+    def test_filters_and_window(self):
+        start, end = self.table.time[200], self.table.time[1500]
+        status, summaries = run_main(self.path, "-j", "1", "-f", "event_type=r", "-f", "node=N4", "--window", str(start), str(end), "-o", self.output_dir)
+        self.assertEqual(status, 0)
+        rows = self.table.select({"event_type": "r", "node": 3}, (start, end))
+        self.assertEqual(summaries[0]["rows"], len(rows))
+        with open(os.path.join(self.output_dir, "trace.csv"), newline='') as file:
+            lines = list(csv.reader(file))[1:]
+        self.assertEqual(len(lines), len(rows))
+        self.assertTrue(all(line[1] == "Receive" and line[3] == "N4" for line in lines))
+
+    def test_summary_and_metrics(self):
+        status, summaries = run_main(self.path, "-j", "1", "--format", "metrics", "--bin-width", "0.5", "-o", self.output_dir)
+        self.assertEqual(status, 0)
+        with open(os.path.join(self.output_dir, "trace.metrics.json")) as file:
+            metrics = json.load(file)
+        self.assertEqual(metrics["rows"], len(self.table))
+        self.assertEqual(metrics["bin_width_s"], 0.5)
+        self.assertEqual(sum(metrics["event_counts"]["r"].values()), summaries[0]["events"]["r"])
+
+    def test_delays_with_node_addresses(self):
+        status, summaries = run_main(self.path, "-j", "1", "--format", "delays", "-o", self.output_dir)
+        self.assertEqual(status, 0)
+        learned = summaries[0]["end_to_end_delay_s"]["matched"]
+        arguments = [f"--node-address=10.1.1.{node + 1}=N{node + 1}" for node in range(20)]
+        status, summaries = run_main(self.path, "-j", "1", "--format", "delays", *arguments, "-o", self.output_dir)
+        self.assertEqual(status, 0)
+        self.assertGreaterEqual(summaries[0]["end_to_end_delay_s"]["matched"], learned)
+        with open(os.path.join(self.output_dir, "trace.delays.csv"), newline='') as file:
+            lines = list(csv.reader(file))[1:]
+        self.assertEqual(sum(1 for line in lines if line[5]), summaries[0]["end_to_end_delay_s"]["matched"])
+
+    def test_same_named_traces(self):
+        paths = []
+        for run in ("a", "b"):
+            os.makedirs(os.path.join(self.directory.name, run), exist_ok=True)
+            paths.append(os.path.join(self.directory.name, run, "trace.tr"))
+            shutil.copyfile(self.path, paths[-1])
+        status, summaries = run_main(*paths, "-j", "1", "--format", "summary", "-o", self.output_dir)
+        self.assertEqual(status, 0)
+        self.assertEqual([summary["trace"] for summary in summaries], paths)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["a_trace.json", "b_trace.json"])
+
+    def test_missing_trace_fails(self):
+        output = io.StringIO()
+        with contextlib.redirect_stderr(output):
+            status, _ = run_main(os.path.join(self.directory.name, "missing.tr"), "-j", "1", "-o", self.output_dir)
+        self.assertEqual(status, 1)
+        self.assertIn("missing.tr", output.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
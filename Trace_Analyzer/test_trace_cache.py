@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+from trace_parser import TRACE_FIELDS
+from trace_cache import TraceCache, read_trace_table_cached
+from trace_table import read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+def table_rows(table):
+    return [tuple(getattr(entry, field) for field in TRACE_FIELDS) for entry in table]
+
+class TraceCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.tr")
+        write_trace(self.path, 2000, seed=3)
+        self.cache = TraceCache(os.path.join(self.directory.name, "cache"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        expected = table_rows(read_trace_table(self.path, max_workers=1))
+        stored = read_trace_table_cached(self.path, max_workers=1, cache=self.cache)
+        self.assertTrue(os.path.exists(self.cache.cache_path(self.path)))
+        loaded = self.cache.load(self.path)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(table_rows(stored), expected)
+        self.assertEqual(table_rows(loaded), expected)
+        self.assertEqual(loaded.time_sorted, stored.time_sorted)
+        self.assertEqual(list(loaded.select({"event_type": "r", "node": 4})), list(stored.select({"event_type": "r", "node": 4})))
+
+    def test_changed_trace_is_parsed_again(self):
+        read_trace_table_cached(self.path, max_workers=1, cache=self.cache)
+        write_trace(self.path, 1500, seed=4)
+        self.assertIsNone(self.cache.load(self.path))
+        table = read_trace_table_cached(self.path, max_workers=1, cache=self.cache)
+        self.assertEqual(table_rows(table), table_rows(read_trace_table(self.path, max_workers=1)))
+        self.assertEqual(len(self.cache.load(self.path)), 1500)
+
+    def test_same_size_edit_is_detected(self):
+        read_trace_table_cached(self.path, max_workers=1, cache=self.cache)
+        stat = os.stat(self.path)
+        with open(self.path, 'r+b') as file:
+            file.seek(stat.st_size // 2)
+            file.write(b"#")
+        # Restoring the mtime leaves only the content hash to tell the files apart
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(self.cache.load(self.path))
+
+    def test_unreadable_entry_is_ignored(self):
+        read_trace_table_cached(self.path, max_workers=1, cache=self.cache)
+        cache_path = self.cache.cache_path(self.path)
+        with open(cache_path, 'r+b') as file:
+            file.truncate(os.path.getsize(cache_path) // 2)
+        self.assertIsNone(self.cache.load(self.path))
+
+    def test_evicts_least_recently_used(self):
+        other = os.path.join(self.directory.name, "other.tr")
+        write_trace(other, 2000, seed=5)
+        read_trace_table_cached(self.path, max_workers=1, cache=self.cache)
+        entry_bytes = os.path.getsize(self.cache.cache_path(self.path))
+        os.utime(self.cache.cache_path(self.path), (1, 1))
+        self.cache.max_bytes = entry_bytes * 3 // 2
+        read_trace_table_cached(other, max_workers=1, cache=self.cache)
+        self.assertFalse(os.path.exists(self.cache.cache_path(self.path)))
+        self.assertTrue(os.path.exists(self.cache.cache_path(other)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import math
+import os
+import random
+import sys
+import tempfile
+import unittest
+from trace_parser import parse_trace_line
+from trace_correlation import DelayCorrelator, correlate_entries, table_delays
+from trace_table import TraceTable, read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import NODES, node_ip, trace_line, write_trace
+
+def nan_to_none(values):
+    return [None if value != value else value for value in values]
+
+class TableDelaysTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, "trace.tr")
+        write_trace(path, 3000, seed=10)
+        cls.table = read_trace_table(path, max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_matches_correlate_entries(self):
+        hop_delay, end_to_end_delay = table_delays(self.table)
+        expected = list(correlate_entries(self.table))
+        self.assertEqual(nan_to_none(hop_delay), [hop for _, hop, _ in expected])
+        self.assertEqual(nan_to_none(end_to_end_delay), [end_to_end for _, _, end_to_end in expected])
+        self.assertTrue(any(value is not None for value in nan_to_none(end_to_end_delay)))
+
+    def test_node_addresses(self):
+        # With every node's address given up front, each unicast data frame is an arrival
+        node_addresses = {node_ip(node): node for node in range(NODES)}
+        hop_delay, end_to_end_delay = table_delays(self.table, node_addresses=node_addresses)
+        for row, entry in enumerate(self.table):
+            if entry.event_type == 'r' and entry.dst_ip and not entry.dst_ip.endswith(".255"):
+                self.assertAlmostEqual(end_to_end_delay[row], 0.0002, msg=row)
+                self.assertAlmostEqual(hop_delay[row], 0.0002, msg=row)
+            else:
+                self.assertTrue(math.isnan(end_to_end_delay[row]), row)
+        learned = nan_to_none(table_delays(self.table)[1])
+        self.assertTrue(all(value is None or value == given for value, given in zip(learned, end_to_end_delay)))
+
+class SinkOnlyDestinationTest(unittest.TestCase):
+    def setUp(self):
+        # Node 0 sends to node 1, which never sends; node 2 overhears the frame
+        rng = random.Random(0)
+        lines = [trace_line("t", 1.0, 0, "Tx", rng, 0, 1, 1, 7, "data"),
+                 trace_line("r", 1.0002, 1, "RxOk", rng, 0, 1, 1, 7, "data"),
+                 trace_line("r", 1.0002, 2, "RxOk", rng, 0, 1, 1, 7, "data")]
+        self.table = TraceTable.from_entries(parse_trace_line(line) for line in lines)
+
+    def test_unknown_without_node_addresses(self):
+        hop_delay, end_to_end_delay = table_delays(self.table)
+        self.assertEqual(nan_to_none(hop_delay)[1:], [self.table.time[1] - 1.0] * 2)
+        self.assertEqual(nan_to_none(end_to_end_delay), [None, None, None])
+
+    def test_known_from_node_addresses(self):
+        _, end_to_end_delay = table_delays(self.table, node_addresses={node_ip(1): 1})
+        self.assertEqual(nan_to_none(end_to_end_delay), [None, self.table.time[1] - 1.0, None])
+        _, end_to_end_delay = table_delays(self.table, node_addresses={"10.9.9.9": 1})
+        self.assertEqual(nan_to_none(end_to_end_delay), [None, None, None])
+
+    def test_correlate_entries_node_addresses(self):
+        delays = [end_to_end for _, _, end_to_end in correlate_entries(self.table, node_addresses={node_ip(1): 1})]
+        self.assertEqual(delays, [None, self.table.time[1] - 1.0, None])
+
+class DelayCorrelatorTest(unittest.TestCase):
+    def test_forwarded_packet(self):
+        # 10.0.0.1 (node 0) -> node 1 -> 10.0.0.3 (node 2); the TTL drops at the forwarder
+        correlator = DelayCorrelator(node_addresses={"10.0.0.3": 2})
+        key = ("10.0.0.1", "10.0.0.3", 5, 17)
+        self.assertEqual(correlator.add(1.0, 't', key, 64, 0), (None, None))
+        self.assertEqual(correlator.add(1.5, 'r', key, 64, 1), (0.5, None))
+        self.assertEqual(correlator.add(2.0, 't', key, 63, 1), (None, None))
+        self.assertEqual(correlator.add(2.25, 'r', key, 63, 2), (0.25, 1.25))
+
+    def test_expired_transmits(self):
+        correlator = DelayCorrelator(max_age=1.0, node_addresses={"b": 1})
+        correlator.add(1.0, 't', ("a", "b", 1, 17), 64, 0)
+        self.assertEqual(correlator.add(2.5, 'r', ("a", "b", 1, 17), 64, 1), (None, None))
+        correlator = DelayCorrelator(max_in_flight=1, node_addresses={"b": 1})
+        correlator.add(1.0, 't', ("a", "b", 1, 17), 64, 0)
+        correlator.add(1.1, 't', ("a", "b", 2, 17), 64, 0)
+        self.assertEqual(correlator.add(1.2, 'r', ("a", "b", 1, 17), 64, 1), (None, None))
+        hop, end_to_end = correlator.add(1.2, 'r', ("a", "b", 2, 17), 64, 1)
+        self.assertAlmostEqual(hop, 0.1)
+        self.assertAlmostEqual(end_to_end, 0.1)
+
+if __name__ == "__main__":
+    unittest.main()
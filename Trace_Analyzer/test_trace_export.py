@@ -0,0 +1,69 @@
+import csv
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from trace_parser import CSV_HEADERS, TRACE_FIELDS, format_trace_entry
+from trace_export import COLUMNAR_SUFFIX, export_trace, read_trace_export
+from trace_table import read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+def table_rows(table):
+    return [tuple(getattr(entry, field) for field in TRACE_FIELDS) for entry in table]
+
+class ExportTraceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, "trace.tr")
+        write_trace(path, 2000, seed=6)
+        cls.table = read_trace_table(path, max_workers=1)
+        cls.rows = cls.table.select({"event_type": "r"})
+        cls.table_rows = table_rows(cls.table)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_columnar_round_trip(self):
+        path = os.path.join(self.directory.name, "rows" + COLUMNAR_SUFFIX)
+        self.assertTrue(export_trace(self.table, self.rows, path))
+        table = read_trace_export(path)
+        self.assertEqual(table_rows(table), [self.table_rows[row] for row in self.rows])
+        self.assertTrue(table.time_sorted)
+
+    def test_columnar_round_trip_unsorted_rows(self):
+        path = os.path.join(self.directory.name, "reversed" + COLUMNAR_SUFFIX)
+        rows = list(reversed(self.rows))
+        self.assertTrue(export_trace(self.table, rows, path))
+        table = read_trace_export(path)
+        self.assertEqual(table_rows(table), [self.table_rows[row] for row in rows])
+        self.assertFalse(table.time_sorted)
+
+    def test_csv(self):
+        path = os.path.join(self.directory.name, "rows.csv")
+        self.assertTrue(export_trace(self.table, self.rows, path))
+        with open(path, newline='') as file:
+            lines = list(csv.reader(file))
+        self.assertEqual(lines[0], CSV_HEADERS)
+        expected = [["" if value is None else str(value) for value in format_trace_entry(self.table[row])] for row in self.rows]
+        self.assertEqual(lines[1:], expected)
+
+    def test_cancel_leaves_no_file(self):
+        cancel = threading.Event()
+        cancel.set()
+        for suffix in (".csv", COLUMNAR_SUFFIX):
+            path = os.path.join(self.directory.name, "cancelled" + suffix)
+            self.assertFalse(export_trace(self.table, self.rows, path, cancel_event=cancel))
+            self.assertEqual([name for name in os.listdir(self.directory.name) if name.startswith("cancelled")], [])
+
+    def test_not_an_export(self):
+        path = os.path.join(self.directory.name, "trace.tr")
+        with self.assertRaises(ValueError):
+            read_trace_export(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+from trace_parser import TRACE_FIELDS, read_trace_file
+from trace_follow import TraceFollower
+from trace_metrics import RunningMetrics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+def entry_rows(entries):
+    return [tuple(getattr(entry, field) for field in TRACE_FIELDS) for entry in entries]
+
+class TraceFollowerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        source = os.path.join(self.directory.name, "source.tr")
+        write_trace(source, 500, seed=8)
+        with open(source, 'rb') as file:
+            self.data = file.read()
+        self.expected = entry_rows(read_trace_file(source, max_workers=1))
+        self.path = os.path.join(self.directory.name, "trace.tr")
+        open(self.path, 'wb').close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def append(self, data):
+        with open(self.path, 'ab') as file:
+            file.write(data)
+
+    def test_partial_lines_wait_for_their_newline(self):
+        follower = TraceFollower(self.path, RunningMetrics())
+        self.assertEqual(follower.poll(), 0)
+        # Written in pieces that end mid-line, as ns-3 flushes its buffer
+        for start in range(0, len(self.data), 997):
+            self.append(self.data[start:start + 997])
+            follower.poll()
+            self.assertEqual(follower.offset, self.data.rfind(b'\n', 0, start + 997) + 1)
+        self.assertEqual(entry_rows(follower.table), self.expected)
+        self.assertEqual(follower.metrics.rows, len(self.expected))
+        self.assertEqual(follower.pending_bytes(), 0)
+
+    def test_parts_bounded_by_max_bytes(self):
+        self.append(self.data)
+        follower = TraceFollower(self.path, max_bytes=4096)
+        parts = 0
+        while follower.pending_bytes():
+            self.assertGreater(follower.poll(), 0)
+            parts += 1
+        self.assertGreaterEqual(parts, len(self.data) // 4096)
+        self.assertEqual(entry_rows(follower.table), self.expected)
+
+    def test_line_longer_than_max_bytes(self):
+        self.append(self.data)
+        follower = TraceFollower(self.path, max_bytes=64)
+        while follower.pending_bytes():
+            follower.poll()
+        self.assertEqual(entry_rows(follower.table), self.expected)
+
+    def test_truncation_starts_over(self):
+        self.append(self.data)
+        follower = TraceFollower(self.path, RunningMetrics())
+        follower.poll()
+        # The simulation is restarted and writes a shorter trace
+        first_lines = self.data[:self.data.index(b'\n', 2000) + 1]
+        with open(self.path, 'wb') as file:
+            file.write(first_lines)
+        self.assertIsNone(follower.poll())
+        self.assertEqual(len(follower.table), 0)
+        self.assertEqual(follower.metrics.rows, 0)
+        follower.poll()
+        self.assertEqual(entry_rows(follower.table), self.expected[:first_lines.count(b'\n')])
+
+    def test_compressed_trace_refused(self):
+        with open(self.path, 'wb') as file:
+            file.write(b"\x1f\x8b\x08\x00")
+        with self.assertRaises(ValueError):
+            TraceFollower(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
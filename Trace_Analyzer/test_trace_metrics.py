@@ -0,0 +1,100 @@
+import math
+import os
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+import numpy as np
+from trace_metrics import CONTROL_FRAME_BYTES, MAC_OVERHEAD_BYTES, RunningMetrics, TraceMetrics, ipv4_length, rate_bps
+from trace_table import TraceTable, read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+BIN_WIDTH = 0.25
+
+def reference_metrics(entries, start_time):
+    # Per-row sums of what TraceMetrics aggregates with bincount
+    counts = defaultdict(lambda: defaultdict(int))
+    node_bytes = defaultdict(lambda: defaultdict(int))
+    flow_bytes = defaultdict(lambda: defaultdict(int))
+    airtime = defaultdict(float)
+    for entry in entries:
+        counts[entry.event_type][entry.node] += 1
+        time_bin = max(int((entry.time - start_time) // BIN_WIDTH), 0)
+        if entry.event_type == 'r':
+            node_bytes[entry.node][time_bin] += ipv4_length(entry.ipv4_header)
+            if entry.src_ip and entry.dst_ip:
+                flow_bytes[(entry.src_ip, entry.dst_ip)][time_bin] += ipv4_length(entry.ipv4_header)
+        if entry.event_type == 't' and not math.isnan(rate_bps(entry.rate)):
+            length = ipv4_length(entry.ipv4_header)
+            airtime[entry.rate] += (length + MAC_OVERHEAD_BYTES if length else CONTROL_FRAME_BYTES) * 8 / rate_bps(entry.rate)
+    return counts, node_bytes, flow_bytes, airtime
+
+class TraceMetricsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, "trace.tr")
+        write_trace(path, 3000, seed=9)
+        cls.table = read_trace_table(path, max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def assert_matches_reference(self, metrics, entries, start_time):
+        counts, node_bytes, flow_bytes, airtime = reference_metrics(entries, start_time)
+        self.assertEqual({event_type: {node: int(count) for node, count in enumerate(node_counts) if count} for event_type, node_counts in metrics.event_counts().items()},
+                         {event_type: dict(node_counts) for event_type, node_counts in counts.items()})
+
+        bin_starts, node_rates = metrics.node_throughput(BIN_WIDTH)
+        self.assertAlmostEqual(bin_starts[0], start_time)
+        for node, bins in node_bytes.items():
+            for time_bin, total in bins.items():
+                self.assertAlmostEqual(node_rates[node, time_bin], total * 8 / BIN_WIDTH)
+        self.assertAlmostEqual(node_rates.sum(), sum(sum(bins.values()) for bins in node_bytes.values()) * 8 / BIN_WIDTH)
+
+        flows, _, flow_rates = metrics.flow_throughput(BIN_WIDTH)
+        self.assertEqual(sorted(flows), sorted(flow_bytes))
+        for flow, rates in zip(flows, flow_rates):
+            self.assertEqual({time_bin: total * 8 / BIN_WIDTH for time_bin, total in flow_bytes[flow].items() if total}, {time_bin: rate for time_bin, rate in enumerate(rates) if rate})
+
+        measured = metrics.rate_airtime()
+        self.assertEqual(sorted(measured), sorted(airtime))
+        for rate, seconds in airtime.items():
+            self.assertAlmostEqual(measured[rate], seconds)
+
+    def test_whole_table(self):
+        self.assert_matches_reference(TraceMetrics(self.table), list(self.table), 0.0)
+
+    def test_window(self):
+        start, end = self.table.time[500], self.table.time[2000]
+        rows = self.table.window(start, end)
+        self.assert_matches_reference(TraceMetrics(self.table, rows, start), [self.table[row] for row in rows], start)
+
+    def test_selection(self):
+        rows = self.table.select({"node": 2})
+        self.assert_matches_reference(TraceMetrics(self.table, rows), [self.table[row] for row in rows], 0.0)
+
+    def test_summary(self):
+        summary = TraceMetrics(self.table).summary(BIN_WIDTH)
+        _, node_rates = TraceMetrics(self.table).node_throughput(BIN_WIDTH)
+        self.assertEqual(summary["bins"], node_rates.shape[1])
+        self.assertAlmostEqual(summary["node_mean_throughput_bps"]["N3"], node_rates[2].mean())
+        self.assertTrue(all(" > " in flow for flow in summary["flow_mean_throughput_bps"]))
+
+    def test_running_metrics_match_whole_table(self):
+        running = RunningMetrics(BIN_WIDTH)
+        for start in range(0, len(self.table), 700):
+            running.add(TraceTable.from_entries(self.table[start:start + 700]))
+        whole = TraceMetrics(self.table)
+        self.assertEqual(running.rows, len(self.table))
+        for event_type, counts in whole.event_counts().items():
+            np.testing.assert_array_equal(running.event_counts()[event_type], counts)
+        np.testing.assert_allclose(running.node_throughput()[1], whole.node_throughput(BIN_WIDTH)[1])
+        running.clear()
+        self.assertEqual(running.summary()["rows"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
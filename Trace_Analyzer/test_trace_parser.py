@@ -0,0 +1,178 @@
+import bz2
+import gzip
+import lzma
+import os
+import re
+import shutil
+import sys
+import tempfile
+import unittest
+from trace_parser import TRACE_FIELDS, iter_compressed_ranges, open_trace, parse_trace_line, parse_trace_line_spans, read_trace_file, trace_compression
+from trace_table import read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+# The per-header regex searches parse_trace_line replaced, kept as the reference output
+def reference_parse_trace_line(line):
+    event_match = re.search(r"(\w)\s([\d.]+)", line)
+    rate_match = re.search(r"(\w+Rate[\d\w]+)", line)
+    node_device_match = re.search(r"/NodeList/(\d+)/DeviceList/(\d+)", line)
+    event_type = event_match.group(1) if event_match else None
+    event_time = float(event_match.group(2)) if event_match else None
+    rate = rate_match.group(1) if rate_match else None
+    node = int(node_device_match.group(1)) if node_device_match else None
+    device = int(node_device_match.group(2)) if node_device_match else None
+
+    def search(pattern):
+        header_match = re.search(pattern, line)
+        return header_match.group(0) if header_match else None
+
+    ipv4_header = None
+    ipv4_header_match = re.search(r"ns3::Ipv4Header \((.*)\)", line)
+    if ipv4_header_match:
+        nested_level = 1
+        for i in range(ipv4_header_match.start(1) + 1, len(line)):
+            if line[i] == '(':
+                nested_level += 1
+            elif line[i] == ')':
+                nested_level -= 1
+                if nested_level == 0:
+                    ipv4_header = line[ipv4_header_match.start():i + 1]
+                    break
+    src_ip = dst_ip = None
+    if ipv4_header:
+        ips = re.findall(r"(\d+\.\d+\.\d+\.\d+)", ipv4_header)
+        if len(ips) == 2:
+            src_ip, dst_ip = ips
+    return {"time": event_time, "event_type": event_type, "rate": rate, "node": node, "device": device,
+            "mac_header": search(r"ns3::WifiMacHeader \([^\)]*\)"), "llc_header": search(r"ns3::LlcSnapHeader \([^\)]*\)"),
+            "ipv4_header": ipv4_header, "udp_header": search(r"ns3::UdpHeader \([^\)]*\)"),
+            "olsr_packet_header": search(r"ns3::olsr::PacketHeader \([^\)]*\)"),
+            "olsr_message_header": search(r"ns3::olsr::MessageHeader \([^\)]*\)"), "src_ip": src_ip, "dst_ip": dst_ip}
+
+WIFI_PATH = "/NodeList/3/DeviceList/0/$ns3::WifiNetDevice/Phy/State"
+CSMA_PATH = "/NodeList/1/DeviceList/1/$ns3::CsmaNetDevice"
+DATA_MAC = "ns3::WifiMacHeader (DATA ToDS=0, FromDS=0, MoreFrag=0, Retry=0, MoreData=0 Duration/ID=0us, DA=ff:ff:ff:ff:ff:ff, SA=00:00:00:00:00:04, BSSID=ff:ff:ff:ff:ff:ff, FragNumber=0, SeqNumber=7)"
+IPV4 = "ns3::Ipv4Header (tos 0x0 DSCP Default ECN Not-ECT ttl 64 id 12 protocol 17 offset (bytes) 0 flags [none] length: 84 10.1.1.4 > 10.1.1.9)"
+ARP = "ns3::ArpHeader (request source mac: 00-06-00:00:00:00:00:04 source ipv4: 10.1.1.4 dest ipv4: 10.1.1.9)"
+ETHERNET = "ns3::EthernetHeader ( length/type=0x806, source=00:00:00:00:00:02, destination=ff:ff:ff:ff:ff:ff)"
+
+# OLSR, Wi-Fi, ARP and CSMA lines as ns-3 writes them, and lines that must fall back
+SAMPLE_LINES = [
+    f"t 2.5 {WIFI_PATH}/Tx OfdmRate6Mbps {DATA_MAC} ns3::LlcSnapHeader (type 0x800) {IPV4.replace('10.1.1.9', '10.1.1.255')} ns3::UdpHeader (length: 64 698 > 698) ns3::olsr::PacketHeader (len=56 seqNumber=3) ns3::olsr::MessageHeader (type=TC, vtime=15s, originatorAddress=10.1.1.4) Payload (size=8) ns3::WifiMacTrailer ()",
+    f"r 2.5002 {WIFI_PATH}/RxOk OfdmRate24Mbps {DATA_MAC} ns3::LlcSnapHeader (type 0x800) {IPV4} ns3::UdpHeader (length: 64 49153 > 9) Payload (size=56) ns3::WifiMacTrailer ()",
+    f"t 2.5003 {WIFI_PATH}/Tx OfdmRate6Mbps ns3::WifiMacHeader (ACK RA=00:00:00:00:00:04) ns3::WifiMacTrailer ()",
+    f"t 3.1 {WIFI_PATH}/Tx DsssRate1Mbps {DATA_MAC} ns3::LlcSnapHeader (type 0x806) {ARP} ns3::WifiMacTrailer ()",
+    f"+ 1.0 {CSMA_PATH}/TxQueue/Enqueue {ETHERNET} {ARP} Payload (size=18) ns3::EthernetTrailer (fcs=0)",
+    f"r 2.00369 {CSMA_PATH}/MacRx {ETHERNET.replace('0x806', '0x800')} {IPV4} ns3::UdpHeader (length: 64 49153 > 9) Payload (size=56) ns3::EthernetTrailer (fcs=0)",
+    f"r 4.0 {CSMA_PATH}/MacRx {ETHERNET} {IPV4.replace('protocol 17', 'protocol 1')} ns3::Icmpv4Header (type=8, code=0) ns3::Icmpv4Echo (identifier=1, sequence=2) Payload (size=48) ns3::EthernetTrailer (fcs=0)",
+    # Missing rate, rate inside the path, tab separators and an HT rate without "Rate"
+    f"t 5.0 {WIFI_PATH}/Tx {DATA_MAC} ns3::LlcSnapHeader (type 0x800) {IPV4} ns3::WifiMacTrailer ()",
+    f"t 5.0 /NodeList/3/DeviceList/0/OfdmRate6Mbps/Tx OfdmRate12Mbps {DATA_MAC}",
+    f"t\t5.0 {WIFI_PATH}/Tx\tOfdmRate6Mbps {DATA_MAC}",
+    f"t 5.0 {WIFI_PATH}/Tx HtMcs7 {DATA_MAC} ns3::LlcSnapHeader (type 0x800) {IPV4} ns3::WifiMacTrailer ()",
+    # Headers out of order, repeated, nested deeper, inside the Ipv4Header or malformed
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps ns3::LlcSnapHeader (type 0x800) {DATA_MAC} {IPV4}",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {DATA_MAC} {DATA_MAC.replace('SeqNumber=7', 'SeqNumber=8')} {IPV4} {IPV4}",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('(bytes)', '((bytes) x)')} ns3::UdpHeader (length: 64 1 > 2)",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('flags', 'ns3::UdpHeader (inner) flags')}",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('10.1.1.4 > ', '10.1.1.4 > 10.1.1.5 > ')}",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('tos 0x0', 'tos 1.2.3.4')} ns3::UdpHeader (length: 64 1 > 2) ns3::WifiMacTrailer ()",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('offset (bytes) 0', 'offset 0')} ns3::UdpHeader (length: 64 1 > 2) ns3::WifiMacTrailer ()",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('offset (bytes)', 'offset ((bytes)')} ns3::UdpHeader (length: 64 1 > 2) ns3::WifiMacTrailer ()",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {IPV4.replace('flags', '(x) flags')} ns3::UdpHeader (length: 64 1 > 2) ns3::WifiMacTrailer ()",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps ns3::WifiMacHeader (ACK RA=00:00:00:00:00:04) ns3::WifiMacTrailer () ns3::LlcSnapHeader (type 0x800)",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps {DATA_MAC} Payload (size=8) ns3::WifiMacTrailer () {IPV4}",
+    f"t 6.0 /NodeList/1234/DeviceList/12/Tx OfdmRate6Mbps {DATA_MAC}",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps ns3::WifiMacHeader (DATA unterminated",
+    f"t 6.0 {WIFI_PATH}/Tx OfdmRate6Mbps ns3::Ipv4Header (tos 0x0 (unbalanced 10.1.1.4 > 10.1.1.9)",
+    "t 1.5e-3 /NodeList/0/DeviceList/0 OfdmRate6Mbps",
+    "not a trace line",
+    "",
+]
+
+def entry_fields(entry):
+    return {field: getattr(entry, field) for field in TRACE_FIELDS}
+
+class ParseTraceLineTest(unittest.TestCase):
+    def assert_same_as_reference(self, line):
+        expected = reference_parse_trace_line(line)
+        self.assertEqual(entry_fields(parse_trace_line(line)), expected, line)
+        entry, spans = parse_trace_line_spans(line)
+        headers = [line[span[0]:span[1]] if span else None for span in spans]
+        fields = dict(entry_fields(entry), **dict(zip(TRACE_FIELDS[5:11], headers)))
+        self.assertEqual(fields, expected, line)
+
+    def test_sample_lines(self):
+        for line in SAMPLE_LINES:
+            self.assert_same_as_reference(line)
+            self.assert_same_as_reference(line + "\n")
+
+    def test_generated_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.tr")
+            write_trace(path, 5000, seed=1)
+            with open(path) as file:
+                for line in file:
+                    self.assert_same_as_reference(line)
+
+class CompressedTraceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "trace.tr")
+        write_trace(cls.path, 3000, seed=7)
+        cls.paths = {}
+        for compression, module, suffix in (("gzip", gzip, ".gz"), ("xz", lzma, ".xz"), ("bz2", bz2, ".bz2")):
+            cls.paths[compression] = cls.path + suffix
+            with open(cls.path, 'rb') as source, module.open(cls.paths[compression], 'wb') as target:
+                shutil.copyfileobj(source, target)
+        cls.expected = [entry_fields(entry) for entry in read_trace_file(cls.path, max_workers=1)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_detected_by_content(self):
+        self.assertIsNone(trace_compression(self.path))
+        for compression, path in self.paths.items():
+            # A misleading name doesn't matter, only the leading bytes
+            renamed = os.path.join(self.directory.name, f"{compression}.tr")
+            shutil.copyfile(path, renamed)
+            self.assertEqual(trace_compression(renamed), compression)
+
+    def test_read_trace_file(self):
+        for compression, path in self.paths.items():
+            for max_workers in (1, 2):
+                entries = [entry_fields(entry) for entry in read_trace_file(path, max_workers=max_workers)]
+                self.assertEqual(entries, self.expected, (compression, max_workers))
+
+    def test_read_trace_table(self):
+        for compression, path in self.paths.items():
+            table = read_trace_table(path, max_workers=1, lazy_headers=True)
+            self.assertEqual([entry_fields(entry) for entry in table], self.expected, compression)
+
+    def test_ranges_split_on_lines(self):
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        for compression, path in self.paths.items():
+            ranges = list(iter_compressed_ranges(path, range_bytes=10000))
+            self.assertGreater(len(ranges), 1)
+            self.assertEqual(b"".join(range_data for _, _, _, range_data in ranges), data, compression)
+            position = 0
+            for _, start, end, range_data in ranges:
+                self.assertEqual((start, end), (position, position + len(range_data)))
+                self.assertTrue(range_data.endswith(b"\n"))
+                position = end
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc to count open files")
+    def test_open_trace_closes_file(self):
+        open_files = len(os.listdir("/proc/self/fd"))
+        for compression, path in self.paths.items():
+            with open_trace(path) as file:
+                self.assertTrue(file.readline().startswith(("t ", "r ")), compression)
+            self.assertEqual(len(os.listdir("/proc/self/fd")), open_files, compression)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import unittest
+from trace_parser import TRACE_FIELDS, read_trace_file
+from trace_table import HEADER_FIELDS, TraceTable, read_trace_table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from generators import write_trace
+
+def entry_fields(entry):
+    return tuple(getattr(entry, field) for field in TRACE_FIELDS)
+
+class TraceTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "trace.tr")
+        write_trace(cls.path, 3000, seed=2)
+        cls.entries = read_trace_file(cls.path, max_workers=1)
+        cls.table = read_trace_table(cls.path, max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def reference_select(self, filters, time_range=None):
+        rows = []
+        for row, entry in enumerate(self.entries):
+            if any(getattr(entry, field) != value for field, value in filters.items()):
+                continue
+            if time_range is not None and not time_range[0] <= entry.time < time_range[1]:
+                continue
+            rows.append(row)
+        return rows
+
+    def test_rows_match_entries(self):
+        self.assertEqual(len(self.table), len(self.entries))
+        self.assertEqual([entry_fields(entry) for entry in self.table], [entry_fields(entry) for entry in self.entries])
+
+    def test_select(self):
+        for filters in ({}, {"event_type": "r"}, {"node": 3}, {"node": 3, "event_type": "t"}, {"src_ip": "10.1.1.5", "dst_ip": "10.1.1.255"}, {"node": 99}):
+            self.assertEqual(list(self.table.select(filters)), self.reference_select(filters), filters)
+
+    def test_select_time_range(self):
+        first, last = self.table.time[0], self.table.time[-1]
+        middle = (first + last) / 2
+        for time_range in ((first, middle), (middle, last + 1), (last + 1, last + 2), (self.table.time[10], self.table.time[10])):
+            for filters in ({}, {"event_type": "r", "node": 7}):
+                self.assertEqual(list(self.table.select(filters, time_range)), self.reference_select(filters, time_range), (filters, time_range))
+
+    def test_window_on_unsorted_table(self):
+        # The same rows in reverse order: window() can no longer binary search
+        table = self.table.take(range(len(self.table) - 1, -1, -1))
+        self.assertFalse(table.time_sorted)
+        start, end = self.table.time[100], self.table.time[200]
+        expected = [row for row in range(len(table)) if start <= table.time[row] < end]
+        self.assertEqual(list(table.window(start, end)), expected)
+        # Rows with equal times keep their order, which here is reversed
+        expected = sorted(range(len(table)), key=lambda row: table.time[row])
+        self.assertEqual([entry_fields(entry) for entry in table.sort_by_time()], [entry_fields(table[row]) for row in expected])
+
+    def test_index(self):
+        for field in ("event_type", "node", "src_ip", "ipv4_header"):
+            index = self.table.index(field)
+            self.assertEqual(sorted(row for rows in index.values() for row in rows), list(range(len(self.table))))
+            for value, rows in index.items():
+                self.assertTrue(all(getattr(self.entries[row], field) == value for row in rows), (field, value))
+
+    def test_index_updated_on_extend(self):
+        table = TraceTable.from_entries(self.entries[:1000])
+        table.index("node")
+        table.extend_table(TraceTable.from_entries(self.entries[1000:]))
+        self.assertEqual({value: list(rows) for value, rows in table.index("node").items()}, {value: list(rows) for value, rows in self.table.build_index("node").items()})
+
+    def test_take_shares_dictionaries(self):
+        part = self.table.take(range(0, len(self.table), 2))
+        self.assertIs(part.ipv4_header.values, self.table.ipv4_header.values)
+        self.assertEqual([entry_fields(entry) for entry in part], [entry_fields(entry) for entry in self.entries[::2]])
+
+    def test_lazy_headers(self):
+        table = read_trace_table(self.path, max_workers=1, lazy_headers=True)
+        try:
+            self.assertEqual(list(table.select({"ipv4_header": self.entries[5].ipv4_header})), self.reference_select({"ipv4_header": self.entries[5].ipv4_header}))
+            self.assertEqual([entry_fields(entry) for entry in table], [entry_fields(entry) for entry in self.entries])
+        finally:
+            table.close()
+        for field in HEADER_FIELDS:
+            self.assertIsNone(getattr(table, field).mapped)
+
+if __name__ == "__main__":
+    unittest.main()
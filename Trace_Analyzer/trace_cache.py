@@ -0,0 +1,235 @@
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import zlib
+from array import array
+from trace_table import DICTIONARY_FIELDS, DictionaryColumn, TraceTable, count_table, read_trace_table, time_sorted
+from instrumentation import DISABLED
+
+CACHE_MAGIC = b"NS3TRACE"
+CACHE_VERSION = 2
+CACHE_SUFFIX = ".ns3trace"
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "ns3-utilities", "traces")
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024 ** 3
+
+# The content hash covers the head and tail of the file plus evenly spaced blocks in
+# between, so validating a multi-GB trace reads a few MB instead of the whole file
+HASH_EDGE_BYTES = 1024 * 1024
+HASH_SAMPLE_BYTES = 64 * 1024
+HASH_SAMPLES = 16
+
+def content_hash(file_path):
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=20)
+    with open(file_path, 'rb') as file:
+        if size <= 2 * HASH_EDGE_BYTES + HASH_SAMPLES * HASH_SAMPLE_BYTES:
+            digest.update(file.read())
+        else:
+            digest.update(file.read(HASH_EDGE_BYTES))
+            step = (size - 2 * HASH_EDGE_BYTES) // (HASH_SAMPLES + 1)
+            for i in range(1, HASH_SAMPLES + 1):
+                file.seek(HASH_EDGE_BYTES + i * step)
+                digest.update(file.read(HASH_SAMPLE_BYTES))
+            file.seek(size - HASH_EDGE_BYTES)
+            digest.update(file.read(HASH_EDGE_BYTES))
+    return digest.hexdigest()
+
+def file_identity(file_path):
+    stat = os.stat(file_path)
+    return {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": content_hash(file_path),
+    }
+
+# Rows compressed per step by write_table_batches
+WRITE_BATCH_ROWS = 50000
+
+def dictionary_sections(table):
+    # (name, data) pairs for the dictionary values of each column: UTF-8 byte lengths plus
+    # one concatenated blob, leaving out the None kept at code 0
+    sections = []
+    for field in DICTIONARY_FIELDS:
+        encoded = [value.encode() for value in getattr(table, field).values[1:]]
+        sections.append((f"{field}.lengths", array('I', [len(value) for value in encoded])))
+        sections.append((f"{field}.values", b"".join(encoded)))
+    return sections
+
+def row_columns(table):
+    # (name, array) pairs for the per-row arrays
+    return [("time", table.time), ("node", table.node), ("device", table.device)] + [(f"{field}.codes", getattr(table, field).codes) for field in DICTIONARY_FIELDS]
+
+# Section order in the file
+SECTION_ORDER = ["time", "node", "device"] + [f"{field}.{part}" for field in DICTIONARY_FIELDS for part in ("codes", "lengths", "values")]
+
+def write_table_batches(cache_path, identity, table, rows=None, batch_rows=WRITE_BATCH_ROWS):
+    # Writes the given rows of table (all of them if rows is None) in the cache format.
+    # Each per-row section is compressed as a stream, batch_rows rows at a time, and the
+    # number of rows done is yielded after each batch; the file is only written once the
+    # generator is run to the end, so a caller stops early to cancel. Dictionaries are
+    # written whole, so codes stay those of table.
+    columns = row_columns(table)
+    compressors = [zlib.compressobj(1) for _ in columns]
+    blobs = {name: [] for name, _ in columns}
+    total_rows = len(table) if rows is None else len(rows)
+    sorted_rows = table.time_sorted if rows is None else True
+    previous_time = -math.inf
+
+    for start in range(0, total_rows, batch_rows):
+        end = min(start + batch_rows, total_rows)
+        for (name, column), compressor in zip(columns, compressors):
+            data = column[start:end] if rows is None else array(column.typecode, [column[row] for row in rows[start:end]])
+            blobs[name].append(compressor.compress(data.tobytes()))
+            if name == "time" and rows is not None and sorted_rows:
+                sorted_rows = time_sorted(array('d', [previous_time]) + data, 1)
+                previous_time = data[-1]
+        yield end
+
+    sections = {}
+    for (name, column), compressor in zip(columns, compressors):
+        blobs[name].append(compressor.flush())
+        sections[name] = (column.typecode, b"".join(blobs[name]))
+    for name, data in dictionary_sections(table):
+        typecode = data.typecode if isinstance(data, array) else None
+        sections[name] = (typecode, zlib.compress(data.tobytes() if typecode else data, 1))
+
+    header = dict(identity, version=CACHE_VERSION, byteorder=sys.byteorder, rows=total_rows, time_sorted=sorted_rows, sections=[])
+    for name in SECTION_ORDER:
+        typecode, blob = sections[name]
+        header["sections"].append([name, typecode, array(typecode).itemsize if typecode else None, len(blob)])
+
+    header_bytes = json.dumps(header).encode()
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(CACHE_MAGIC)
+        file.write(struct.pack("<I", len(header_bytes)))
+        file.write(header_bytes)
+        for name in SECTION_ORDER:
+            file.write(sections[name][1])
+    os.replace(temp_path, cache_path)
+
+def write_table(cache_path, identity, table):
+    for _ in write_table_batches(cache_path, identity, table):
+        pass
+
+def read_header(file):
+    if file.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+        return None
+    (header_length,) = struct.unpack("<I", file.read(4))
+    header = json.loads(file.read(header_length))
+    return header if header.get("version") == CACHE_VERSION else None
+
+def read_table(file, header):
+    sections = {}
+    for name, typecode, itemsize, length in header["sections"]:
+        raw = zlib.decompress(file.read(length))
+        if typecode is None:
+            sections[name] = raw
+            continue
+        if array(typecode).itemsize != itemsize:
+            return None
+        data = array(typecode)
+        data.frombytes(raw)
+        if header["byteorder"] != sys.byteorder:
+            data.byteswap()
+        sections[name] = data
+
+    table = TraceTable()
+    table.time_sorted = header["time_sorted"]
+    table.time = sections["time"]
+    table.node = sections["node"]
+    table.device = sections["device"]
+    for field in DICTIONARY_FIELDS:
+        column = DictionaryColumn(sections[f"{field}.codes"].typecode)
+        column.codes = sections[f"{field}.codes"]
+        blob = sections[f"{field}.values"]
+        position = 0
+        for length in sections[f"{field}.lengths"]:
+            column.values.append(blob[position:position + length].decode())
+            position += length
+        column.lookup = {value: code for code, value in enumerate(column.values)}
+        setattr(table, field, column)
+    return table
+
+class TraceCache:
+    # Sidecar store of parsed traces in a compressed columnar format. Entries are named
+    # after the trace path and only reused when size, mtime and content hash still
+    # match; the least recently used entries are evicted beyond max_bytes.
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def cache_path(self, file_path):
+        name = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, name + CACHE_SUFFIX)
+
+    def load(self, file_path, identity=None):
+        cache_path = self.cache_path(file_path)
+        if not os.path.exists(cache_path):
+            return None
+        identity = identity or file_identity(file_path)
+        try:
+            with open(cache_path, 'rb') as file:
+                header = read_header(file)
+                if header is None or any(header.get(key) != value for key, value in identity.items()):
+                    return None
+                table = read_table(file, header)
+        except (OSError, ValueError, KeyError, struct.error, zlib.error) as e:
+            print(f"Ignoring unreadable cache entry {cache_path}: {e}")
+            return None
+        if table is not None:
+            # Touching the entry keeps it at the recent end for eviction
+            os.utime(cache_path)
+        return table
+
+    def store(self, file_path, table, identity=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_table(self.cache_path(file_path), identity or file_identity(file_path), table)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_SUFFIX):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(CACHE_SUFFIX):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+def read_trace_table_cached(file_path, progress_callback=None, max_workers=None, cache=None, instrumentation=DISABLED, cancel_event=None, part_callback=None, lazy_headers=False):
+    # read_trace_table, reusing the cached table when the file hasn't changed. A lazily
+    # parsed table is not stored, as that would decode every header.
+    cache = cache or TraceCache()
+    with instrumentation.stage("cache lookup"):
+        identity = file_identity(file_path)
+        table = cache.load(file_path, identity)
+    if table is None:
+        table = read_trace_table(file_path, progress_callback, max_workers, instrumentation, cancel_event, part_callback, lazy_headers)
+        if table is None or lazy_headers:
+            return table
+        with instrumentation.stage("cache store"):
+            try:
+                cache.store(file_path, table, identity)
+            except OSError as e:
+                print(f"Could not write trace cache: {e}")
+    else:
+        count_table(instrumentation, table)
+        instrumentation.count("cache hits")
+        if progress_callback:
+            progress_callback(100, 0, 0)
+    return table
@@ -0,0 +1,110 @@
+import math
+import re
+from array import array
+from collections import OrderedDict
+
+IPV4_IDENTITY_PATTERN = re.compile(r"ttl (\d+) id (\d+) protocol (\d+)")
+
+DEFAULT_MAX_IN_FLIGHT = 100000
+DEFAULT_MAX_AGE = 10.0
+
+def ipv4_identity(ipv4_header):
+    # (ttl, id, protocol) from an Ipv4Header span, or None
+    match = IPV4_IDENTITY_PATTERN.search(ipv4_header) if ipv4_header else None
+    return tuple(int(value) for value in match.groups()) if match else None
+
+class DelayCorrelator:
+    # Hash join of transmit and receive events in one pass over a time-ordered trace.
+    # A packet is identified by (src IP, dst IP, IPv4 id, protocol); adding the TTL
+    # identifies one hop, since forwarding nodes decrement it. The receive of a hop joins
+    # the latest transmit with the same hop key (MAC retries overwrite it). The node a
+    # packet is first transmitted from owns its source address; a receive on the node
+    # owning the destination address is the packet's arrival, and its delay from that
+    # first transmit is the end-to-end delay. Receives on forwarding or overhearing nodes,
+    # and broadcasts, have no end-to-end delay. A receive can't tell the addressed node
+    # from an overhearing one, so a destination's node is only known once it has sent:
+    # packets to nodes that never send (e.g. a UDP PacketSink), or that arrive before the
+    # destination's first transmit, get no end-to-end delay unless node_addresses
+    # ({address: node}) names the destination's node up front. Only packets seen in the
+    # last max_age seconds, and at most max_in_flight of them, are kept.
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_age=DEFAULT_MAX_AGE, node_addresses=None):
+        self.max_in_flight = max_in_flight
+        self.max_age = max_age
+        self.hop_transmits = OrderedDict()
+        self.first_transmits = OrderedDict()
+        self.address_nodes = dict(node_addresses or {})
+
+    def expire(self, in_flight, now):
+        while in_flight and (len(in_flight) > self.max_in_flight or next(iter(in_flight.values())) < now - self.max_age):
+            in_flight.popitem(last=False)
+
+    def add(self, time, event_type, packet_key, ttl, node=None):
+        # Returns (hop delay, end-to-end delay) for receive events, None where unmatched.
+        # packet_key starts with the source and destination address.
+        if packet_key is None or time is None:
+            return None, None
+        hop_key = (packet_key, ttl)
+        self.expire(self.hop_transmits, time)
+        self.expire(self.first_transmits, time)
+        if event_type == 't':
+            self.hop_transmits.pop(hop_key, None)
+            self.hop_transmits[hop_key] = time
+            if packet_key not in self.first_transmits:
+                self.first_transmits[packet_key] = time
+                if node is not None:
+                    self.address_nodes.setdefault(packet_key[0], node)
+            self.expire(self.hop_transmits, time)
+            self.expire(self.first_transmits, time)
+            return None, None
+        if event_type == 'r':
+            hop_time = self.hop_transmits.get(hop_key)
+            first_time = self.first_transmits.get(packet_key)
+            arrived = first_time is not None and node is not None and self.address_nodes.get(packet_key[1]) == node
+            return (None if hop_time is None else time - hop_time), (time - first_time if arrived else None)
+        return None, None
+
+def packet_identity(src_ip, dst_ip, ipv4_header):
+    # (packet key, ttl), or (None, None) for frames without a usable IPv4 header
+    identity = ipv4_identity(ipv4_header)
+    if identity is None or src_ip is None or dst_ip is None:
+        return None, None
+    ttl, packet_id, protocol = identity
+    return (src_ip, dst_ip, packet_id, protocol), ttl
+
+def correlate_entries(trace_entries, max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_age=DEFAULT_MAX_AGE, node_addresses=None):
+    # Yields (entry, hop delay, end-to-end delay) for any iterable of TraceEntry, e.g. iter_trace_entries
+    correlator = DelayCorrelator(max_in_flight, max_age, node_addresses)
+    for entry in trace_entries:
+        packet_key, ttl = packet_identity(entry.src_ip, entry.dst_ip, entry.ipv4_header)
+        yield (entry, *correlator.add(entry.time, entry.event_type, packet_key, ttl, entry.node))
+
+def table_delays(table, max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_age=DEFAULT_MAX_AGE, node_addresses=None):
+    # Per-row hop and end-to-end delay columns for a TraceTable (NaN where there is no match).
+    # Header identities are parsed once per distinct Ipv4Header rather than per row, and
+    # addresses are joined on their dictionary codes. Destination codes are mapped onto the
+    # source column's codes (negative for addresses that never send) so that a destination
+    # can be matched against the nodes owning source addresses; node_addresses is keyed the
+    # same way.
+    identity_by_code = [ipv4_identity(value) for value in table.ipv4_header.values]
+    dst_keys = [table.src_ip.lookup.get(value, -code) for code, value in enumerate(table.dst_ip.values)]
+    address_nodes = {}
+    for address, node in (node_addresses or {}).items():
+        key = table.src_ip.lookup.get(address) or -table.dst_ip.lookup.get(address, 0)
+        if key:
+            address_nodes[key] = node
+    event_values = table.event_type.values
+    correlator = DelayCorrelator(max_in_flight, max_age, address_nodes)
+    hop_delay = array('d', [math.nan]) * len(table)
+    end_to_end_delay = array('d', [math.nan]) * len(table)
+
+    for row, (time, node, event_code, ipv4_code, src_code, dst_code) in enumerate(zip(table.time, table.node, table.event_type.codes, table.ipv4_header.codes, table.src_ip.codes, table.dst_ip.codes)):
+        identity = identity_by_code[ipv4_code]
+        if identity is None or not src_code or not dst_code or time != time:
+            continue
+        ttl, packet_id, protocol = identity
+        hop, end_to_end = correlator.add(time, event_values[event_code], (src_code, dst_keys[dst_code], packet_id, protocol), ttl, node if node >= 0 else None)
+        if hop is not None:
+            hop_delay[row] = hop
+        if end_to_end is not None:
+            end_to_end_delay[row] = end_to_end
+    return hop_delay, end_to_end_delay
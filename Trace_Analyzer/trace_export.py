@@ -0,0 +1,88 @@
+import csv
+import os
+import time
+from trace_parser import CSV_HEADERS, display_event_type, display_node
+from trace_cache import CACHE_SUFFIX, read_header, read_table, write_table_batches
+
+EXPORT_BATCH_ROWS = 50000
+EXPORT_BUFFER_BYTES = 4 * 1024 * 1024
+COLUMNAR_SUFFIX = CACHE_SUFFIX
+
+def report_progress(progress_callback, rows_done, total_rows, start_time):
+    if progress_callback and rows_done:
+        elapsed_time = time.time() - start_time
+        time_remaining = elapsed_time / rows_done * (total_rows - rows_done)
+        progress_callback(rows_done / total_rows * 100, elapsed_time, time_remaining)
+
+def iter_display_batches(table, rows, batch_size=EXPORT_BATCH_ROWS):
+    # Lists of CSV_HEADERS-ordered tuples, built column by column from the table. Display
+    # strings for event types and nodes are derived once per distinct value, not per row.
+    event_types = [display_event_type(value) for value in table.event_type.values]
+    node_names = {}
+    columns = [table.rate, table.src_ip, table.dst_ip, table.mac_header, table.llc_header, table.ipv4_header, table.udp_header, table.olsr_packet_header, table.olsr_message_header]
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        times = [table.time[row] for row in batch]
+        times = [None if value != value else value for value in times]
+        events = [event_types[table.event_type.codes[row]] for row in batch]
+        nodes = []
+        for row in batch:
+            node = table.node[row]
+            name = node_names.get(node)
+            if name is None:
+                name = node_names[node] = display_node(node if node >= 0 else None)
+            nodes.append(name)
+        devices = [None if table.device[row] < 0 else table.device[row] for row in batch]
+        rate, src_ip, dst_ip, mac, llc, ipv4, udp, olsr_packet, olsr_message = ([column.values[column.codes[row]] for row in batch] for column in columns)
+        yield list(zip(times, events, rate, nodes, src_ip, dst_ip, devices, mac, llc, ipv4, udp, olsr_packet, olsr_message))
+
+def export_csv(table, rows, file_path, progress_callback=None, cancel_event=None):
+    # Writes the rows in batches through a large buffer into a temporary file that replaces
+    # file_path when done. Returns False, leaving no partial file, if cancel_event is set.
+    start_time = time.time()
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    rows_done = 0
+    try:
+        with open(temp_path, mode='w', newline='', buffering=EXPORT_BUFFER_BYTES) as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADERS)
+            for batch in iter_display_batches(table, rows):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                writer.writerows(batch)
+                rows_done += len(batch)
+                report_progress(progress_callback, rows_done, len(rows), start_time)
+        os.replace(temp_path, file_path)
+        return True
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def export_columnar(table, rows, file_path, progress_callback=None, cancel_event=None):
+    # The trace cache format: zlib-compressed typed columns with each distinct string
+    # stored once, typically an order of magnitude smaller than the CSV. Columns are
+    # gathered and compressed in batches; returns False, leaving no file, if cancel_event
+    # is set.
+    start_time = time.time()
+    for rows_done in write_table_batches(file_path, {"exported": True}, table, rows, EXPORT_BATCH_ROWS):
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        report_progress(progress_callback, rows_done, len(rows), start_time)
+    return True
+
+EXPORT_FORMATS = {".csv": export_csv, COLUMNAR_SUFFIX: export_columnar}
+
+def export_trace(table, rows, file_path, progress_callback=None, cancel_event=None):
+    # Picks the format from the file extension, CSV unless it ends in COLUMNAR_SUFFIX
+    export = EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower(), export_csv)
+    return export(table, rows, file_path, progress_callback, cancel_event)
+
+def read_trace_export(file_path):
+    # Loads a columnar export back into a TraceTable
+    with open(file_path, 'rb') as file:
+        header = read_header(file)
+        table = read_table(file, header) if header is not None else None
+    if table is None:
+        raise ValueError(f"{file_path} is not a columnar trace export")
+    return table
@@ -0,0 +1,74 @@
+import os
+from trace_parser import parse_byte_range, trace_compression
+from trace_table import TraceTable
+
+# Upper bound on the bytes parsed by one read, so catching up on a long-running trace is
+# spread over several small parts and merging one part never holds up the caller for long
+FOLLOW_MAX_BYTES = 1024 * 1024
+
+class TraceFollower:
+    # Tails a trace that ns-3 is still writing. read_part() parses only the complete lines
+    # appended since the last read into a new TraceTable, and add_part() merges it into
+    # table, whose indexes are updated in place. The two may run on different threads:
+    # read_part() only touches the file offset and add_part() only the table and metrics.
+    # A trailing partial line is left for the next read. If the file shrinks, the
+    # simulation was restarted and the table starts over.
+    def __init__(self, file_path, metrics=None, max_bytes=FOLLOW_MAX_BYTES):
+        if trace_compression(file_path):
+            raise ValueError(f"{file_path} is compressed and cannot be followed")
+        self.file_path = file_path
+        self.metrics = metrics
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.table = TraceTable()
+
+    def reset(self):
+        self.table = TraceTable()
+        if self.metrics is not None:
+            self.metrics.clear()
+
+    def read_part(self):
+        # The rows appended since the last read, or None if the file shrank and reading
+        # starts over from its beginning
+        size = os.path.getsize(self.file_path)
+        if size < self.offset:
+            self.offset = 0
+            return None
+        if size == self.offset:
+            return TraceTable()
+
+        with open(self.file_path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(min(size - self.offset, self.max_bytes))
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            if len(data) < self.max_bytes:
+                return TraceTable()
+            # A single line longer than max_bytes; read it whole
+            with open(self.file_path, 'rb') as file:
+                file.seek(self.offset)
+                data = file.readline()
+            cut = len(data) if data.endswith(b'\n') else 0
+            if cut == 0:
+                return TraceTable()
+
+        start = self.offset
+        self.offset += cut
+        return TraceTable.from_entries(parse_byte_range(data[:cut], start, self.offset))
+
+    def add_part(self, part):
+        # Returns the number of rows added, or None if the table was reset
+        if part is None:
+            self.reset()
+            return None
+        if len(part):
+            self.table.extend_table(part)
+            if self.metrics is not None:
+                self.metrics.add(part)
+        return len(part)
+
+    def poll(self):
+        return self.add_part(self.read_part())
+
+    def pending_bytes(self):
+        return max(0, os.path.getsize(self.file_path) - self.offset)
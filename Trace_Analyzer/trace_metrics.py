@@ -0,0 +1,164 @@
+import re
+import numpy as np
+
+IPV4_LENGTH_PATTERN = re.compile(r"length: (\d+)")
+RATE_PATTERN = re.compile(r"Rate(\d+)(?:_(\d+))?([KMG])bps")
+RATE_UNITS = {"K": 1e3, "M": 1e6, "G": 1e9}
+
+# Bytes added around the IPv4 packet on air: 802.11 MAC header (24), LLC/SNAP (8), FCS (4).
+# Frames without an IPv4 header (ACK, CTS, ...) are counted as control frames.
+MAC_OVERHEAD_BYTES = 36
+CONTROL_FRAME_BYTES = 14
+
+def ipv4_length(ipv4_header):
+    match = IPV4_LENGTH_PATTERN.search(ipv4_header) if ipv4_header else None
+    return int(match.group(1)) if match else 0
+
+def rate_bps(rate):
+    # "OfdmRate6Mbps" -> 6e6, "DsssRate5_5Mbps" -> 5.5e6; NaN when the mode has no rate in its name
+    match = RATE_PATTERN.search(rate) if rate else None
+    if not match:
+        return np.nan
+    whole, fraction, unit = match.groups()
+    return float(f"{whole}.{fraction or 0}") * RATE_UNITS[unit]
+
+def decode_column(column, function, dtype):
+    # Applies function once per distinct value, then gathers the result for every row by code
+    lookup = np.array([function(value) for value in column.values], dtype=dtype)
+    return lookup[np.frombuffer(column.codes, dtype=column.codes.typecode)]
+
+def grouped_sum(keys, weights, size):
+    return np.bincount(keys, weights=weights, minlength=size)[:size]
+
+class TraceMetrics:
+    # Per-node, per-flow and per-rate aggregates over a TraceTable. Every column is a
+    # NumPy view or a gather through dictionary codes, and each aggregate is a single
+    # bincount over combined group keys, so there are no per-row Python loops.
+    # rows optionally restricts the metrics to a selection such as TraceTable.select(); a
+    # range, as returned by TraceTable.window(), is taken as zero-copy slices. Time bins
+    # are counted from start_time, e.g. the start of that window.
+    def __init__(self, table, rows=None, start_time=0.0):
+        self.table = table
+        self.start_time = start_time
+        self.time = np.frombuffer(table.time, dtype=np.float64)
+        self.node = np.frombuffer(table.node, dtype=np.int32)
+        self.event_code = np.frombuffer(table.event_type.codes, dtype=table.event_type.codes.typecode)
+        self.src_code = np.frombuffer(table.src_ip.codes, dtype=table.src_ip.codes.typecode)
+        self.dst_code = np.frombuffer(table.dst_ip.codes, dtype=table.dst_ip.codes.typecode)
+        self.rate_code = np.frombuffer(table.rate.codes, dtype=table.rate.codes.typecode)
+        self.ip_bytes = decode_column(table.ipv4_header, ipv4_length, np.int64)
+        self.rate_bps = decode_column(table.rate, rate_bps, np.float64)
+        if rows is not None and not (isinstance(rows, range) and len(rows) == len(table)):
+            selection = slice(rows.start, rows.stop) if isinstance(rows, range) and rows.step == 1 else np.asarray(rows, dtype=np.int64)
+            for name in ("time", "node", "event_code", "src_code", "dst_code", "rate_code", "ip_bytes", "rate_bps"):
+                setattr(self, name, getattr(self, name)[selection])
+        self.node_count = int(self.node.max()) + 1 if len(self.node) else 0
+
+    def event_mask(self, event_type):
+        code = self.table.event_type.lookup.get(event_type)
+        if code is None:
+            return np.zeros(len(self.event_code), dtype=bool)
+        return self.event_code == code
+
+    def event_counts(self):
+        # {event type: array of counts indexed by node}
+        counts = {}
+        valid = self.node >= 0
+        for code, event_type in enumerate(self.table.event_type.values):
+            if event_type is not None:
+                counts[event_type] = np.bincount(self.node[valid & (self.event_code == code)], minlength=self.node_count)
+        return counts
+
+    def time_bins(self, bin_width):
+        valid = ~np.isnan(self.time)
+        bins = np.zeros(len(self.time), dtype=np.int64)
+        bins[valid] = np.maximum((self.time[valid] - self.start_time) // bin_width, 0).astype(np.int64)
+        bin_count = int(bins.max()) + 1 if valid.any() else 0
+        return bins, valid, bin_count
+
+    def node_throughput(self, bin_width=1.0, event_type='r'):
+        # Returns (bin start times, array[node, bin] in bit/s) of IPv4 bytes per node
+        bins, valid, bin_count = self.time_bins(bin_width)
+        mask = valid & self.event_mask(event_type) & (self.node >= 0)
+        keys = self.node[mask].astype(np.int64) * bin_count + bins[mask]
+        totals = grouped_sum(keys, self.ip_bytes[mask], self.node_count * bin_count)
+        return self.start_time + np.arange(bin_count) * bin_width, totals.reshape(self.node_count, bin_count) * 8 / bin_width
+
+    def flow_throughput(self, bin_width=1.0, event_type='r'):
+        # Returns ([(src, dst), ...], bin start times, array[flow, bin] in bit/s). Frames
+        # that are relayed or broadcast count once per matching event.
+        bins, valid, bin_count = self.time_bins(bin_width)
+        mask = valid & self.event_mask(event_type) & (self.src_code > 0) & (self.dst_code > 0)
+        pair_keys = self.src_code[mask].astype(np.int64) * len(self.table.dst_ip.values) + self.dst_code[mask]
+        pairs, flow_index = np.unique(pair_keys, return_inverse=True)
+        totals = grouped_sum(flow_index * bin_count + bins[mask], self.ip_bytes[mask], len(pairs) * bin_count)
+        dst_values = len(self.table.dst_ip.values)
+        flows = [(self.table.src_ip.values[pair // dst_values], self.table.dst_ip.values[pair % dst_values]) for pair in pairs.tolist()]
+        return flows, self.start_time + np.arange(bin_count) * bin_width, totals.reshape(len(pairs), bin_count) * 8 / bin_width
+
+    def rate_airtime(self, event_type='t'):
+        # {rate: seconds on air} for transmitted frames, from frame bytes over the PHY rate
+        frame_bytes = np.where(self.ip_bytes > 0, self.ip_bytes + MAC_OVERHEAD_BYTES, CONTROL_FRAME_BYTES)
+        mask = self.event_mask(event_type) & ~np.isnan(self.rate_bps)
+        airtime = grouped_sum(self.rate_code[mask], frame_bytes[mask] * 8 / self.rate_bps[mask], len(self.table.rate.values))
+        return {rate: float(airtime[code]) for code, rate in enumerate(self.table.rate.values) if rate is not None and airtime[code] > 0}
+
+    def summary(self, bin_width=1.0):
+        # Plain-Python version of the aggregates, for JSON output
+        bin_starts, node_rates = self.node_throughput(bin_width)
+        flows, _, flow_rates = self.flow_throughput(bin_width)
+        return {
+            "event_counts": {event_type: {f"N{node + 1}": int(count) for node, count in enumerate(counts) if count} for event_type, counts in self.event_counts().items()},
+            "node_mean_throughput_bps": {f"N{node + 1}": float(rates.mean()) for node, rates in enumerate(node_rates) if rates.any()},
+            # Keyed "src > dst" as in the Ipv4Header
+            "flow_mean_throughput_bps": {f"{src} > {dst}": float(rates.mean()) for (src, dst), rates in zip(flows, flow_rates) if rates.any()},
+            "rate_airtime_s": self.rate_airtime(),
+            "bin_width_s": bin_width,
+            "bins": len(bin_starts),
+            "start_time_s": self.start_time,
+        }
+
+class RunningMetrics:
+    # Event counts and received throughput per node, accumulated one batch of new rows at
+    # a time (e.g. from TraceFollower), so a growing trace is never re-aggregated from the
+    # start. Each batch is its own TraceTable; results are keyed by event type and node
+    # rather than by dictionary code, which differs between batches.
+    def __init__(self, bin_width=1.0):
+        self.bin_width = bin_width
+        self.clear()
+
+    def clear(self):
+        self.counts = {}
+        self.node_rates = np.zeros((0, 0))
+        self.rows = 0
+
+    def add(self, table):
+        metrics = TraceMetrics(table)
+        for event_type, counts in metrics.event_counts().items():
+            self.counts[event_type] = add_padded(self.counts.get(event_type, np.zeros(0, dtype=np.int64)), counts)
+        # Bit rates add up like the byte totals behind them, since the bin width is fixed
+        self.node_rates = add_padded(self.node_rates, metrics.node_throughput(self.bin_width)[1])
+        self.rows += len(table)
+
+    def event_counts(self):
+        return self.counts
+
+    def node_throughput(self):
+        return np.arange(self.node_rates.shape[1]) * self.bin_width, self.node_rates
+
+    def summary(self):
+        return {
+            "rows": self.rows,
+            "event_counts": {event_type: {f"N{node + 1}": int(count) for node, count in enumerate(counts) if count} for event_type, counts in self.counts.items()},
+            "node_mean_throughput_bps": {f"N{node + 1}": float(rates.mean()) for node, rates in enumerate(self.node_rates) if rates.any()},
+            "bin_width_s": self.bin_width,
+            "bins": self.node_rates.shape[1],
+        }
+
+def add_padded(total, part):
+    # total + part, zero-padding whichever is smaller along each axis
+    shape = tuple(max(a, b) for a, b in zip(total.shape, part.shape))
+    result = np.zeros(shape, dtype=np.result_type(total, part))
+    result[tuple(slice(0, size) for size in total.shape)] += total
+    result[tuple(slice(0, size) for size in part.shape)] += part
+    return result
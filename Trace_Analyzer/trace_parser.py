@@ -0,0 +1,445 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import mmap
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Byte ranges handed to each worker process; ranges always end on a newline
+RANGE_BYTES = 8 * 1024 * 1024
+
+# Worker processes keep at most this many byte ranges each queued or unread
+RANGES_IN_FLIGHT_PER_WORKER = 2
+
+# Compressed traces are recognized by their leading bytes, whatever they are named
+TRACE_SUFFIXES = (".tr", ".tr.gz", ".tr.xz", ".tr.bz2", ".tr.zst")
+COMPRESSION_MAGIC = ((b"\x1f\x8b", "gzip"), (b"\xfd7zXZ\x00", "xz"), (b"BZh", "bz2"), (b"\x28\xb5\x2f\xfd", "zstd"))
+
+# TraceEntry attributes in constructor order
+CSV_HEADERS = ["Time", "Event Type", "Rate", "Node", "Source IP", "Destination IP", "Device", "Mac Header", "LLC Header", "IPv4 Header", "UDP Header", "OLSR Packet Header", "OLSR Message Header"]
+TRACE_FIELDS = ("time", "event_type", "rate", "node", "device", "mac_header", "llc_header", "ipv4_header", "udp_header", "olsr_packet_header", "olsr_message_header", "src_ip", "dst_ip")
+
+class TraceEntry:
+    __slots__ = TRACE_FIELDS
+
+    def __init__(self, time, event_type, rate, node, device, mac_header, llc_header, ipv4_header, udp_header, olsr_packet_header, olsr_message_header, src_ip, dst_ip):
+        self.time = time
+        self.event_type = event_type
+        self.rate = rate
+        self.node = node
+        self.device = device
+        self.mac_header = mac_header
+        self.llc_header = llc_header
+        self.ipv4_header = ipv4_header
+        self.udp_header = udp_header
+        self.olsr_packet_header = olsr_packet_header
+        self.olsr_message_header = olsr_message_header
+        self.src_ip = src_ip
+        self.dst_ip = dst_ip
+
+    def __repr__(self):
+        return f"TraceEntry(time={self.time}, event_type={self.event_type}, rate={self.rate}, node={self.node}, device={self.device})"
+
+# Compiled once at import. TRACE_LINE_PATTERN tokenizes a whole Wi-Fi/OLSR line in one
+# left-to-right match: event, time, node/device path, rate, then the headers in the order
+# ns-3 prints them. Headers end at their first ')' like the generic search; Ipv4Header
+# is read as "(... (bytes) 0 flags [none] length: 84 <src> > <dst>)", with the words
+# before the addresses taken a token at a time so the match never backtracks into them.
+# match_trace_line checks the parentheses and dots the pattern lets through. Negated
+# single characters, possessive optional parts and the lazy rate prefix keep the rest
+# free of backtracking; everything after the node/device path is optional, so giving up
+# a part that matched could never make the line match. The payload and Wi-Fi trailer
+# are consumed so that most lines end the match. Node and device are captured together
+# as "3/DeviceList/0" and looked up in NODE_DEVICES.
+TRACE_LINE_PATTERN = re.compile(
+    r"(\w) ([\d.]+) /NodeList/(\d+/DeviceList/\d+)([^ ]*) (?:(\w+?Rate\w+) )?+"
+    r"(?:(ns3::WifiMacHeader \([^)]*\)) )?+"
+    r"(?:(ns3::LlcSnapHeader \([^)]*\)) )?+"
+    r"(?:(ns3::Ipv4Header \([^)]*\) (?:[^ ().]+ )*+(\d+\.\d+\.\d+\.\d+) > (\d+\.\d+\.\d+\.\d+)\)) )?+"
+    r"(?:(ns3::UdpHeader \([^)]*\)) )?+"
+    r"(?:(ns3::olsr::PacketHeader \([^)]*\)) )?+"
+    r"(?:(ns3::olsr::MessageHeader \([^)]*\)) )?+"
+    r"(?:Payload \(size=\d+\) )?+(?:ns3::WifiMacTrailer \(\))?+"
+)
+HEADER_PATTERN = re.compile(r"ns3::(WifiMacHeader|LlcSnapHeader|Ipv4Header|UdpHeader|olsr::PacketHeader|olsr::MessageHeader) \(")
+EVENT_PATTERN = re.compile(r"(\w)\s([\d.]+)")
+RATE_PATTERN = re.compile(r"(\w+Rate[\d\w]+)")
+NODE_DEVICE_PATTERN = re.compile(r"/NodeList/(\d+)/DeviceList/(\d+)")
+PAREN_PATTERN = re.compile(r"[()]")
+IP_PATTERN = re.compile(r"(\d+\.\d+\.\d+\.\d+)")
+
+# TRACE_LINE_PATTERN groups holding each header, in HEADER_INDEX order
+HEADER_GROUPS = (6, 7, 8, 11, 12, 13)
+
+# "3/DeviceList/0" -> (3, 0) for the node/device paths seen so far; a trace has only a few
+NODE_DEVICES = {}
+
+HEADER_INDEX = {
+    "WifiMacHeader": 0,
+    "LlcSnapHeader": 1,
+    "Ipv4Header": 2,
+    "UdpHeader": 3,
+    "olsr::PacketHeader": 4,
+    "olsr::MessageHeader": 5,
+}
+
+def find_balanced_end(line, start_pos):
+    # Ipv4Header carries nested parentheses, so match them by depth
+    nested_level = 1
+    for paren in PAREN_PATTERN.finditer(line, start_pos + 1):
+        if paren.group() == '(':
+            nested_level += 1
+        else:
+            nested_level -= 1
+            if nested_level == 0:
+                return paren.end()
+    return -1
+
+def find_header_spans(line):
+    # (start, end) of each header in HEADER_INDEX order, or None where absent. One scan
+    # over the line; only the first occurrence of each header type is kept.
+    spans = [None] * len(HEADER_INDEX)
+    seen = set()
+    for header_match in HEADER_PATTERN.finditer(line):
+        index = HEADER_INDEX[header_match.group(1)]
+        if index in seen:
+            continue
+        seen.add(index)
+        if index == HEADER_INDEX["Ipv4Header"]:
+            end = find_balanced_end(line, header_match.end())
+        else:
+            end = line.find(')', header_match.end())
+            if end >= 0:
+                end += 1
+        if end >= 0:
+            spans[index] = (header_match.start(), end)
+        if len(seen) == len(HEADER_INDEX):
+            break
+    return spans
+
+def find_headers(line):
+    return [line[span[0]:span[1]] if span else None for span in find_header_spans(line)]
+
+def extract_ips_from_ipv4_header(ipv4_header):
+    if ipv4_header:
+        ips = IP_PATTERN.findall(ipv4_header)
+        if len(ips) == 2:
+            return ips[0], ips[1]
+    return None, None
+
+def parse_cheap_fields_generic(line):
+    # (time, event type, rate, node, device) by separate searches
+    event_match = EVENT_PATTERN.search(line)
+    rate_match = RATE_PATTERN.search(line)
+    node_device_match = NODE_DEVICE_PATTERN.search(line)
+
+    event_type = event_match.group(1) if event_match else None
+    event_time = float(event_match.group(2)) if event_match else None
+    rate = rate_match.group(1) if rate_match else None
+    node = int(node_device_match.group(1)) if node_device_match else None
+    device = int(node_device_match.group(2)) if node_device_match else None
+    return event_time, event_type, rate, node, device
+
+def parse_trace_line_generic(line):
+    # Slow path for lines that don't follow the layout TRACE_LINE_PATTERN expects
+    event_time, event_type, rate, node, device = parse_cheap_fields_generic(line)
+    mac_header, llc_header, ipv4_header, udp_header, olsr_packet_header, olsr_message_header = find_headers(line)
+    src_ip, dst_ip = extract_ips_from_ipv4_header(ipv4_header)
+
+    return TraceEntry(event_time, event_type, rate, node, device, mac_header, llc_header, ipv4_header, udp_header, olsr_packet_header, olsr_message_header, src_ip, dst_ip)
+
+def match_trace_line(line):
+    # (TRACE_LINE_PATTERN match, its groups) if it reads line exactly as the generic path
+    # would, else None. Every header must be the first of its type in the line, as a header
+    # search would have found it; anything unusual goes through the generic path instead.
+    line_match = TRACE_LINE_PATTERN.match(line)
+    if line_match is None:
+        return None
+    groups = line_match.groups()
+    ipv4_header = groups[7]
+    if "Rate" in groups[3]:
+        return None
+    # The header must close after the addresses, with them as its only dotted quads
+    if ipv4_header and (ipv4_header.count("(") != 2 or ipv4_header.count(".") != 6 or ipv4_header.find("ns3::", 5) >= 0):
+        return None
+    end = line_match.end()
+    if len(line) - end > 1 and None in groups and HEADER_PATTERN.search(line, end):
+        return None
+    return line_match, groups
+
+def parse_node_device(node_device):
+    node, _, device = node_device.partition("/DeviceList/")
+    numbers = NODE_DEVICES[node_device] = (int(node), int(device))
+    return numbers
+
+def parse_trace_line_spans(line):
+    # Lazy counterpart of parse_trace_line: returns (entry, spans) where entry has every
+    # field but the headers, and spans are their (start, end) offsets in line in
+    # HEADER_INDEX order, or None where absent
+    matched = match_trace_line(line)
+    if matched is None:
+        event_time, event_type, rate, node, device = parse_cheap_fields_generic(line)
+        spans = find_header_spans(line)
+        ipv4_span = spans[HEADER_INDEX["Ipv4Header"]]
+        src_ip, dst_ip = extract_ips_from_ipv4_header(line[ipv4_span[0]:ipv4_span[1]] if ipv4_span else None)
+        return TraceEntry(event_time, event_type, rate, node, device, None, None, None, None, None, None, src_ip, dst_ip), spans
+
+    line_match, groups = matched
+    event_type, event_time, node_device, path, rate = groups[:5]
+    if rate is None:
+        rate_match = RATE_PATTERN.search(line, line_match.end(4))
+        rate = rate_match.group(1) if rate_match else None
+    node, device = NODE_DEVICES.get(node_device) or parse_node_device(node_device)
+    spans = [line_match.span(group) if line_match.start(group) >= 0 else None for group in HEADER_GROUPS]
+    return TraceEntry(float(event_time), event_type, rate, node, device, None, None, None, None, None, None, groups[8], groups[9]), spans
+
+def parse_trace_line(line):
+    matched = match_trace_line(line)
+    if matched is None:
+        return parse_trace_line_generic(line)
+
+    line_match, groups = matched
+    event_type, event_time, node_device, path, rate, mac_header, llc_header, ipv4_header, src_ip, dst_ip, udp_header, olsr_packet_header, olsr_message_header = groups
+    if rate is None:
+        rate_match = RATE_PATTERN.search(line, line_match.end(4))
+        rate = rate_match.group(1) if rate_match else None
+    node, device = NODE_DEVICES.get(node_device) or parse_node_device(node_device)
+
+    return TraceEntry(float(event_time), event_type, rate, node, device, mac_header, llc_header, ipv4_header, udp_header, olsr_packet_header, olsr_message_header, src_ip, dst_ip)
+
+def is_trace_file(file_path):
+    return file_path.endswith(TRACE_SUFFIXES)
+
+def strip_trace_suffix(file_name):
+    for suffix in sorted(TRACE_SUFFIXES, key=len, reverse=True):
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return file_name
+
+def trace_compression(file_path):
+    # "gzip", "xz", "bz2", "zstd", or None for a plain trace
+    with open(file_path, 'rb') as file:
+        head = file.read(6)
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+def decompressing_reader(file, compression):
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=file)
+    if compression == "xz":
+        return lzma.LZMAFile(file)
+    if compression == "bz2":
+        return bz2.BZ2File(file)
+    if zstandard is None:
+        raise RuntimeError("Reading zstd-compressed traces requires the zstandard package")
+    return zstandard.ZstdDecompressor().stream_reader(file)
+
+# Text-mode openers that own the file they open, so closing the stream closes it too
+TEXT_OPENERS = {None: open, "gzip": gzip.open, "xz": lzma.open, "bz2": bz2.open}
+
+def open_trace(file_path):
+    # Text stream over a plain or compressed trace, decompressed as it is read
+    compression = trace_compression(file_path)
+    if compression in TEXT_OPENERS:
+        return TEXT_OPENERS[compression](file_path, 'rt')
+    # zstd's stream_reader closes the file it reads from when it is closed
+    return io.TextIOWrapper(decompressing_reader(open(file_path, 'rb'), compression))
+
+def iter_compressed_ranges(file_path, range_bytes=RANGE_BYTES):
+    # Yields (compressed bytes read, start, end, data) per range of roughly range_bytes of
+    # decompressed data, split on newlines. start and end are offsets into the decompressed
+    # stream; nothing is written to disk.
+    compression = trace_compression(file_path)
+    with open(file_path, 'rb') as file, decompressing_reader(file, compression) as stream:
+        position = 0
+        tail = b""
+        while True:
+            block = stream.read(range_bytes)
+            if not block:
+                break
+            data = tail + block
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                tail = data
+                continue
+            tail = data[cut:]
+            yield file.tell(), position, position + cut, data[:cut]
+            position += cut
+        if tail:
+            yield file.tell(), position, position + len(tail), tail
+
+def split_byte_ranges(mapped, range_bytes=RANGE_BYTES):
+    size = len(mapped)
+    ranges = []
+    start = 0
+    while start < size:
+        end = mapped.find(b'\n', min(start + range_bytes, size) - 1)
+        end = size if end < 0 else end + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def read_byte_range(source, start, end):
+    # source is a trace path, or already the decompressed bytes of the range
+    if isinstance(source, bytes):
+        return source
+    with open(source, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return mapped[start:end]
+
+def parse_byte_range(source, start, end):
+    data = read_byte_range(source, start, end)
+    entries = []
+    # StringIO applies the same universal-newline handling as reading the file in text mode
+    for i, line in enumerate(io.StringIO(data.decode(), newline=None)):
+        try:
+            entries.append(parse_trace_line(line))
+        except Exception as e:
+            print(f"Error parsing line {i} of byte range {start}-{end}: {e}")
+    return entries
+
+def parse_byte_range_rows(source, start, end):
+    # Runs in a worker process. Rows go back as tuples with equal strings shared, since
+    # pickle only writes an object once per identity and rate/IP/LLC/UDP values repeat a lot.
+    shared = {}
+    return [tuple([shared.setdefault(value, value) if type(value) is str else value for value in (getattr(entry, field) for field in TRACE_FIELDS)]) for entry in parse_byte_range(source, start, end)]
+
+def map_byte_ranges(file_path, range_function, max_workers=None):
+    # Yields (bytes done, range_function(source, start, end)) per byte range in file order.
+    # Only a bounded window of ranges is submitted ahead of the consumer, so memory
+    # doesn't grow with file size. Single-range files are handled in-process.
+    # For plain traces the source is file_path and workers map the range themselves. For
+    # compressed traces this process decompresses the next ranges while workers parse
+    # earlier ones, the source is the range's bytes and bytes done counts compressed input.
+    if os.path.getsize(file_path) == 0:
+        return
+    if trace_compression(file_path):
+        ranges = ((done, data, start, end) for done, start, end, data in iter_compressed_ranges(file_path))
+        single_range = False
+    else:
+        with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            ranges = [(end, file_path, start, end) for start, end in split_byte_ranges(mapped)]
+        single_range = len(ranges) == 1
+
+    if single_range or max_workers == 1:
+        for done, source, start, end in ranges:
+            yield done, range_function(source, start, end)
+        return
+
+    def collect(range_index, done, future):
+        try:
+            return done, future.result()
+        except Exception as e:
+            print(f"Error processing byte range {range_index}: {e}")
+            return done, None
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        window = (max_workers or os.cpu_count() or 1) * RANGES_IN_FLIGHT_PER_WORKER
+        pending = deque()
+        for range_index, (done, source, start, end) in enumerate(ranges):
+            pending.append((range_index, done, executor.submit(range_function, source, start, end)))
+            if len(pending) >= window:
+                yield collect(*pending.popleft())
+        while pending:
+            yield collect(*pending.popleft())
+    finally:
+        # Also reached when the consumer stops early; queued ranges are dropped
+        executor.shutdown(cancel_futures=True)
+
+def iter_byte_range_results(file_path, max_workers=None):
+    # Yields (bytes done, entries) per byte range in file order
+    if max_workers == 1:
+        yield from map_byte_ranges(file_path, parse_byte_range, max_workers)
+        return
+    for end, rows in map_byte_ranges(file_path, parse_byte_range_rows, max_workers):
+        yield end, [TraceEntry(*row) for row in rows or ()]
+
+def iter_trace_entries(file_path, batch_size=None, max_workers=1):
+    # Streams parsed entries one at a time, or as lists of up to batch_size entries.
+    # With max_workers other than 1 the byte ranges are parsed in a process pool.
+    if max_workers == 1:
+        batch = []
+        with open_trace(file_path) as file:
+            for i, line in enumerate(file):
+                try:
+                    entry = parse_trace_line(line)
+                except Exception as e:
+                    print(f"Error parsing line {i}: {e}")
+                    continue
+                if batch_size is None:
+                    yield entry
+                else:
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+        if batch:
+            yield batch
+        return
+
+    batch = []
+    for _, entries in iter_byte_range_results(file_path, max_workers):
+        if batch_size is None:
+            yield from entries
+            continue
+        # Batches are cut from each range's entries by offset; only the few entries that
+        # don't fill a batch are carried over to the next range
+        position = 0
+        if batch:
+            position = batch_size - len(batch)
+            batch.extend(entries[:position])
+            if len(batch) < batch_size:
+                continue
+            yield batch
+        while len(entries) - position >= batch_size:
+            yield entries[position:position + batch_size]
+            position += batch_size
+        batch = entries[position:]
+    if batch:
+        yield batch
+
+def read_trace_file(file_path, progress_callback=None, max_workers=None):
+    # Workers default to one per CPU; entries come back in file order
+    total_bytes = os.path.getsize(file_path)
+    trace_entries = []
+    start_time = time.time()
+
+    for bytes_done, entries in iter_byte_range_results(file_path, max_workers):
+        trace_entries.extend(entries)
+        if progress_callback:
+            progress_percent = bytes_done / total_bytes * 100
+            elapsed_time = time.time() - start_time
+            estimated_total_time = elapsed_time / (bytes_done / total_bytes)
+            time_remaining = estimated_total_time - elapsed_time
+            progress_callback(progress_percent, elapsed_time, time_remaining)
+
+    return trace_entries
+
+def display_event_type(event_type):
+    return "Transmit" if event_type == 't' else "Receive" if event_type == 'r' else event_type
+
+def display_node(node):
+    return f"N{node + 1}" if node is not None else ""
+
+def format_trace_entry(entry):
+    # Values shown in the table and written to CSV, in CSV_HEADERS order
+    return (entry.time, display_event_type(entry.event_type), entry.rate, display_node(entry.node), entry.src_ip, entry.dst_ip, entry.device, entry.mac_header, entry.llc_header, entry.ipv4_header, entry.udp_header, entry.olsr_packet_header, entry.olsr_message_header)
+
+def write_trace_csv(trace_entries, file_path):
+    # Accepts any iterable, including iter_trace_entries, so large traces never need to be held in memory
+    with open(file_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADERS)
+        writer.writerows(format_trace_entry(entry) for entry in trace_entries)
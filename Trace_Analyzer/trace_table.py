@@ -0,0 +1,423 @@
+import math
+import mmap
+import os
+import time
+from array import array
+from bisect import bisect_left
+from trace_parser import HEADER_INDEX, TraceEntry, TRACE_FIELDS, map_byte_ranges, parse_byte_range, parse_trace_line_spans, read_byte_range, trace_compression
+from instrumentation import DISABLED
+
+# Header columns in HEADER_INDEX order
+HEADER_FIELDS = ("mac_header", "llc_header", "ipv4_header", "udp_header", "olsr_packet_header", "olsr_message_header")
+
+# Dictionary columns that are parsed eagerly in lazy tables too
+EAGER_FIELDS = ("event_type", "rate", "src_ip", "dst_ip")
+
+# Columns stored as dictionary codes; everything except time, node and device
+DICTIONARY_FIELDS = ("event_type", "rate", "mac_header", "llc_header", "ipv4_header", "udp_header", "olsr_packet_header", "olsr_message_header", "src_ip", "dst_ip")
+
+class DictionaryColumn:
+    # Each distinct value is stored once and rows hold its integer code; code 0 is None.
+    # Broadcast frames show up once per receiver with identical headers, so even the
+    # header columns repeat heavily.
+    def __init__(self, typecode='I'):
+        self.codes = array(typecode)
+        self.values = [None]
+        self.lookup = {None: 0}
+
+    def code_for(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.lookup[value] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self.code_for(value))
+
+    def extend_column(self, other):
+        mapping = [self.code_for(value) for value in other.values]
+        self.codes.extend([mapping[code] for code in other.codes])
+
+    def take(self, rows):
+        # Column of the given rows sharing this column's dictionary, so codes stay valid
+        # and no dictionary is copied. Dictionaries are append-only: values either column
+        # adds later get new codes that the other column's rows never use.
+        column = DictionaryColumn(self.codes.typecode)
+        codes = self.codes
+        column.codes = array(codes.typecode, [codes[row] for row in rows])
+        column.values = self.values
+        column.lookup = self.lookup
+        return column
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def count_present(self):
+        return len(self.codes) - self.codes.count(0)
+
+class SpanColumn:
+    # Header column of a lazily parsed trace: each row is an (offset, length) span of the
+    # trace file, length 0 for None, and values are read through a memory map when asked
+    # for. Displaying a row decodes just that row; codes, values and lookup decode the
+    # whole column once into a DictionaryColumn, so indexing, metrics and export work
+    # unchanged. The trace file must not change while the table is in use. The map is
+    # released once the column is decoded or close() is called, and made again if a
+    # later read needs it.
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.offsets = array('Q')
+        self.lengths = array('I')
+        self.mapped = None
+        self.decoded_column = None
+
+    def __getstate__(self):
+        # Worker processes send columns back without the memory map
+        return dict(self.__dict__, mapped=None)
+
+    def append_span(self, offset, length):
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.decoded_column = None
+
+    def extend_column(self, other):
+        self.offsets.extend(other.offsets)
+        self.lengths.extend(other.lengths)
+        self.decoded_column = None
+
+    def take(self, rows):
+        column = SpanColumn(self.file_path)
+        column.offsets = array('Q', [self.offsets[row] for row in rows])
+        column.lengths = array('I', [self.lengths[row] for row in rows])
+        if self.decoded_column is not None:
+            column.decoded_column = self.decoded_column.take(rows)
+        return column
+
+    def read(self, offset, length):
+        mapped = self.mapped
+        if mapped is None:
+            with open(self.file_path, 'rb') as file:
+                mapped = self.mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped[offset:offset + length].decode()
+
+    def close(self):
+        mapped, self.mapped = self.mapped, None
+        if mapped is not None:
+            mapped.close()
+
+    def decoded(self):
+        if self.decoded_column is None or len(self.decoded_column) != len(self):
+            column = DictionaryColumn()
+            for offset, length in zip(self.offsets, self.lengths):
+                column.append(self.read(offset, length) if length else None)
+            self.decoded_column = column
+            self.close()
+        return self.decoded_column
+
+    codes = property(lambda self: self.decoded().codes)
+    values = property(lambda self: self.decoded().values)
+    lookup = property(lambda self: self.decoded().lookup)
+
+    def __getitem__(self, row):
+        if self.decoded_column is not None:
+            return self.decoded_column[row]
+        length = self.lengths[row]
+        return self.read(self.offsets[row], length) if length else None
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def count_present(self):
+        return len(self.lengths) - self.lengths.count(0)
+
+def time_sorted(times, start=0):
+    # True if times[start:] is non-decreasing, continues from times[start - 1], and has
+    # missing (NaN) times only at the end
+    previous = times[start - 1] if start else -math.inf
+    for value in times[start:]:
+        if value < previous or (previous != previous and value == value):
+            return False
+        previous = value
+    return True
+
+class TraceTable:
+    # Columnar store for parsed trace entries. time, node and device are typed arrays
+    # (NaN and -1 stand for None) and the remaining fields are DictionaryColumns, so the
+    # arrays can be handed to numpy.frombuffer without copying. Indexing and iteration
+    # return TraceEntry objects built on demand. time_sorted records whether rows are in
+    # time order, which window() relies on for binary search.
+    def __init__(self):
+        self.time_sorted = True
+        self.time = array('d')
+        self.node = array('i')
+        self.device = array('i')
+        self.event_type = DictionaryColumn('H')
+        for field in DICTIONARY_FIELDS[1:]:
+            setattr(self, field, DictionaryColumn())
+        self.indexes = {}
+
+    @classmethod
+    def lazy(cls, file_path):
+        # Table whose header columns are SpanColumns into file_path, filled by append_spans
+        table = cls()
+        for field in HEADER_FIELDS:
+            setattr(table, field, SpanColumn(file_path))
+        return table
+
+    @classmethod
+    def from_entries(cls, trace_entries):
+        table = cls()
+        for entry in trace_entries:
+            table.append(entry)
+        return table
+
+    def append(self, entry):
+        value = math.nan if entry.time is None else entry.time
+        if self.time_sorted and self.time and (value < self.time[-1] or (self.time[-1] != self.time[-1] and value == value)):
+            self.time_sorted = False
+        self.time.append(value)
+        self.node.append(-1 if entry.node is None else entry.node)
+        self.device.append(-1 if entry.device is None else entry.device)
+        for field in DICTIONARY_FIELDS:
+            getattr(self, field).append(getattr(entry, field))
+        if self.indexes:
+            self.update_indexes(len(self) - 1)
+
+    def append_spans(self, entry, spans, line_offset):
+        # append() for lazy tables: spans are the header offsets parse_trace_line_spans
+        # found in a line starting at byte line_offset of the file
+        value = math.nan if entry.time is None else entry.time
+        if self.time_sorted and self.time and (value < self.time[-1] or (self.time[-1] != self.time[-1] and value == value)):
+            self.time_sorted = False
+        self.time.append(value)
+        self.node.append(-1 if entry.node is None else entry.node)
+        self.device.append(-1 if entry.device is None else entry.device)
+        for field in EAGER_FIELDS:
+            getattr(self, field).append(getattr(entry, field))
+        for field, span in zip(HEADER_FIELDS, spans):
+            if span is None:
+                getattr(self, field).append_span(0, 0)
+            else:
+                getattr(self, field).append_span(line_offset + span[0], span[1] - span[0])
+        if self.indexes:
+            self.update_indexes(len(self) - 1)
+
+    def extend_table(self, other):
+        first_row = len(self)
+        self.time.extend(other.time)
+        self.node.extend(other.node)
+        self.device.extend(other.device)
+        for field in DICTIONARY_FIELDS:
+            getattr(self, field).extend_column(getattr(other, field))
+        self.time_sorted = self.time_sorted and other.time_sorted and time_sorted(self.time, first_row)
+        self.update_indexes(first_row)
+
+    def take(self, rows):
+        # New table holding the given rows, e.g. the result of select(), in that order
+        table = TraceTable()
+        for field in ("time", "node", "device"):
+            column = getattr(self, field)
+            setattr(table, field, array(column.typecode, [column[row] for row in rows]))
+        for field in DICTIONARY_FIELDS:
+            setattr(table, field, getattr(self, field).take(rows))
+        table.time_sorted = time_sorted(table.time)
+        return table
+
+    def close(self):
+        # Releases the trace file mapped by lazy header columns; the table stays usable
+        for field in HEADER_FIELDS:
+            column = getattr(self, field)
+            if isinstance(column, SpanColumn):
+                column.close()
+
+    def sort_by_time(self):
+        # This table if it is already in time order, otherwise a stably sorted copy with
+        # rows lacking a time at the end
+        if self.time_sorted:
+            return self
+        times = self.time
+        return self.take(sorted(range(len(self)), key=lambda row: (times[row] != times[row], times[row])))
+
+    def window(self, start_time, end_time):
+        # Rows with start_time <= time < end_time, as sorted row ids. On a time-sorted table
+        # this is a range found by binary search; NaN compares as not less than anything,
+        # so rows without a time, kept at the end, are never included.
+        if self.time_sorted:
+            return range(bisect_left(self.time, start_time), bisect_left(self.time, end_time))
+        return array('I', [row for row, value in enumerate(self.time) if start_time <= value < end_time])
+
+    def get_value(self, field, row):
+        if field == "time":
+            value = self.time[row]
+            return None if math.isnan(value) else value
+        if field in ("node", "device"):
+            value = getattr(self, field)[row]
+            return None if value < 0 else value
+        return getattr(self, field)[row]
+
+    def index(self, field):
+        # value -> sorted array of row ids, built on first use and kept up to date as rows are added
+        index = self.indexes.get(field)
+        if index is None:
+            index = self.build_index(field)
+            self.indexes[field] = index
+        return index
+
+    def update_indexes(self, first_row):
+        # Rows are only ever added at the end, so appending their ids keeps every array sorted
+        for field, index in self.indexes.items():
+            for row in range(first_row, len(self)):
+                value = self.get_value(field, row)
+                rows = index.get(value)
+                if rows is None:
+                    rows = index[value] = array('I')
+                rows.append(row)
+
+    def build_index(self, field):
+        if field in DICTIONARY_FIELDS:
+            column = getattr(self, field)
+            rows_by_code = [array('I') for _ in column.values]
+            for row, code in enumerate(column.codes):
+                rows_by_code[code].append(row)
+            return {column.values[code]: rows for code, rows in enumerate(rows_by_code) if rows}
+
+        index = {}
+        # NaN marks a missing time and -1 a missing node or device
+        missing = None if field == "time" else -1
+        for row, value in enumerate(getattr(self, field)):
+            if value == missing or value != value:
+                value = None
+            rows = index.get(value)
+            if rows is None:
+                rows = index[value] = array('I')
+            rows.append(row)
+        return index
+
+    def distinct_values(self, field):
+        return sorted(value for value in self.index(field) if value is not None)
+
+    def select(self, filters, time_range=None):
+        # Rows matching every field == value pair in filters, as sorted row ids, and with a
+        # (start, end) time_range only those in window(start, end). Each filter's row-id
+        # list comes from its index and the lists are intersected, smallest first.
+        rows = range(len(self)) if time_range is None else self.window(*time_range)
+        if not filters:
+            return rows
+        row_lists = sorted((self.index(field).get(value, ()) for field, value in filters.items()), key=len)
+        if isinstance(rows, range):
+            # Row ids are sorted, so the part inside a range is found by binary search
+            first = row_lists[0]
+            rows = first[bisect_left(first, rows.start):bisect_left(first, rows.stop)]
+        else:
+            rows = intersect_row_ids(rows, row_lists[0])
+        for other in row_lists[1:]:
+            if not rows:
+                break
+            rows = intersect_row_ids(rows, other)
+        return rows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        return TraceEntry(*(self.get_value(field, row) for field in TRACE_FIELDS))
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def __len__(self):
+        return len(self.time)
+
+    def __repr__(self):
+        return f"TraceTable(rows={len(self)})"
+
+def intersect_row_ids(rows, other):
+    # Both inputs are sorted; binary search wins when one side is much smaller
+    if len(rows) * 16 < len(other):
+        found = array('I')
+        for row in rows:
+            position = bisect_left(other, row)
+            if position < len(other) and other[position] == row:
+                found.append(row)
+        return found
+    return array('I', sorted(set(rows).intersection(other)))
+
+def parse_byte_range_table(source, start, end):
+    # Runs in a worker process; a TraceTable pickles as a few arrays plus each distinct string once
+    return TraceTable.from_entries(parse_byte_range(source, start, end))
+
+def count_table(instrumentation, table):
+    # Lines parsed, lines without an event time, and rows carrying each header type
+    if instrumentation.enabled:
+        instrumentation.count("lines parsed", len(table))
+        instrumentation.count("lines failed", sum(1 for value in table.time if value != value))
+        for header, field in zip(HEADER_INDEX, HEADER_FIELDS):
+            instrumentation.count(header, getattr(table, field).count_present())
+
+def parse_byte_range_lazy(source, start, end):
+    # parse_byte_range_table for lazy tables. Lines are walked as bytes so that header
+    # spans become file offsets; only a plain trace path can be the source.
+    table = TraceTable.lazy(source)
+    position = start
+    for i, raw_line in enumerate(read_byte_range(source, start, end).splitlines(keepends=True)):
+        line = raw_line.decode()
+        try:
+            entry, spans = parse_trace_line_spans(line)
+        except Exception as e:
+            print(f"Error parsing line {i} of byte range {start}-{end}: {e}")
+            position += len(raw_line)
+            continue
+        if len(line) != len(raw_line):
+            # Non-ASCII text: character offsets differ from byte offsets
+            spans = [(len(line[:span[0]].encode()), len(line[:span[1]].encode())) if span else None for span in spans]
+        table.append_spans(entry, spans, position)
+        position += len(raw_line)
+    return table
+
+def read_trace_table(file_path, progress_callback=None, max_workers=None, instrumentation=DISABLED, cancel_event=None, part_callback=None, lazy_headers=False):
+    # Same as read_trace_file, but the result is a TraceTable sorted by time and no list of
+    # entries is ever built. "read+parse" is the time spent waiting on the byte ranges.
+    # part_callback receives each byte range's table, in file order, as soon as it is
+    # parsed; those tables are never modified afterwards. Returns None if cancel_event is
+    # set before the whole file has been read. With lazy_headers the header columns are
+    # SpanColumns, decoded only when used; compressed traces are always parsed eagerly.
+    total_bytes = os.path.getsize(file_path)
+    lazy_headers = lazy_headers and trace_compression(file_path) is None
+    table = TraceTable.lazy(file_path) if lazy_headers else TraceTable()
+    parse_function = parse_byte_range_lazy if lazy_headers else parse_byte_range_table
+    start_time = time.time()
+
+    for bytes_done, part in instrumentation.timed("read+parse", map_byte_ranges(file_path, parse_function, max_workers)):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if part is not None:
+            if part_callback:
+                part_callback(part)
+            with instrumentation.stage("merge"):
+                if len(table) or part_callback:
+                    table.extend_table(part)
+                else:
+                    table = part
+        if progress_callback:
+            progress_percent = bytes_done / total_bytes * 100
+            elapsed_time = time.time() - start_time
+            estimated_total_time = elapsed_time / (bytes_done / total_bytes)
+            time_remaining = estimated_total_time - elapsed_time
+            progress_callback(progress_percent, elapsed_time, time_remaining)
+
+    with instrumentation.stage("sort"):
+        table = table.sort_by_time()
+    count_table(instrumentation, table)
+    return table
@@ -0,0 +1,73 @@
+from tkinter import ttk
+
+class VirtualTreeview(ttk.Treeview):
+    # Treeview that holds one item per visible line and refills their values as the view
+    # scrolls. Rows come from any sequence supporting len() and indexing, formatted on
+    # demand, so scrolling and re-display cost the same for 10 thousand or 10 million rows.
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = ()
+        self.format_row = None
+        self.first_row = 0
+        self.yscrollcommand = None
+        self.bind("<Configure>", lambda event: self.refresh())
+        self.bind("<MouseWheel>", lambda event: self.scroll_rows(-3 if event.delta > 0 else 3))
+        self.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.bind("<Up>", lambda event: self.scroll_rows(-1))
+        self.bind("<Down>", lambda event: self.scroll_rows(1))
+        self.bind("<Prior>", lambda event: self.scroll_rows(-self.visible_count()))
+        self.bind("<Next>", lambda event: self.scroll_rows(self.visible_count()))
+        self.bind("<Home>", lambda event: self.scroll_rows(-len(self.rows)))
+        self.bind("<End>", lambda event: self.scroll_rows(len(self.rows)))
+
+    def set_rows(self, rows, format_row):
+        self.rows = rows
+        self.format_row = format_row
+        self.first_row = 0
+        self.refresh()
+
+    def update_rows(self, rows):
+        # Same as set_rows with the current formatter, keeping the scroll position
+        self.rows = rows
+        self.refresh()
+
+    def visible_count(self):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # One row's worth of height is left for the headings
+        return max(1, self.winfo_height() // row_height - 1)
+
+    def scroll_rows(self, count):
+        self.first_row += count
+        self.refresh()
+        return "break"
+
+    def yview(self, *args):
+        total = len(self.rows)
+        if not args:
+            if total == 0:
+                return (0.0, 1.0)
+            return (self.first_row / total, min(total, self.first_row + self.visible_count()) / total)
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self.visible_count() if args[2] == "pages" else 1
+            self.first_row += int(args[1]) * step
+        self.refresh()
+
+    def refresh(self):
+        total = len(self.rows)
+        visible = self.visible_count()
+        self.first_row = max(0, min(self.first_row, total - visible))
+        count = min(visible, total - self.first_row)
+
+        items = self.get_children()
+        if len(items) > count:
+            self.delete(*items[count:])
+        for _ in range(len(items), count):
+            self.insert("", "end")
+        for item, row in zip(self.get_children(), range(self.first_row, self.first_row + count)):
+            self.item(item, values=self.format_row(self.rows[row]))
+
+        if self.yscrollcommand:
+            self.yscrollcommand(*self.yview())
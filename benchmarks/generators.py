@@ -0,0 +1,244 @@
+import heapq
+import itertools
+import math
+import random
+
+# Deterministic synthetic inputs for every analyzer. Each writer streams its output in
+# batches, so 100M-record files can be generated without holding them in memory, and
+# returns the number of lines written. The same (records, seed) always gives the same file.
+
+WRITE_BATCH_LINES = 10000
+NODES = 20
+FLOWS = 50
+RATES = ("OfdmRate6Mbps", "OfdmRate12Mbps", "OfdmRate24Mbps", "OfdmRate54Mbps")
+
+def node_ip(node):
+    return f"10.1.1.{node + 1}"
+
+def node_mac(node):
+    return f"00:00:00:00:00:{node + 1:02x}"
+
+class BatchWriter:
+    def __init__(self, file):
+        self.file = file
+        self.lines = []
+        self.count = 0
+
+    def write(self, line):
+        self.lines.append(line)
+        if len(self.lines) >= WRITE_BATCH_LINES:
+            self.flush()
+
+    def flush(self):
+        self.file.write("\n".join(self.lines))
+        if self.lines:
+            self.file.write("\n")
+        self.count += len(self.lines)
+        self.lines = []
+
+def trace_line(event_type, time, node, state, rng, sender, receiver, seq, packet_id, kind):
+    path = f"/NodeList/{node}/DeviceList/0/$ns3::WifiNetDevice/Phy/State/{state}"
+    rate = RATES[(sender + receiver) % len(RATES)] if kind == "data" else RATES[0]
+    if kind == "ack":
+        return f"{event_type} {time:.9f} {path} {rate} ns3::WifiMacHeader (ACK RA={node_mac(sender)}) ns3::WifiMacTrailer ()"
+    if kind == "hello":
+        return (f"{event_type} {time:.9f} {path} {rate} ns3::WifiMacHeader (DATA ToDS=0, FromDS=0, MoreFrag=0, Retry=0, MoreData=0 Duration/ID=0us, "
+                f"DA=ff:ff:ff:ff:ff:ff, SA={node_mac(sender)}, BSSID=ff:ff:ff:ff:ff:ff, FragNumber=0, SeqNumber={seq}) ns3::LlcSnapHeader (type 0x800) "
+                f"ns3::Ipv4Header (tos 0x0 DSCP Default ECN Not-ECT ttl 1 id {packet_id} protocol 17 offset (bytes) 0 flags [none] length: 76 {node_ip(sender)} > 10.1.1.255) "
+                f"ns3::UdpHeader (length: 56 698 > 698) ns3::olsr::PacketHeader (len=48 seqNumber={seq}) "
+                f"ns3::olsr::MessageHeader (type=HELLO, vtime=6s, originatorAddress={node_ip(sender)}) Payload (size=4) ns3::WifiMacTrailer ()")
+    size = rng.choice((512, 1024, 1472))
+    return (f"{event_type} {time:.9f} {path} {rate} ns3::WifiMacHeader (DATA ToDS=0, FromDS=0, MoreFrag=0, Retry=0, MoreData=0 Duration/ID=44us, "
+            f"DA={node_mac(receiver)}, SA={node_mac(sender)}, BSSID=ff:ff:ff:ff:ff:ff, FragNumber=0, SeqNumber={seq}) ns3::LlcSnapHeader (type 0x800) "
+            f"ns3::Ipv4Header (tos 0x0 DSCP Default ECN Not-ECT ttl 64 id {packet_id} protocol 17 offset (bytes) 0 flags [none] length: {size + 28} {node_ip(sender)} > {node_ip(receiver)}) "
+            f"ns3::UdpHeader (length: {size + 8} 49153 > 9) Payload (size={size}) ns3::WifiMacTrailer ()")
+
+def write_trace(path, records, seed=0):
+    # Wi-Fi/OLSR ASCII trace: OLSR HELLO broadcasts received by a few neighbours, and
+    # unicast UDP data frames answered by an ACK. Lines come out in time order, as ns-3
+    # writes them, even when exchanges overlap.
+    rng = random.Random(seed)
+    time = 1.0
+    seq = 0
+    pending = []
+    order = itertools.count()
+    with open(path, 'w') as file:
+        writer = BatchWriter(file)
+        while writer.count + len(writer.lines) < records:
+            time += rng.expovariate(2000.0)
+            while pending and pending[0][0] <= time:
+                writer.write(heapq.heappop(pending)[2])
+            seq = (seq + 1) % 4096
+            sender = rng.randrange(NODES)
+            packet_id = rng.randrange(65536)
+            if rng.random() < 0.3:
+                events = [("t", 0.0, sender, "Tx", sender, "hello")]
+                events += [("r", 0.0001, receiver, "RxOk", receiver, "hello") for receiver in rng.sample(range(NODES), 3) if receiver != sender]
+            else:
+                receiver = (sender + rng.randrange(1, NODES)) % NODES
+                events = [("t", 0.0, sender, "Tx", receiver, "data"), ("r", 0.0002, receiver, "RxOk", receiver, "data"),
+                          ("t", 0.0003, receiver, "Tx", receiver, "ack"), ("r", 0.0004, sender, "RxOk", receiver, "ack")]
+            for event_type, offset, node, state, receiver, kind in events:
+                line = trace_line(event_type, time + offset, node, state, rng, sender, receiver, seq, packet_id, kind)
+                heapq.heappush(pending, (time + offset, next(order), line))
+        while pending:
+            writer.write(heapq.heappop(pending)[2])
+        del writer.lines[records - writer.count:]
+        writer.flush()
+    return writer.count
+
+def ns_time(seconds):
+    return f"+{seconds * 1e9:.9g}ns"
+
+def histogram(writer, name, rng, bins, width):
+    counts = [rng.randrange(50) for _ in range(bins)]
+    writer.write(f'      <{name} nBins="{bins}" >')
+    for index, count in enumerate(counts):
+        if count:
+            writer.write(f'        <bin index="{index}" start="{index * width:g}" width="{width:g}" count="{count}" />')
+    writer.write(f'      </{name}>')
+
+def flow_attributes(rng, flow_id, records):
+    # Sources are assigned in contiguous flow id blocks, so each probe's flows are adjacent
+    start = rng.uniform(1.0, 10.0)
+    duration = rng.uniform(5.0, 50.0)
+    tx_packets = rng.randrange(100, 10000)
+    lost = rng.randrange(0, tx_packets // 10)
+    size = rng.choice((512, 1024, 1472)) + 28
+    delay = rng.uniform(0.0005, 0.05)
+    source = (flow_id - 1) * NODES // records
+    destination = (source + rng.randrange(1, NODES)) % NODES
+    return start, duration, tx_packets, lost, size, delay, source, destination
+
+def write_flow_monitor_xml(path, records, seed=0):
+    # FlowMonitor::SerializeToXmlFile layout with histograms, classifier and probes; one
+    # record per flow. Each section re-draws the flows from the seed instead of keeping them.
+    histogram_rng = random.Random(seed + 1)
+    with open(path, 'w') as file:
+        writer = BatchWriter(file)
+        writer.write('<?xml version="1.0" ?>')
+        writer.write('<FlowMonitor>')
+        writer.write('  <FlowStats>')
+        rng = random.Random(seed)
+        for flow_id in range(1, records + 1):
+            start, duration, tx_packets, lost, size, delay, _, _ = flow_attributes(rng, flow_id, records)
+            rx_packets = tx_packets - lost
+            writer.write(f'    <Flow flowId="{flow_id}" timeFirstTxPacket="{ns_time(start)}" timeFirstRxPacket="{ns_time(start + delay)}" '
+                         f'timeLastTxPacket="{ns_time(start + duration)}" timeLastRxPacket="{ns_time(start + duration + delay)}" '
+                         f'delaySum="{ns_time(delay * rx_packets)}" jitterSum="{ns_time(delay * 0.1 * rx_packets)}" lastDelay="{ns_time(delay)}" '
+                         f'txBytes="{tx_packets * size}" rxBytes="{rx_packets * size}" txPackets="{tx_packets}" rxPackets="{rx_packets}" '
+                         f'lostPackets="{lost}" timesForwarded="{flow_id % 7 * rx_packets}">')
+            histogram(writer, "delayHistogram", histogram_rng, histogram_rng.randrange(5, 50), 0.001)
+            histogram(writer, "jitterHistogram", histogram_rng, histogram_rng.randrange(2, 20), 0.001)
+            histogram(writer, "packetSizeHistogram", histogram_rng, 3, 20)
+            writer.write('      <flowInterruptionsHistogram nBins="0" >')
+            writer.write('      </flowInterruptionsHistogram>')
+            writer.write('    </Flow>')
+        writer.write('  </FlowStats>')
+        writer.write('  <Ipv4FlowClassifier>')
+        rng = random.Random(seed)
+        for flow_id in range(1, records + 1):
+            _, _, tx_packets, _, _, _, source, destination = flow_attributes(rng, flow_id, records)
+            writer.write(f'    <Flow flowId="{flow_id}" sourceAddress="{node_ip(source)}" destinationAddress="{node_ip(destination)}" protocol="17" sourcePort="{49153 + flow_id % 1000}" destinationPort="9">')
+            writer.write(f'      <Dscp value="0x0" packets="{tx_packets}" />')
+            writer.write('    </Flow>')
+        writer.write('  </Ipv4FlowClassifier>')
+        writer.write('  <FlowProbes>')
+        rng = random.Random(seed)
+        probe = None
+        for flow_id in range(1, records + 1):
+            _, _, tx_packets, _, size, delay, source, _ = flow_attributes(rng, flow_id, records)
+            if source != probe:
+                if probe is not None:
+                    writer.write('    </FlowProbe>')
+                probe = source
+                writer.write(f'    <FlowProbe index="{probe}">')
+            writer.write(f'      <FlowStats  flowId="{flow_id}" packets="{tx_packets}" bytes="{tx_packets * size}" delayFromFirstProbeSum="{ns_time(delay * tx_packets)}" >')
+            writer.write('      </FlowStats>')
+        if probe is not None:
+            writer.write('    </FlowProbe>')
+        writer.write('  </FlowProbes>')
+        writer.write('</FlowMonitor>')
+        writer.flush()
+    return writer.count
+
+def write_flow_log(path, records, seed=0):
+    # Instantaneous_Flow_Log: one block per (second, flow); one record per block
+    rng = random.Random(seed)
+    flows = [(flow_id, rng.randrange(NODES), rng.randrange(NODES)) for flow_id in range(1, FLOWS + 1)]
+    totals = {flow_id: [0, 0] for flow_id, _, _ in flows}
+    written = 0
+    with open(path, 'w') as file:
+        writer = BatchWriter(file)
+        for second in range(1, math.ceil(records / FLOWS) + 1):
+            writer.write(f"Time: {second}")
+            for flow_id, source, destination in flows[:records - written]:
+                tx, rx = totals[flow_id]
+                tx += rng.randrange(100, 200)
+                rx = min(tx, rx + rng.randrange(90, 200))
+                totals[flow_id] = [tx, rx]
+                writer.write(f"FlowID: {flow_id} UDP {node_ip(source)}/{49153 + flow_id} --> {node_ip(destination)}/9")
+                writer.write(f"Tx Bytes: {tx * 1052}")
+                writer.write(f"Rx Bytes: {rx * 1052}")
+                writer.write(f"Tx Packets: {tx}")
+                writer.write(f"Rx Packets: {rx}")
+                writer.write(f"Lost Packets: {tx - rx}")
+                writer.write(f"Pkt Lost Ratio: {(tx - rx) / tx:.6f}")
+                writer.write(f"Mean{{Delay}}: {rng.uniform(0.0005, 0.05):.6f}")
+                writer.write(f"Mean{{Jitter}}: {rng.uniform(0.0001, 0.005):.6f}")
+                writer.write(f"Throughput: {rx * 1052 * 8 / second / 1e6:.6f} Mbps")
+                written += 1
+            writer.write(f"End-to-End Throughput: {rng.uniform(1, 10):.6f} Mbps")
+        writer.flush()
+    return writer.count
+
+def write_packet_flow_log(path, records, seed=0):
+    # packet_flow_log: one line per application packet event
+    rng = random.Random(seed)
+    with open(path, 'w') as file:
+        writer = BatchWriter(file)
+        for packet_id in range(records):
+            source = rng.randrange(NODES)
+            destination = (source + rng.randrange(1, NODES)) % NODES
+            app, event = rng.choice((("OnOffApplication", "Tx"), ("PacketSink", "Rx")))
+            writer.write(f"App: {app}, Context: /NodeList/{source}/ApplicationList/0/$ns3::{app}/{event}, PacketID: {packet_id}, SrcIP: {node_ip(source)}, DstIP: {node_ip(destination)}")
+        writer.flush()
+    return writer.count
+
+def write_route_table(path, records, seed=0):
+    # OLSR RouteTable dump: node addresses, then per-second tables for every node; one
+    # record per route
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w') as file:
+        writer = BatchWriter(file)
+        for node in range(NODES):
+            writer.write(f"Node {node} IPv4 address: {node_ip(node)}")
+        second = 0
+        while written < records:
+            second += 1
+            for node in range(NODES):
+                if written >= records:
+                    break
+                writer.write(f"Node: {node}, Time: +{second}s, Local time: +{second}s, OLSR Routing table")
+                writer.write("Destination\t\tNextHop\t\tInterface\tDistance")
+                for destination in range(NODES):
+                    if destination == node or written >= records:
+                        continue
+                    distance = rng.randrange(1, 4)
+                    next_hop = destination if distance == 1 else rng.randrange(NODES)
+                    writer.write(f"{node_ip(destination)}\t\t{node_ip(next_hop)}\t\t1\t\t{distance}")
+                    written += 1
+                writer.write("HNA Routing Table: empty")
+                writer.write("")
+        writer.flush()
+    return writer.count
+
+# format name -> (file suffix, writer)
+GENERATORS = {
+    "trace": (".tr", write_trace),
+    "flow_monitor_xml": (".xml", write_flow_monitor_xml),
+    "flow_log": (".txt", write_flow_log),
+    "packet_flow_log": (".txt", write_packet_flow_log),
+    "route_table": (".txt", write_route_table),
+}
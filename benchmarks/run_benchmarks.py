@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(REPO_DIR, name) for name in ("Trace_Analyzer", "Customized_Analyzers", "Flow_Monitor_Analyzer")]
+
+from generators import GENERATORS
+
+DEFAULT_RECORDS = (10000, 100000)
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "ns3-utilities-bench")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_TOLERANCE = 0.15
+
+@contextmanager
+def stage(stages, name):
+    start = time.perf_counter()
+    yield
+    stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+# Each case runs one analyzer's parsing path on a generated file and returns
+# {stage name: seconds}. Cases import their analyzer lazily, so only the one being
+# measured is loaded into the child process.
+
+def bench_trace_lines(path):
+    from trace_parser import parse_trace_line
+    stages = {}
+    with stage(stages, "read"):
+        with open(path, 'r') as file:
+            lines = file.readlines()
+    with stage(stages, "parse"):
+        for line in lines:
+            parse_trace_line(line)
+    return stages
+
+def bench_trace_table(path):
+    from trace_table import read_trace_table
+    stages = {}
+    with stage(stages, "read+parse+merge"):
+        table = read_trace_table(path)
+    with stage(stages, "index"):
+        for field in ("node", "event_type", "src_ip"):
+            table.index(field)
+    with stage(stages, "window"):
+        first, last = table.time[0], table.time[-1]
+        step = (last - first) / 100 or 1.0
+        for i in range(100):
+            table.select({"event_type": "r"}, (first + i * step, first + (i + 1) * step))
+    return stages
+
+def bench_flow_monitor_xml(path):
+    from flow_monitor_model import read_flow_monitor
+    stages = {}
+    with stage(stages, "read+parse"):
+        model = read_flow_monitor(path)
+    with stage(stages, "metrics"):
+        model.metrics()
+    return stages
+
+def bench_flow_log(path):
+    from flow_log_table import read_flow_log
+    stages = {}
+    with stage(stages, "read+parse"):
+        read_flow_log(path)
+    return stages
+
+def bench_packet_flow_log(path):
+    from packet_flow_log import read_packet_flow_log
+    stages = {}
+    with stage(stages, "read+parse"):
+        read_packet_flow_log(path)
+    return stages
+
+def bench_route_table(path):
+    from RoutingTable_Analyzer_GUI import parse_routing_data
+    stages = {}
+    with stage(stages, "read"):
+        with open(path, 'r') as file:
+            data = file.read()
+    with stage(stages, "parse"):
+        parse_routing_data(data)
+    return stages
+
+# case name -> (input format, benchmark)
+CASES = {
+    "trace_lines": ("trace", bench_trace_lines),
+    "trace_table": ("trace", bench_trace_table),
+    "flow_monitor_xml": ("flow_monitor_xml", bench_flow_monitor_xml),
+    "flow_log": ("flow_log", bench_flow_log),
+    "packet_flow_log": ("packet_flow_log", bench_packet_flow_log),
+    "route_table": ("route_table", bench_route_table),
+}
+
+def peak_rss_mb(who):
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def input_file(data_dir, input_format, records, seed):
+    # Generated once per (format, records, seed) and reused across runs
+    suffix, write = GENERATORS[input_format]
+    path = os.path.join(data_dir, f"{input_format}-{records}-{seed}{suffix}")
+    meta_path = path + ".json"
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {records} {input_format} records in {path}", file=sys.stderr)
+        lines = write(path + ".tmp", records, seed)
+        os.replace(path + ".tmp", path)
+        with open(meta_path, 'w') as file:
+            json.dump({"records": records, "lines": lines, "bytes": os.path.getsize(path)}, file)
+    with open(meta_path) as file:
+        return path, json.load(file)
+
+def run_case(case, path):
+    # Runs in a fresh child process so peak RSS belongs to this case alone
+    stages = CASES[case][1](path)
+    return {"stages": stages, "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF) if resource else None, "children_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None}
+
+def measure(case, records, data_dir, seed, repeat):
+    # Best of repeat runs by total time
+    path, meta = input_file(data_dir, CASES[case][0], records, seed)
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-case", case, path], capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{case} failed on {path}:\n{completed.stderr}")
+        result = json.loads(completed.stdout.splitlines()[-1])
+        result["total_s"] = sum(result["stages"].values())
+        if best is None or result["total_s"] < best["total_s"]:
+            best = result
+    best.update(case=case, records=records, lines=meta["lines"], bytes=meta["bytes"])
+    best["lines_per_s"] = meta["lines"] / best["total_s"] if best["total_s"] else None
+    best["records_per_s"] = records / best["total_s"] if best["total_s"] else None
+    return best
+
+def baseline_key(result):
+    return f"{result['case']}:{result['records']}"
+
+def format_result(result, baseline):
+    stages = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result["stages"].items())
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+    text = f"{result['case']:<18} {result['records']:>11} records {result['lines_per_s']:>13,.0f} lines/s  peak RSS {rss:>8}  [{stages}]"
+    if baseline:
+        text += f"  ({result['lines_per_s'] / baseline['lines_per_s'] - 1:+.1%} vs baseline)"
+    return text
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analyzers' parsers on synthetic inputs.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=sorted(CASES), help="cases to run (default: all)")
+    parser.add_argument("--records", nargs="+", type=int, default=DEFAULT_RECORDS, help="input sizes in records, e.g. 10000 1000000 100000000")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic inputs")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is reported")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated inputs are kept between runs")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file of stored baselines")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="fractional lines/s drop from the baseline reported as a regression")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write all results to this JSON file")
+    parser.add_argument("--run-case", nargs=2, metavar=("CASE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(*args.run_case)))
+        return 0
+
+    baselines = load_baselines(args.baseline)
+    results = []
+    regressions = []
+    for records in args.records:
+        for case in args.cases:
+            result = measure(case, records, args.data_dir, args.seed, args.repeat)
+            baseline = baselines.get(baseline_key(result))
+            print(format_result(result, baseline))
+            results.append(result)
+            if baseline and result["lines_per_s"] < baseline["lines_per_s"] * (1 - args.tolerance):
+                regressions.append(baseline_key(result))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.save_baseline:
+        baselines.update({baseline_key(result): result for result in results})
+        with open(args.baseline, 'w') as file:
+            json.dump(baselines, file, indent=2)
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())